@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+"""
+Processamento Offline em Lote de Vídeos Gravados
+
+Este script executa o MediaPipe Hands e o classificador treinado sobre vídeos
+gravados, sem câmera e sem janela gráfica, distribuindo os arquivos entre
+processos com uma instância de `Hands` por processo. Para cada vídeo são
+gravados, à medida que os frames são processados:
+    - <nome>_landmarks.csv: as 63 coordenadas brutas dos frames com mão
+      detectada, no mesmo formato escrito pelo capture.py;
+    - <nome>_predictions.csv: uma linha por frame com a classe prevista e a
+      confiança;
+    - <nome>_probas.npz (opcional, com --save-probas): o fluxo completo de
+      probabilidades com os instantes de cada frame, no formato lido pelo
+      avaliador do decoder.py.
+
+Vídeos de diretórios diferentes com o mesmo nome gerariam as mesmas saídas, e
+por isso interrompem a execução antes do processamento.
+
+Uso:
+    python src/batch.py videos/ outra_sessao.mp4 --output data/batch --workers 4
+"""
+import argparse
+import csv
+import os
+import time
+from multiprocessing import Pool
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from engine import MODELS_DIR, load_classifier
+from features import FrameNormalizer
+from frames import FrameBuffers, LandmarkBuffer
+
+# Extensões de vídeo reconhecidas ao percorrer diretórios.
+VIDEO_EXTENSIONS = (".mp4", ".avi", ".mov", ".mkv", ".webm")
+
+# Estado de cada processo trabalhador, inicializado uma única vez.
+_hands = None
+_predict_proba = None
+_class_names = None
+_normalize_frame = None
+_frame_buffers = None
+_landmark_buffer = None
+_options = None
+
+
+def find_videos(inputs):
+    """Expandindo a lista de arquivos e diretórios em caminhos de vídeo."""
+    videos = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.lower().endswith(VIDEO_EXTENSIONS):
+                    videos.append(os.path.join(path, name))
+        elif os.path.isfile(path):
+            videos.append(path)
+        else:
+            print(f"[AVISO] Caminho ignorado, não encontrado: {path}")
+    return videos
+
+
+def output_name(video_path):
+    """Retornando o prefixo dos arquivos de saída de um vídeo."""
+    return os.path.splitext(os.path.basename(video_path))[0]
+
+
+def find_collisions(videos):
+    """Agrupando os vídeos cujos arquivos de saída teriam o mesmo nome."""
+    by_name = {}
+    for video_path in videos:
+        by_name.setdefault(output_name(video_path), []).append(video_path)
+    return {name: paths for name, paths in by_name.items() if len(paths) > 1}
+
+
+def _init_worker(options):
+    global _hands, _predict_proba, _class_names, _normalize_frame, _frame_buffers, _landmark_buffer, _options
+    # Evitando a disputa por núcleos entre os processos e as threads do OpenCV.
+    cv2.setNumThreads(1)
+    _options = options
+    # Inicializando a solução MediaPipe Hands com os mesmos parâmetros da captura.
+    _hands = mp.solutions.hands.Hands(
+        static_image_mode=False,
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+    _normalize_frame = FrameNormalizer()
+    _frame_buffers = FrameBuffers()
+    # Sem janela a exibir, espelhando os landmarks em vez dos pixels, salvo com --flip-pixels.
+    _landmark_buffer = LandmarkBuffer(mirror=not options.no_flip and not options.flip_pixels)
+    if not options.landmarks_only:
+        _predict_proba, _class_names = load_classifier(options.models_dir)
+
+
+def process_video(video_path):
+    """
+    Processando um vídeo completo no processo trabalhador.
+
+    Returns:
+        tuple: O caminho do vídeo, os frames lidos, os frames com mão
+               detectada e o tempo de processamento em segundos.
+    """
+    start = time.perf_counter()
+    name = output_name(video_path)
+    landmarks_path = os.path.join(_options.output, f"{name}_landmarks.csv")
+    predictions_path = os.path.join(_options.output, f"{name}_predictions.csv")
+    probas_path = os.path.join(_options.output, f"{name}_probas.npz")
+
+    # Reiniciando o rastreamento do MediaPipe entre vídeos independentes.
+    _hands.reset()
+
+    cap = cv2.VideoCapture(video_path)
+    if not cap.isOpened():
+        print(f"[ERRO] Não foi possível abrir o vídeo: {video_path}")
+        return video_path, 0, 0, 0.0
+
+    frames = 0
+    detected = 0
+    save_probas = _options.save_probas and not _options.landmarks_only
+    timestamps = []
+    probas = []
+    landmarks_file = open(landmarks_path, 'w', newline='')
+    predictions_file = None if _options.landmarks_only else open(predictions_path, 'w', newline='')
+    try:
+        landmarks_writer = csv.writer(landmarks_file)
+        if predictions_file is not None:
+            predictions_writer = csv.writer(predictions_file)
+            predictions_writer.writerow(["frame", "label", "confidence"])
+
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            # Espelhando os pixels como na captura, quando solicitado em vez dos landmarks.
+            if _options.flip_pixels and not _options.no_flip:
+                frame = _frame_buffers.flip(frame)
+            results = _hands.process(_frame_buffers.to_rgb(frame))
+
+            label, confidence = "", 0.0
+            prediction_proba = None
+            if results.multi_hand_landmarks:
+                hand_landmarks = results.multi_hand_landmarks[0]
+                coords = _landmark_buffer.fill(hand_landmarks).reshape(-1)
+                landmarks_writer.writerow(coords)
+                detected += 1
+
+                if predictions_file is not None:
+                    prediction_proba = _predict_proba(_normalize_frame(coords))[0]
+                    prediction_index = int(np.argmax(prediction_proba))
+                    label = _class_names[prediction_index]
+                    confidence = float(prediction_proba[prediction_index])
+
+            if predictions_file is not None:
+                predictions_writer.writerow([frames, label, f"{confidence:.4f}"])
+            if save_probas:
+                # Registrando o instante do frame no vídeo e NaN nos frames sem mão.
+                timestamps.append(cap.get(cv2.CAP_PROP_POS_MSEC) / 1000.0)
+                # Copiando, pois o motor reutiliza o buffer de saída a cada chamada.
+                probas.append(prediction_proba.copy() if prediction_proba is not None
+                              else np.full(len(_class_names), np.nan))
+            frames += 1
+    finally:
+        landmarks_file.close()
+        if predictions_file is not None:
+            predictions_file.close()
+        cap.release()
+
+    if save_probas and frames:
+        np.savez(probas_path, timestamps=np.asarray(timestamps), probas=np.asarray(probas, dtype=np.float32),
+                 classes=np.asarray(_class_names))
+    return video_path, frames, detected, time.perf_counter() - start
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Processamento offline em lote de vídeos gravados")
+    parser.add_argument("inputs", nargs="+", help="Arquivos de vídeo ou diretórios contendo vídeos")
+    parser.add_argument("--output", default="data/batch", help="Diretório de saída dos CSVs")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Quantidade de processos")
+    parser.add_argument("--landmarks-only", action="store_true", help="Extraindo apenas os landmarks, sem classificar")
+    parser.add_argument("--save-probas", action="store_true", help="Gravando o fluxo de probabilidades de cada vídeo")
+    parser.add_argument("--no-flip", action="store_true", help="Desativando o espelhamento horizontal dos frames")
+    parser.add_argument("--flip-pixels", action="store_true",
+                        help="Espelhando os pixels de cada frame, como na captura, em vez das coordenadas dos landmarks")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    videos = find_videos(args.inputs)
+    if not videos:
+        raise SystemExit("[ERRO] Nenhum vídeo encontrado nas entradas informadas")
+    # Interrompendo antes do processamento, pois vídeos de mesmo nome sobrescreveriam as saídas uns dos outros.
+    collisions = find_collisions(videos)
+    if collisions:
+        for name, paths in collisions.items():
+            print(f"[ERRO] Saída '{name}' compartilhada por: {', '.join(paths)}")
+        raise SystemExit("[ERRO] Renomeie os vídeos ou processe-os em execuções com diretórios de saída distintos")
+
+    os.makedirs(args.output, exist_ok=True)
+    workers = max(1, min(args.workers, len(videos)))
+    print(f"[INFO] Processando {len(videos)} vídeo(s) com {workers} processo(s)")
+
+    start = time.perf_counter()
+    total_frames = 0
+    total_detected = 0
+    with Pool(workers, initializer=_init_worker, initargs=(args,)) as pool:
+        for video_path, frames, detected, elapsed in pool.imap_unordered(process_video, videos):
+            total_frames += frames
+            total_detected += detected
+            fps = frames / elapsed if elapsed > 0 else 0.0
+            print(f"[INFO] {video_path}: {frames} frames, {detected} com mão, {fps:.1f} frames/s")
+
+    elapsed = time.perf_counter() - start
+    print("-" * 30)
+    print(f"[RESULTADO] {total_frames} frames ({total_detected} com mão) em {elapsed:.1f}s")
+    print(f"[RESULTADO] Vazão: {total_frames / elapsed:.1f} frames/s com {workers} processo(s)")
@@ -0,0 +1,346 @@
+# -*- coding: utf-8 -*-
+"""
+Benchmark de Latência por Estágio do Reconhecimento
+
+Este script mede, sem webcam, cada estágio do laço de inferência do predict.py
+de forma isolada e de ponta a ponta, sobre um corpus sintético ou gravado de
+frames e landmarks, reportando os percentis p50/p95/p99 e a vazão. Os
+resultados são salvos em JSON e podem ser comparados com uma execução anterior
+para detectar regressões.
+
+Uso:
+    python src/benchmark.py
+    python src/benchmark.py --video sessao.mp4 --landmarks data/landmarks/A.f32
+    python src/benchmark.py --compare benchmarks/anterior.json
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import time
+import tracemalloc
+
+import cv2
+import mediapipe as mp
+import numpy as np
+from mediapipe.framework.formats import landmark_pb2
+
+from dataset import read_landmark_file
+from display import render
+from engine import ENGINE_PATH, MODELS_DIR, MLPEngine
+from features import N_FEATURES, N_LANDMARKS, FrameNormalizer
+from frames import FrameBuffers, LandmarkBuffer
+from metrics import Metrics, NullMetrics
+from recognition import SignRecognizer
+
+# Diretório padrão dos resultados em JSON.
+RESULTS_DIR = "benchmarks"
+# Taxa de quadros simulada para o relógio da votação.
+SIMULATED_FPS = 30.0
+
+
+def time_calls(fn, n_calls, warmup=10):
+    """
+    Medindo a latência de cada chamada individualmente.
+
+    A função recebe o índice da chamada, usado para percorrer o corpus.
+
+    Returns:
+        np.ndarray: As latências em segundos.
+    """
+    for i in range(warmup):
+        fn(i)
+    samples = np.empty(n_calls)
+    for i in range(n_calls):
+        start = time.perf_counter()
+        fn(i)
+        samples[i] = time.perf_counter() - start
+    return samples
+
+
+def allocated_per_call(fn, n_calls, warmup=10):
+    """
+    Medindo, com o tracemalloc, o pico de memória alocada durante cada chamada,
+    incluindo os arrays temporários já liberados ao final dela.
+
+    Returns:
+        float: O pico médio alocado por chamada, em KB.
+    """
+    for i in range(warmup):
+        fn(i)
+    tracemalloc.start()
+    total = 0
+    try:
+        for i in range(n_calls):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            fn(i)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / n_calls / 1024
+
+
+def summarize(samples):
+    """Resumindo as latências em percentis (microssegundos) e vazão."""
+    p50, p95, p99 = np.percentile(samples * 1e6, [50, 95, 99])
+    return {
+        "calls": int(len(samples)),
+        "mean_us": float(samples.mean() * 1e6),
+        "p50_us": float(p50),
+        "p95_us": float(p95),
+        "p99_us": float(p99),
+        "throughput_per_s": float(len(samples) / samples.sum()) if samples.sum() > 0 else 0.0,
+    }
+
+
+def load_frames(video, count, width, height, seed):
+    """Lendo frames de um vídeo gravado ou gerando frames sintéticos."""
+    if video:
+        cap = cv2.VideoCapture(video)
+        frames = []
+        while len(frames) < count:
+            ret, frame = cap.read()
+            if not ret:
+                break
+            frames.append(frame)
+        cap.release()
+        if not frames:
+            raise SystemExit(f"[ERRO] Nenhum frame lido do vídeo: {video}")
+        return frames
+    rng = np.random.default_rng(seed)
+    return [rng.integers(0, 256, (height, width, 3), dtype=np.uint8) for _ in range(count)]
+
+
+def load_landmarks(path, count, seed):
+    """
+    Lendo landmarks brutos de um arquivo do dataset ou gerando mãos sintéticas
+    com o pulso abaixo dos demais pontos, como nas coordenadas do MediaPipe.
+    """
+    if path:
+        coords = np.asarray(read_landmark_file(path), dtype=np.float64)
+        return coords[:count]
+    rng = np.random.default_rng(seed)
+    hand = rng.uniform(-0.15, 0.15, (N_LANDMARKS, 3))
+    hand[0] = 0.0
+    hand[:, 1] -= 0.1
+    offsets = rng.uniform(0.3, 0.7, (count, 1, 3)) * [1, 1, 0]
+    noise = rng.normal(0, 0.01, (count, N_LANDMARKS, 3))
+    return (hand + offsets + noise).reshape(count, N_FEATURES)
+
+
+def to_landmark_lists(coords):
+    """Convertendo coordenadas nos objetos de landmarks retornados pelo MediaPipe."""
+    lists = []
+    for row in coords.reshape(-1, N_LANDMARKS, 3):
+        landmark_list = landmark_pb2.NormalizedLandmarkList()
+        for x, y, z in row:
+            landmark_list.landmark.add(x=x, y=y, z=z)
+        lists.append(landmark_list)
+    return lists
+
+
+def run_stages(args):
+    """Executando cada estágio isoladamente e o laço completo de ponta a ponta."""
+    frames = load_frames(args.video, args.frames, args.width, args.height, args.seed)
+    coords = load_landmarks(args.landmarks, args.frames, args.seed)
+    landmark_lists = to_landmark_lists(coords)
+    n_frames, n_coords = len(frames), len(coords)
+
+    normalize_frame = FrameNormalizer()
+    normalized = np.vstack([normalize_frame(row) for row in coords])
+
+    # Carregando os artefatos disponíveis, ignorando os estágios sem modelo.
+    model = scaler = engine = None
+    model_path = os.path.join(args.models_dir, "librasign_mlp.pkl")
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(args.models_dir, "scaler.pkl"), 'rb') as f:
+            scaler = pickle.load(f)
+    engine_path = os.path.join(args.models_dir, os.path.basename(ENGINE_PATH))
+    if os.path.exists(engine_path):
+        engine = MLPEngine.load(engine_path)
+    if engine is None and model is None:
+        print(f"[AVISO] Nenhum modelo encontrado em '{args.models_dir}', estágios de classificação ignorados")
+
+    hands = mp.solutions.hands.Hands(
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+
+    flipped = [cv2.flip(frame, 1) for frame in frames]
+    rgb_frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2RGB) for frame in flipped]
+    for image in rgb_frames:
+        image.flags.writeable = False
+
+    # Gerando probabilidades para a votação, a partir do modelo quando disponível.
+    if engine is not None:
+        probas = engine.predict_proba(normalized).copy()
+        class_names = engine.classes if engine.classes is not None else np.arange(probas.shape[1]).astype(str)
+    elif model is not None:
+        probas = model.predict_proba(scaler.transform(normalized))
+        class_names = np.load(os.path.join(args.models_dir, "classes.npy"))
+    else:
+        rng = np.random.default_rng(args.seed)
+        probas = rng.dirichlet(np.full(27, 0.1), n_coords)
+        class_names = np.arange(27).astype(str)
+
+    stages = {}
+    calls = args.calls
+    frame_buffers = FrameBuffers()
+    landmark_buffer = LandmarkBuffer()
+
+    # Comparando a alocação de novos arrays a cada frame com os buffers reaproveitados.
+    preparations = {
+        "flip": lambda i: cv2.flip(frames[i % n_frames], 1),
+        "flip.buffer": lambda i: frame_buffers.flip(frames[i % n_frames]),
+        "cvtColor": lambda i: cv2.cvtColor(flipped[i % n_frames], cv2.COLOR_BGR2RGB),
+        "cvtColor.buffer": lambda i: frame_buffers.to_rgb(flipped[i % n_frames]),
+        "prepare": lambda i: cv2.cvtColor(cv2.flip(frames[i % n_frames], 1), cv2.COLOR_BGR2RGB),
+        "prepare.buffer": lambda i: frame_buffers.to_rgb(frame_buffers.flip(frames[i % n_frames])),
+        "prepare.mirror": lambda i: frame_buffers.to_rgb(frames[i % n_frames]),
+        "extract": lambda i: np.array([[lm.x, lm.y, lm.z] for lm in landmark_lists[i % n_coords].landmark]).flatten(),
+        "extract.buffer": lambda i: landmark_buffer.fill(landmark_lists[i % n_coords]),
+    }
+    allocations = {}
+    for name, fn in preparations.items():
+        stages[name] = time_calls(fn, calls)
+        allocations[name] = allocated_per_call(fn, min(calls, 200))
+    stages["hands.process"] = time_calls(lambda i: hands.process(rgb_frames[i % n_frames]), args.mp_calls, warmup=3)
+    stages["normalize"] = time_calls(lambda i: normalize_frame(coords[i % n_coords]), calls)
+
+    rows = [normalized[i:i + 1] for i in range(n_coords)]
+    if scaler is not None:
+        scaled = [scaler.transform(row) for row in rows]
+        stages["scaler.transform"] = time_calls(lambda i: scaler.transform(rows[i % n_coords]), calls)
+        stages["predict_proba"] = time_calls(lambda i: model.predict_proba(scaled[i % n_coords]), calls)
+    if engine is not None:
+        stages["engine.predict_proba"] = time_calls(lambda i: engine.predict_proba(rows[i % n_coords]), calls)
+
+    recognizer = SignRecognizer(class_names)
+    stages["vote"] = time_calls(lambda i: recognizer.update(probas[i % n_coords], i / SIMULATED_FPS), calls)
+
+    # Medindo o custo por frame das chamadas de instrumentação do predict.py.
+    for name, metrics in (("metrics.disabled", NullMetrics()), ("metrics.enabled", Metrics())):
+        def instrument(i, metrics=metrics):
+            for stage in ("flip", "cvtColor", "mediapipe", "classificador"):
+                metrics.record(stage, metrics.clock())
+            metrics.observe(recognizer, True, recognizer.letter_confirmed, i / SIMULATED_FPS)
+        stages[name] = time_calls(instrument, calls)
+
+    canvas = frames[0].copy()
+    state = recognizer.snapshot()
+    stages["draw"] = time_calls(lambda i: render(canvas, landmark_lists[i % n_coords], state, i / SIMULATED_FPS), calls)
+
+    # Encadeando todos os estágios, considerando uma mão presente em todos os frames.
+    if engine is not None:
+        classify = engine.predict_proba
+    elif model is not None:
+        def classify(row):
+            return model.predict_proba(scaler.transform(row))
+    else:
+        classify = None
+    end_to_end_recognizer = SignRecognizer(class_names)
+
+    def end_to_end(i):
+        frame = frame_buffers.flip(frames[i % n_frames])
+        hands.process(frame_buffers.to_rgb(frame))
+        landmark_list = landmark_lists[i % n_coords]
+        row = normalize_frame(landmark_buffer.fill(landmark_list))
+        proba = classify(row) if classify is not None else probas[i % n_coords]
+        end_to_end_recognizer.update(proba, i / SIMULATED_FPS)
+        render(frame, landmark_list, end_to_end_recognizer.snapshot(), i / SIMULATED_FPS)
+
+    stages["end_to_end"] = time_calls(end_to_end, args.mp_calls, warmup=3)
+    hands.close()
+
+    return {name: summarize(samples) for name, samples in stages.items()}, allocations
+
+
+def print_results(results):
+    print(f"{'estágio':<22}{'p50 (us)':>12}{'p95 (us)':>12}{'p99 (us)':>12}{'vazão (/s)':>14}")
+    for name, summary in results.items():
+        print(f"{name:<22}{summary['p50_us']:>12.1f}{summary['p95_us']:>12.1f}"
+              f"{summary['p99_us']:>12.1f}{summary['throughput_per_s']:>14.1f}")
+
+
+def print_allocations(allocations):
+    print(f"{'preparação':<22}{'alocado/frame (KB)':>20}")
+    for name, kb in allocations.items():
+        print(f"{name:<22}{kb:>20.1f}")
+
+
+def compare_results(results, baseline_path, tolerance):
+    """
+    Comparando o p50 de cada estágio com uma execução anterior.
+
+    Returns:
+        list: Os estágios cuja latência aumentou além da tolerância.
+    """
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)["results"]
+    regressions = []
+    print(f"[INFO] Comparando com '{baseline_path}'")
+    for name, summary in results.items():
+        if name not in baseline:
+            continue
+        before, after = baseline[name]["p50_us"], summary["p50_us"]
+        change = (after - before) / before if before > 0 else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  <-- REGRESSÃO"
+        print(f"{name:<22}{before:>12.1f} -> {after:>10.1f} us ({change * 100:+.1f}%){flag}")
+    return regressions
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de latência por estágio do reconhecimento")
+    parser.add_argument("--video", help="Vídeo gravado usado como corpus de frames")
+    parser.add_argument("--landmarks", help="Arquivo de landmarks (CSV ou .f32) usado como corpus")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+    parser.add_argument("--frames", type=int, default=100, help="Tamanho do corpus de frames e landmarks")
+    parser.add_argument("--width", type=int, default=640, help="Largura dos frames sintéticos")
+    parser.add_argument("--height", type=int, default=480, help="Altura dos frames sintéticos")
+    parser.add_argument("--calls", type=int, default=2000, help="Chamadas medidas por estágio leve")
+    parser.add_argument("--mp-calls", type=int, default=100, help="Chamadas medidas do MediaPipe e de ponta a ponta")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do corpus sintético")
+    parser.add_argument("--output", help="Arquivo JSON de saída dos resultados")
+    parser.add_argument("--compare", help="Arquivo JSON de uma execução anterior para comparação")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="Aumento relativo do p50 tolerado na comparação")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    print("[INFO] Executando benchmark por estágio")
+    results, allocations = run_stages(args)
+    print_results(results)
+    print_allocations(allocations)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "opencv": cv2.__version__,
+            "mediapipe": mp.__version__,
+            "corpus": {"video": args.video, "landmarks": args.landmarks, "frames": args.frames,
+                       "width": args.width, "height": args.height},
+        },
+        "results": results,
+        "allocations_kb": allocations,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"benchmark_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Resultados salvos em '{output}'")
+
+    if args.compare:
+        regressions = compare_results(results, args.compare, args.tolerance)
+        if regressions:
+            raise SystemExit(f"[ERRO] Regressão de latência em: {', '.join(regressions)}")
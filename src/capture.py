@@ -1,15 +1,24 @@
 # -*- coding: utf-8 -*-
+import argparse
 import cv2
 import mediapipe as mp
 import os
-import numpy as np
-import csv
+
+from coreset import LivePruner
+from features import FrameNormalizer
+from frames import FrameBuffers, LandmarkBuffer
+from store import LandmarkWriter, import_csv, open_landmarks, store_path
 
 # Diretório de saída para os dados de landmarks.
 DATA_DIR = "data/landmarks"
 # Limite de amostras por classe para evitar desbalanceamento.
 CAPTURE_LIMIT = 1000
 
+parser = argparse.ArgumentParser(description="Captura de landmarks rotulados pela webcam")
+parser.add_argument("--prune-threshold", type=float,
+                    help="Descartando amostras a até esta distância normalizada de uma já gravada da classe")
+args = parser.parse_args()
+
 # Inicializando a solução MediaPipe Hands com parâmetros de confiança.
 hands = mp.solutions.hands.Hands(
     static_image_mode=False,
@@ -36,6 +45,14 @@ cv2.namedWindow(WINDOW_NAME)
 is_capturing = False
 current_label = None
 capture_count = 0
+# Gravador binário da classe corrente, mantido aberto entre os frames.
+writer = None
+# Descartando quase duplicados da classe corrente, quando habilitado.
+pruner = None
+normalize_frame = FrameNormalizer()
+# Buffers reaproveitados pelo espelhamento, pela conversão de cores e pelos landmarks.
+frame_buffers = FrameBuffers()
+landmark_buffer = LandmarkBuffer()
 
 # Exibindo as instruções de uso no console.
 print("-" * 50)
@@ -55,15 +72,11 @@ while True:
         break
 
     # Espelhando o frame horizontalmente para efeito de espelho.
-    frame = cv2.flip(frame, 1)
+    frame = frame_buffers.flip(frame)
 
     # Convertendo o frame de BGR para RGB, formato esperado pelo MediaPipe.
-    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-
-    # Otimizando o desempenho ao processar a imagem por referência.
-    image_rgb.flags.writeable = False
+    image_rgb = frame_buffers.to_rgb(frame)
     results = hands.process(image_rgb)
-    image_rgb.flags.writeable = True
 
     # Verificando se landmarks de mão foram detectados.
     if results.multi_hand_landmarks:
@@ -76,21 +89,15 @@ while True:
         # Verificando se a captura está ativa e dentro do limite.
         if is_capturing and current_label and capture_count < CAPTURE_LIMIT:
             try:
-                # Extraindo e achatando as coordenadas (x, y, z) dos 21 landmarks.
-                coords = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]).flatten()
+                # Extraindo as coordenadas (x, y, z) dos 21 landmarks.
+                coords = landmark_buffer.fill(hand_landmarks)
 
-                # Garantindo a existência do diretório de dados.
-                os.makedirs(DATA_DIR, exist_ok=True)
-                csv_path = os.path.join(DATA_DIR, f"{current_label}.csv")
+                # Acrescentando o vetor de coordenadas ao buffer do gravador, exceto quase duplicados.
+                if pruner is None or pruner.accept(normalize_frame(coords)):
+                    writer.append(coords)
 
-                # Abrindo o arquivo CSV em modo 'append' para adicionar novas amostras.
-                with open(csv_path, 'a', newline='') as f:
-                    writer = csv.writer(f)
-                    # Escrevendo o vetor de coordenadas.
-                    writer.writerow(coords)
-
-                # Incrementando o contador de amostras da classe.
-                capture_count += 1
+                    # Incrementando o contador de amostras da classe.
+                    capture_count += 1
             except Exception as e:
                 print(f"[ERRO] Falha ao salvar os dados: {e}")
 
@@ -103,6 +110,8 @@ while True:
             status_text = f"GRAVANDO '{current_label}' ({capture_count}/{CAPTURE_LIMIT})"
         else:
             status_text = f"PAUSADO '{current_label}' ({capture_count}/{CAPTURE_LIMIT})"
+        if pruner is not None:
+            status_text += f" descartadas: {pruner.rejected}"
     else:
         status_text = "Ocioso, escolha uma letra para iniciar"
 
@@ -122,18 +131,36 @@ while True:
         if current_label:
             # Alternando o estado de captura.
             is_capturing = not is_capturing
+            # Gravando as amostras pendentes ao pausar.
+            if not is_capturing:
+                writer.flush()
     # Tecla de letra (A-Z) ou '0' para iniciar a captura.
     elif (ord('a') <= key <= ord('z')) or (ord('A') <= key <= ord('Z')) or (key == ord('0')):
         label_name = "nenhum" if key == ord('0') else chr(key).upper()
+        # Gravando as amostras pendentes da classe anterior antes de trocar.
+        if writer is not None:
+            writer.close()
         current_label = label_name
+
+        # Migrando para o formato binário um CSV existente da mesma classe.
+        path = store_path(DATA_DIR, current_label)
         csv_path = os.path.join(DATA_DIR, f"{current_label}.csv")
+        if not os.path.exists(path) and os.path.exists(csv_path):
+            import_csv(csv_path, path)
 
-        # Verificando a contagem de amostras existentes para a classe.
+        # Obtendo a contagem de amostras existentes a partir do cabeçalho.
         try:
-            with open(csv_path, 'r') as f:
-                capture_count = sum(1 for _ in f)
-        except FileNotFoundError:
-            capture_count = 0
+            writer = LandmarkWriter(path)
+            capture_count = writer.count
+        except Exception as e:
+            print(f"[ERRO] Falha ao abrir o arquivo de dados: {e}")
+            writer = None
+            current_label = None
+            continue
+
+        # Comparando as novas amostras também com as já gravadas da classe.
+        if args.prune_threshold is not None:
+            pruner = LivePruner(args.prune_threshold, existing=open_landmarks(path))
 
         if capture_count < CAPTURE_LIMIT:
             is_capturing = True
@@ -144,6 +171,8 @@ while True:
 
 # Liberando os recursos ao final da execução.
 print("[INFO] Encerrando aplicação")
+if writer is not None:
+    writer.close()
 hands.close()
 cap.release()
 cv2.destroyAllWindows()
\ No newline at end of file
@@ -0,0 +1,246 @@
+# -*- coding: utf-8 -*-
+"""
+Primeiro Estágio da Cascata de Classificadores
+
+Durante uma letra mantida, a maioria dos frames é fácil e não precisa da
+propagação completa do MLP. Este módulo treina um classificador linear
+(regressão logística multinomial sobre os landmarks normalizados), que custa
+uma única multiplicação de matrizes, e calibra nos folds da validação cruzada
+o limiar de margem entre os dois maiores logits a partir do qual ele responde
+sozinho: o menor limiar cuja acurácia da cascata fica a até
+`CASCADE_TOLERANCE` da acurácia do MLP. Além da margem, a maior probabilidade
+do primeiro estágio precisa atingir a confiança mínima do SignRecognizer, para
+que os frames resolvidos sem o MLP não virem votos descartados na suavização.
+
+O primeiro estágio é exportado em `models/cascade.npz`, no formato do motor
+NumPy, com a padronização incorporada aos pesos, e usado pelo predict.py com
+`--cascade`. Executado diretamente, compara o MLP e a cascata sobre um
+diretório de landmarks:
+    python src/cascade.py data/landmarks
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from engine import CASCADE_FILE, MODELS_DIR, CascadeClassifier, load_classifier, model_fingerprint
+from features import N_FEATURES
+from recognition import CONFIDENCE_THRESHOLD
+
+# Perda máxima de acurácia, em relação ao MLP, aceita na calibração do limiar.
+CASCADE_TOLERANCE = 0.002
+# Quantis das margens observadas avaliados como limiar na calibração.
+CANDIDATE_QUANTILES = np.linspace(0.0, 1.0, 201)
+# Rodadas alternadas da medição de latência.
+BENCHMARK_ROUNDS = 3
+# Iterações máximas do otimizador da regressão logística.
+FIRST_STAGE_MAX_ITER = 300
+
+
+def fit_first_stage(X, y, copy=True):
+    """
+    Treinando o classificador linear do primeiro estágio, padronizando uma
+    cópia das amostras ou, sem `copy`, o próprio array float32 informado.
+
+    Returns:
+        tuple: O modelo e o StandardScaler ajustado às amostras.
+    """
+    from sklearn.linear_model import LogisticRegression
+    from train import fit_scaler, standardize_inplace
+
+    scaler = fit_scaler(X)
+    model = LogisticRegression(max_iter=FIRST_STAGE_MAX_ITER)
+    model.fit(standardize_inplace(np.array(X, dtype=np.float32) if copy else X, scaler), y)
+    return model, scaler
+
+
+def first_stage_margins(scores):
+    """
+    Retornando a classe prevista, a margem entre os dois maiores logits e a
+    maior probabilidade do softmax, a partir da `decision_function` da
+    regressão logística.
+    """
+    if scores.ndim == 1:
+        # No caso binário, a margem entre os logits (-z/2, z/2) é |z|.
+        margins = np.abs(scores)
+        return (scores > 0).astype(np.intp), margins, 1.0 / (1.0 + np.exp(-margins))
+    top = scores.max(axis=1, keepdims=True)
+    top2 = np.partition(scores, -2, axis=1)[:, -2:]
+    return np.argmax(scores, axis=1), top2[:, 1] - top2[:, 0], 1.0 / np.exp(scores - top).sum(axis=1)
+
+
+def fit_stage_fold(shared_dir, train_index, test_index):
+    """
+    Treinando o primeiro estágio em uma partição da validação cruzada.
+
+    Returns:
+        tuple: As classes previstas, as margens e as maiores probabilidades no conjunto de teste.
+    """
+    from dataset import open_dataset
+    from train import standardize_inplace
+
+    X, y, _ = open_dataset(shared_dir)
+    model, scaler = fit_first_stage(X[train_index], y[train_index], copy=False)
+    return first_stage_margins(model.decision_function(standardize_inplace(X[test_index], scaler)))
+
+
+def calibrate_threshold(y_true, mlp_pred, stage_pred, margins, confident=None, tolerance=CASCADE_TOLERANCE):
+    """
+    Escolhendo o menor limiar de margem cuja acurácia da cascata, nas
+    predições fora do fold, fica a até `tolerance` da acurácia do MLP.
+    Com `confident`, apenas as amostras marcadas podem ser resolvidas no
+    primeiro estágio, como na inferência.
+
+    Returns:
+        tuple: O limiar, a fração resolvida no primeiro estágio e a acurácia da cascata.
+    """
+    mlp_correct = mlp_pred == y_true
+    stage_correct = stage_pred == y_true
+    target = mlp_correct.mean() - tolerance
+    # Avaliando os limiares do menor para o maior, com o infinito como último recurso.
+    candidates = np.append(np.unique(np.quantile(margins, CANDIDATE_QUANTILES)), np.inf)
+    for threshold in candidates:
+        accept = margins >= threshold
+        if confident is not None:
+            accept &= confident
+        accuracy = np.where(accept, stage_correct, mlp_correct).mean()
+        if accuracy >= target:
+            break
+    return float(threshold), float(accept.mean()), float(accuracy)
+
+
+def export_first_stage(model, scaler, threshold, path, classes=None, fingerprint=None,
+                       confidence=CONFIDENCE_THRESHOLD):
+    """
+    Exportando o classificador linear no formato do motor NumPy, com a
+    padronização incorporada aos pesos, o limiar calibrado, a confiança
+    mínima das respostas antecipadas e a identificação do MLP usado na
+    calibração.
+    """
+    coef, intercept = model.coef_, model.intercept_
+    if coef.shape[0] == 1:
+        # Expandindo o caso binário para dois logits (-z/2, z/2), com o mesmo softmax.
+        coef = np.vstack([-coef / 2, coef / 2])
+        intercept = np.array([-intercept[0] / 2, intercept[0] / 2])
+    W = coef.T / scaler.scale_[:, None]
+    b = intercept - (scaler.mean_ / scaler.scale_) @ coef.T
+    arrays = {
+        "hidden_activation": np.array("identity"),
+        "out_activation": np.array("softmax"),
+        "coef_0": W.astype(np.float32),
+        "intercept_0": b.astype(np.float32),
+        "threshold": np.array(threshold),
+        "confidence": np.array(confidence),
+    }
+    if classes is not None:
+        arrays["classes"] = np.asarray(classes)
+    if fingerprint is not None:
+        arrays["fingerprint"] = np.array(fingerprint)
+    # Gravando de forma atômica, antes dos demais artefatos do treinamento.
+    temp_path = path + ".tmp.npz"
+    np.savez(temp_path, **arrays)
+    os.replace(temp_path, path)
+    return path
+
+
+def train_cascade(executor, shared_dir, folds, fold_predictions, models_dir=MODELS_DIR, mlp_future=None):
+    """
+    Calibrando o limiar nos folds da validação cruzada, com as predições do MLP
+    já calculadas, e exportando o primeiro estágio treinado com todo o dataset.
+
+    Args:
+        mlp_future: O treinamento do MLP final, cuja identificação é gravada com a cascata.
+    """
+    from dataset import open_dataset
+
+    stage_futures = [executor.submit(fit_stage_fold, shared_dir, train_index, test_index)
+                     for train_index, test_index in folds]
+    final_future = executor.submit(_fit_final_stage, shared_dir)
+
+    y_true = np.concatenate([y_test for y_test, _ in fold_predictions])
+    mlp_pred = np.concatenate([y_pred for _, y_pred in fold_predictions])
+    stage_pred = np.concatenate([future.result()[0] for future in stage_futures])
+    margins = np.concatenate([future.result()[1] for future in stage_futures])
+    # Restringindo as respostas antecipadas às confiantes o bastante para votar no SignRecognizer.
+    confident = np.concatenate([future.result()[2] for future in stage_futures]) >= CONFIDENCE_THRESHOLD
+
+    threshold, early_rate, accuracy = calibrate_threshold(y_true, mlp_pred, stage_pred, margins, confident)
+    print(f"[RESULTADO] Cascata: limiar de margem {threshold:.3f}, {early_rate * 100:.1f}% das amostras "
+          f"resolvidas no primeiro estágio")
+    print(f"[RESULTADO] Cascata: acurácia {accuracy * 100:.2f}% frente a {np.mean(mlp_pred == y_true) * 100:.2f}% "
+          f"do MLP (primeiro estágio sozinho: {np.mean(stage_pred == y_true) * 100:.2f}%)")
+
+    model, scaler = final_future.result()
+    _, _, classes = open_dataset(shared_dir)
+    fingerprint = None if mlp_future is None else model_fingerprint(*mlp_future.result(), classes)
+    return export_first_stage(model, scaler, threshold, os.path.join(models_dir, CASCADE_FILE), classes,
+                              fingerprint)
+
+
+def _fit_final_stage(shared_dir):
+    from dataset import open_dataset
+
+    X, y, _ = open_dataset(shared_dir)
+    return fit_first_stage(X, y)
+
+
+def _time_per_frame(predict_proba, X):
+    # Medindo a latência média com um frame por chamada, como no laço de inferência.
+    predicted = np.empty(len(X), dtype=np.intp)
+    start = time.perf_counter()
+    for i in range(len(X)):
+        predicted[i] = np.argmax(predict_proba(X[i:i + 1]))
+    return (time.perf_counter() - start) / len(X) * 1e6, predicted
+
+
+def benchmark(data_dir, models_dir, limit):
+    """Comparando latência por frame e acurácia do MLP e da cascata."""
+    from dataset import load_dataset
+    from features import normalize_landmarks
+
+    mlp, class_names = load_classifier(models_dir)
+    cascade_path = os.path.join(models_dir, CASCADE_FILE)
+    if not os.path.exists(cascade_path):
+        raise SystemExit(f"[ERRO] Arquivo '{cascade_path}' ausente, execute o treinamento com --cascade")
+    cascade = CascadeClassifier.load(cascade_path, mlp)
+
+    X_raw, y_raw = load_dataset(data_dir)
+    X = normalize_landmarks(X_raw, out=X_raw)
+    # Seguindo a ordem de captura, limitada a uma amostra espaçada dos arquivos.
+    step = max(1, len(X) // limit) if limit else 1
+    X, y_raw = X[::step], np.asarray(y_raw)[::step]
+    y = np.searchsorted(class_names, y_raw)
+    warm = np.zeros((1, N_FEATURES), dtype=np.float32)
+    mlp(warm)
+    cascade.predict_proba(warm)
+    cascade.early = cascade.total = 0
+
+    # Alternando as medições e mantendo a menor, menos sensível a ruído do sistema.
+    mlp_us = cascade_us = np.inf
+    for _ in range(BENCHMARK_ROUNDS):
+        elapsed, mlp_pred = _time_per_frame(mlp, X)
+        mlp_us = min(mlp_us, elapsed)
+        elapsed, cascade_pred = _time_per_frame(cascade.predict_proba, X)
+        cascade_us = min(cascade_us, elapsed)
+    mlp_accuracy = np.mean(mlp_pred == y)
+    cascade_accuracy = np.mean(cascade_pred == y)
+    print(f"[INFO] {len(X)} frames, limiar de margem {cascade.threshold:.3f}, confiança mínima {cascade.confidence:.2f}")
+    print(f"[RESULTADO] Resolvidos no primeiro estágio: {cascade.early_rate * 100:.1f}%")
+    print(f"[RESULTADO] Latência por frame: MLP {mlp_us:.1f} us, cascata {cascade_us:.1f} us "
+          f"({mlp_us / cascade_us:.2f}x)")
+    print(f"[RESULTADO] Acurácia: MLP {mlp_accuracy * 100:.2f}%, cascata {cascade_accuracy * 100:.2f}% "
+          f"({(cascade_accuracy - mlp_accuracy) * 100:+.2f} p.p.)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Comparação entre o MLP e a cascata de classificadores")
+    parser.add_argument("data_dir", help="Diretório de landmarks rotulados")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+    parser.add_argument("--limit", type=int, default=20000, help="Máximo de frames avaliados")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    benchmark(args.data_dir, args.models_dir, args.limit)
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+Redução do Dataset por Remoção de Amostras Quase Duplicadas
+
+A captura grava frames consecutivos da câmera, e a maior parte das amostras de
+uma mesma classe difere apenas pelo ruído do MediaPipe. Este módulo seleciona,
+por classe, um subconjunto em que nenhuma amostra mantida fica a menos de um
+raio de outra, no espaço dos landmarks normalizados, usando uma KD-tree:
+    - com `threshold`, o raio é fixo;
+    - com `budget`, o raio é ajustado por busca binária até que o subconjunto
+      caiba no orçamento de amostras por classe.
+
+Cada amostra mantida pode receber como peso a quantidade de amostras que ela
+representa, permitindo reduzir o peso dos duplicados em vez de descartá-los.
+
+A redução pode ser aplicada durante a captura (`LivePruner`) ou sobre um
+diretório existente, e o seu efeito avaliado por validação cruzada:
+    python src/coreset.py prune data/landmarks --output data/landmarks_reduzido --threshold 0.1
+    python src/coreset.py evaluate data/landmarks --budget 300
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import KDTree
+
+from dataset import list_landmark_files, read_landmark_file
+from features import N_FEATURES, normalize_landmarks
+from store import STORE_EXTENSION, LandmarkWriter
+
+# Raio padrão, em unidades normalizadas (distância entre o pulso e a base do dedo médio).
+PRUNE_THRESHOLD = 0.1
+# Iterações da busca binária pelo raio que atende ao orçamento.
+BUDGET_ITERATIONS = 20
+# Amostras acumuladas fora da KD-tree antes de reconstruí-la na captura.
+REBUILD_EVERY = 64
+
+
+def greedy_cover(X, radius):
+    """
+    Selecionando amostras na ordem original, descartando as que estiverem a
+    até `radius` de uma amostra já selecionada.
+
+    Returns:
+        tuple: Os índices mantidos e a quantidade de amostras que cada um representa.
+    """
+    if len(X) == 0:
+        return np.empty(0, dtype=np.intp), np.empty(0)
+    tree = KDTree(X)
+    covered = np.zeros(len(X), dtype=bool)
+    keep = []
+    weights = []
+    for i in range(len(X)):
+        if covered[i]:
+            continue
+        # Marcando como representadas as amostras ainda livres na vizinhança.
+        neighbors = tree.query_radius(X[i:i + 1], r=radius)[0]
+        neighbors = neighbors[~covered[neighbors]]
+        covered[neighbors] = True
+        keep.append(i)
+        weights.append(len(neighbors))
+    return np.asarray(keep, dtype=np.intp), np.asarray(weights, dtype=np.float64)
+
+
+def prune_class(X, threshold=None, budget=None):
+    """
+    Reduzindo as amostras normalizadas de uma classe por raio fixo ou até o
+    orçamento informado.
+
+    Returns:
+        tuple: Os índices mantidos e os pesos correspondentes.
+    """
+    if budget is None:
+        return greedy_cover(X, threshold if threshold is not None else PRUNE_THRESHOLD)
+    if len(X) <= budget:
+        return np.arange(len(X)), np.ones(len(X))
+
+    # Buscando o menor raio cujo subconjunto cabe no orçamento.
+    low, high = 0.0, float(np.linalg.norm(X.max(axis=0) - X.min(axis=0)))
+    best = greedy_cover(X, high)
+    for _ in range(BUDGET_ITERATIONS):
+        middle = (low + high) / 2
+        keep, weights = greedy_cover(X, middle)
+        if len(keep) <= budget:
+            high, best = middle, (keep, weights)
+        else:
+            low = middle
+    return best
+
+
+def prune_dataset(X, y, threshold=None, budget=None):
+    """Aplicando a redução separadamente a cada classe, retornando índices globais e pesos."""
+    keep = []
+    weights = []
+    for label in np.unique(y):
+        indices = np.flatnonzero(y == label)
+        class_keep, class_weights = prune_class(X[indices], threshold, budget)
+        keep.append(indices[class_keep])
+        weights.append(class_weights)
+    order = np.argsort(np.concatenate(keep), kind="stable")
+    return np.concatenate(keep)[order], np.concatenate(weights)[order]
+
+
+class LivePruner:
+    """
+    Descartando, durante a captura, amostras a até `threshold` de uma amostra
+    já aceita. As amostras recentes são comparadas diretamente, e a KD-tree
+    é reconstruída a cada `rebuild_every` aceitas.
+    """
+
+    def __init__(self, threshold=PRUNE_THRESHOLD, existing=None, rebuild_every=REBUILD_EVERY):
+        self.threshold = threshold
+        self.rebuild_every = rebuild_every
+        self.rejected = 0
+        self._samples = np.empty((0, N_FEATURES), dtype=np.float32)
+        self._count = 0
+        self._indexed = 0
+        self._tree = None
+        if existing is not None and len(existing):
+            # Indexando de uma vez as amostras já gravadas da classe.
+            self._samples = normalize_landmarks(existing)
+            self._count = self._indexed = len(self._samples)
+            self._tree = KDTree(self._samples)
+
+    def _append(self, features):
+        if self._count == len(self._samples):
+            grown = np.empty((max(256, 2 * len(self._samples)), N_FEATURES), dtype=np.float32)
+            grown[:self._count] = self._samples[:self._count]
+            self._samples = grown
+        self._samples[self._count] = features
+        self._count += 1
+        if self._count - self._indexed >= self.rebuild_every:
+            self._tree = KDTree(self._samples[:self._count])
+            self._indexed = self._count
+
+    def accept(self, features):
+        """Retornando se a amostra normalizada deve ser gravada, registrando-a se sim."""
+        features = np.ravel(features)
+        if self._tree is not None and self._tree.query_radius(features[None], r=self.threshold, count_only=True)[0]:
+            self.rejected += 1
+            return False
+        recent = self._samples[self._indexed:self._count]
+        if len(recent):
+            diff = recent - features
+            if np.einsum('ij,ij->i', diff, diff).min() <= self.threshold ** 2:
+                self.rejected += 1
+                return False
+        self._append(features)
+        return True
+
+
+def write_landmarks(path, rows):
+    """Gravando linhas brutas no mesmo formato (CSV ou binário) do arquivo de origem."""
+    if path.endswith(STORE_EXTENSION):
+        if os.path.exists(path):
+            os.remove(path)
+        with LandmarkWriter(path) as writer:
+            writer.extend(rows)
+    else:
+        pd.DataFrame(rows).to_csv(path, header=False, index=False)
+
+
+def prune_directory(data_dir, output_dir, threshold=None, budget=None):
+    """Reduzindo cada arquivo de classe do diretório e gravando o resultado em `output_dir`."""
+    os.makedirs(output_dir, exist_ok=True)
+    total_before = total_after = bytes_before = bytes_after = 0
+    for label, path in list_landmark_files(data_dir).items():
+        raw = np.asarray(read_landmark_file(path))
+        keep, _ = prune_class(normalize_landmarks(raw), threshold, budget)
+        output_path = os.path.join(output_dir, os.path.basename(path))
+        write_landmarks(output_path, raw[keep])
+
+        total_before += len(raw)
+        total_after += len(keep)
+        bytes_before += os.path.getsize(path)
+        bytes_after += os.path.getsize(output_path)
+        print(f"[INFO] {label}: {len(raw)} -> {len(keep)} amostras")
+
+    print("-" * 30)
+    print(f"[RESULTADO] Amostras: {total_before} -> {total_after} "
+          f"({(1 - total_after / max(total_before, 1)) * 100:.1f}% de redução)")
+    print(f"[RESULTADO] Tamanho em disco: {bytes_before / 1e6:.2f} MB -> {bytes_after / 1e6:.2f} MB")
+
+
+def evaluate(data_dir, threshold=None, budget=None, weighted=False, n_splits=None):
+    """
+    Comparando, em cada fold da validação cruzada, o treinamento com todas as
+    amostras e com o subconjunto reduzido do conjunto de treinamento, ambos
+    avaliados no fold de teste completo.
+    """
+    from sklearn.model_selection import StratifiedKFold
+    from sklearn.preprocessing import LabelEncoder
+
+    from dataset import load_dataset
+    from train import DEFAULT_PARAMS, N_SPLITS, RANDOM_STATE, fit_fold, share_dataset
+
+    X_raw, y_raw = load_dataset(data_dir)
+    X = normalize_landmarks(X_raw)
+    encoder = LabelEncoder()
+    y = encoder.fit_transform(y_raw)
+    skf = StratifiedKFold(n_splits=n_splits or N_SPLITS, shuffle=True, random_state=RANDOM_STATE)
+
+    shared_dir = share_dataset(X, y, encoder.classes_, tempfile.mkdtemp(prefix="librasign_"))
+    rows = []
+    try:
+        for i, (train_index, test_index) in enumerate(skf.split(X, y)):
+            # Preservando a ordem de captura dentro do conjunto de treinamento.
+            train_index = np.sort(train_index)
+            start = time.perf_counter()
+            full_accuracy, _, _ = fit_fold(shared_dir, train_index, test_index, DEFAULT_PARAMS)
+            full_time = time.perf_counter() - start
+
+            keep, weights = prune_dataset(X[train_index], y[train_index], threshold, budget)
+            start = time.perf_counter()
+            pruned_accuracy, _, _ = fit_fold(shared_dir, train_index[keep], test_index, DEFAULT_PARAMS,
+                                             sample_weight=weights if weighted else None)
+            pruned_time = time.perf_counter() - start
+
+            rows.append((len(train_index), len(keep), full_time, pruned_time, full_accuracy, pruned_accuracy))
+            print(f"--- FOLD {i + 1} --- {len(train_index)} -> {len(keep)} amostras, "
+                  f"{full_time:.1f}s -> {pruned_time:.1f}s, "
+                  f"acurácia {full_accuracy * 100:.2f}% -> {pruned_accuracy * 100:.2f}%")
+    finally:
+        shutil.rmtree(shared_dir, ignore_errors=True)
+
+    n_full, n_pruned, t_full, t_pruned, acc_full, acc_pruned = np.asarray(rows).mean(axis=0)
+    print("-" * 30)
+    print(f"[RESULTADO] Amostras de treinamento: {n_full:.0f} -> {n_pruned:.0f} "
+          f"({(1 - n_pruned / n_full) * 100:.1f}% de redução)")
+    print(f"[RESULTADO] Tempo de treinamento: {t_full:.2f}s -> {t_pruned:.2f}s "
+          f"({(1 - t_pruned / t_full) * 100:.1f}% de redução)")
+    print(f"[RESULTADO] Acurácia média: {acc_full * 100:.2f}% -> {acc_pruned * 100:.2f}% "
+          f"({(acc_pruned - acc_full) * 100:+.2f} p.p.)")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Redução do dataset por remoção de quase duplicados")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    prune_parser = subparsers.add_parser("prune", help="Gravando uma cópia reduzida do diretório")
+    prune_parser.add_argument("data_dir", help="Diretório de landmarks rotulados")
+    prune_parser.add_argument("--output", required=True, help="Diretório de saída")
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Medindo o efeito da redução na validação cruzada")
+    evaluate_parser.add_argument("data_dir", help="Diretório de landmarks rotulados")
+    evaluate_parser.add_argument("--weighted", action="store_true",
+                                 help="Ponderando cada amostra mantida pela quantidade que ela representa")
+    evaluate_parser.add_argument("--folds", type=int, help="Quantidade de folds")
+
+    for subparser in (prune_parser, evaluate_parser):
+        group = subparser.add_mutually_exclusive_group()
+        group.add_argument("--threshold", type=float, help=f"Raio de remoção (padrão: {PRUNE_THRESHOLD})")
+        group.add_argument("--budget", type=int, help="Máximo de amostras mantidas por classe")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "prune":
+        prune_directory(args.data_dir, args.output, args.threshold, args.budget)
+    else:
+        evaluate(args.data_dir, args.threshold, args.budget, args.weighted, args.folds)
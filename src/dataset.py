@@ -0,0 +1,335 @@
+# -*- coding: utf-8 -*-
+"""
+Carregamento e Cache do Dataset de Landmarks
+
+Este módulo lê os arquivos de landmarks de cada classe (CSV do dataset público
+ou o formato binário do capture.py) e mantém um cache local dos dados já
+normalizados em float32, indexado pelo hash do conteúdo de cada arquivo.
+
+A cada execução:
+    - arquivos inalterados são reaproveitados sem serem lidos novamente;
+    - arquivos que apenas receberam novas linhas ao final têm somente essas
+      linhas processadas;
+    - apenas arquivos novos ou modificados de outra forma são processados por
+      completo.
+
+O resultado combinado é gravado como X.npy, y.npy e classes.npy em um
+subdiretório do cache, aberto via memória mapeada pelo treinamento.
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from features import N_FEATURES, normalize_landmarks
+from store import HEADER_SIZE, STORE_EXTENSION, open_landmarks, read_header
+
+# Diretório padrão do cache local.
+CACHE_DIR = "data/cache"
+# Versão do formato do cache, incrementada quando o pré-processamento muda.
+CACHE_VERSION = 1
+# Tamanho dos blocos lidos ao calcular o hash dos arquivos.
+HASH_BLOCK_SIZE = 1 << 20
+# Linhas interpretadas por bloco na leitura de arquivos CSV.
+CSV_CHUNK_ROWS = 8192
+# Nomes gerados pelo cache: arrays por classe, entradas combinadas e arquivos temporários.
+CACHE_ENTRY_PATTERN = re.compile(r"^(.+-[0-9a-f]{16}\.npy|[0-9a-f]{16})(\.tmp\.npy)?$")
+
+
+def download_dataset():
+    """Baixando o dataset público do Kaggle Hub e retornando a pasta dos landmarks."""
+    import kagglehub
+
+    print("[INFO] Baixando o dataset 'librasign' do Kaggle Hub")
+    kaggle_dataset_path = kagglehub.dataset_download("heitorccf/librasign")
+    # Ajustando para a subpasta correta dos CSVs.
+    return os.path.join(kaggle_dataset_path, "landmarks")
+
+
+def list_landmark_files(data_dir):
+    """
+    Associando cada classe ao seu arquivo de landmarks, priorizando o formato
+    binário quando a mesma classe também possui um CSV.
+    """
+    data_files = {}
+    for file in sorted(os.listdir(data_dir)):
+        label, extension = os.path.splitext(file)
+        if extension == STORE_EXTENSION or (extension == '.csv' and label not in data_files):
+            data_files[label] = os.path.join(data_dir, file)
+    return data_files
+
+
+def count_rows(path):
+    """Contando as amostras de um arquivo sem interpretar o seu conteúdo."""
+    if path.endswith(STORE_EXTENSION):
+        return read_header(path)[1]
+    rows = 0
+    last = b"\n"
+    with open(path, 'rb') as f:
+        while True:
+            block = f.read(HASH_BLOCK_SIZE)
+            if not block:
+                break
+            rows += block.count(b"\n")
+            last = block[-1:]
+    # Considerando a última linha sem quebra de linha ao final.
+    return rows + (last != b"\n")
+
+
+def read_csv_into(path, out):
+    """
+    Interpretando um CSV em blocos de linhas, gravando cada bloco diretamente
+    no array float32 informado, sem manter o arquivo inteiro em float64.
+
+    Returns:
+        int: A quantidade de linhas gravadas.
+    """
+    rows = 0
+    for chunk in pd.read_csv(path, header=None, dtype=np.float32, chunksize=CSV_CHUNK_ROWS):
+        out[rows:rows + len(chunk)] = chunk.values
+        rows += len(chunk)
+    return rows
+
+
+def read_landmark_file(path):
+    """Lendo as coordenadas brutas, em float32, de um arquivo CSV ou binário."""
+    if path.endswith(STORE_EXTENSION):
+        # Abrindo o arquivo binário via memória mapeada, sem cópia.
+        return open_landmarks(path)
+    values = np.empty((count_rows(path), N_FEATURES), dtype=np.float32)
+    # Descartando as linhas reservadas para linhas em branco do arquivo.
+    return values[:read_csv_into(path, values)]
+
+
+def load_dataset(data_dir):
+    """
+    Carregando os landmarks brutos de todas as classes do diretório informado
+    em um único array float32 pré-alocado, preenchido arquivo a arquivo.
+
+    Returns:
+        tuple: A matriz de características (N, 63) e o vetor de rótulos textuais.
+    """
+    data_files = list_landmark_files(data_dir)
+    # Verificando se algum dado foi encontrado.
+    if not data_files:
+        raise ValueError(f"Nenhum arquivo de landmarks encontrado no diretório {data_dir}")
+
+    # Contando as amostras de cada classe para alocar a matriz uma única vez.
+    counts = {label: count_rows(path) for label, path in data_files.items()}
+    X = np.empty((sum(counts.values()), N_FEATURES), dtype=np.float32)
+    labels = []
+    offset = 0
+    for label, path in data_files.items():
+        if path.endswith(STORE_EXTENSION):
+            rows = counts[label]
+            X[offset:offset + rows] = open_landmarks(path)
+        else:
+            rows = read_csv_into(path, X[offset:offset + counts[label]])
+        labels.append((label, rows))
+        offset += rows
+
+    # Repetindo o rótulo para cada amostra do arquivo.
+    y_raw = np.repeat([label for label, _ in labels], [rows for _, rows in labels])
+    return X[:offset], y_raw
+
+
+def _payload_range(path):
+    """
+    Delimitando os bytes que representam as amostras do arquivo: o arquivo
+    inteiro para CSV, ou apenas a região de dados válida para o formato binário.
+    """
+    if path.endswith(STORE_EXTENSION):
+        n_features, count = read_header(path)
+        return HEADER_SIZE, HEADER_SIZE + count * n_features * 4
+    return 0, os.path.getsize(path)
+
+
+def _hash_range(path, start, end):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        f.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = f.read(min(HASH_BLOCK_SIZE, remaining))
+            if not block:
+                break
+            digest.update(block)
+            remaining -= len(block)
+    return digest.hexdigest()
+
+
+def _read_tail(path, entry):
+    """Lendo apenas as amostras acrescentadas após o conteúdo já processado."""
+    if path.endswith(STORE_EXTENSION):
+        return np.asarray(open_landmarks(path)[entry["rows"]:])
+    with open(path, 'rb') as f:
+        f.seek(entry["payload_bytes"])
+        tail = f.read()
+    if not tail.strip():
+        return np.empty((0, N_FEATURES))
+    return pd.read_csv(io.BytesIO(tail), header=None, dtype=np.float32).values
+
+
+def _save_array(path, array):
+    # Gravando de forma atômica para não corromper o cache em caso de interrupção.
+    temp_path = path + ".tmp.npy"
+    np.save(temp_path, array)
+    os.replace(temp_path, path)
+
+
+def is_extension(path, entry):
+    """
+    Verificando se o arquivo mantém, como prefixo, o conteúdo registrado em
+    uma entrada do manifesto, ou seja, se apenas recebeu novas linhas.
+    """
+    if entry["source"] != path:
+        return False
+    start, end = _payload_range(path)
+    old_bytes = entry["payload_bytes"]
+    if old_bytes > end - start or _hash_range(path, start, start + old_bytes) != entry["hash"]:
+        return False
+    if path.endswith(STORE_EXTENSION) or old_bytes == 0:
+        return True
+    # Rejeitando CSVs cuja última linha processada, sem quebra de linha ao final, foi continuada pelas novas linhas.
+    with open(path, 'rb') as f:
+        f.seek(old_bytes - 1)
+        return b"\n" in f.read(2)
+
+
+def read_manifest(cache_dir=CACHE_DIR):
+    """Retornando as entradas do manifesto do cache, indexadas pela classe."""
+    with open(os.path.join(cache_dir, "manifest.json"), 'r') as f:
+        return json.load(f)["files"]
+
+
+def _update_file(cache_dir, label, path, entry):
+    """
+    Atualizando o array normalizado de uma classe, reaproveitando o cache
+    quando o conteúdo não mudou ou quando apenas novas linhas foram acrescentadas.
+
+    Returns:
+        tuple: A entrada atualizada do manifesto e a situação do arquivo.
+    """
+    stat = os.stat(path)
+    if entry and entry["source"] == path and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns \
+            and os.path.exists(os.path.join(cache_dir, entry["array"])):
+        return entry, "inalterado"
+
+    start, end = _payload_range(path)
+    file_hash = _hash_range(path, start, end)
+    new_entry = {
+        "source": path,
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "hash": file_hash,
+        "payload_bytes": end - start,
+        "array": f"{label}-{file_hash[:16]}.npy",
+    }
+
+    if entry and os.path.exists(os.path.join(cache_dir, entry["array"])):
+        if entry["hash"] == file_hash:
+            new_entry["rows"] = entry["rows"]
+            new_entry["array"] = entry["array"]
+            return new_entry, "inalterado"
+
+        # Verificando se o conteúdo anterior permanece como prefixo do arquivo.
+        if entry["payload_bytes"] < end - start and is_extension(path, entry):
+            cached = np.load(os.path.join(cache_dir, entry["array"]))
+            tail = normalize_landmarks(_read_tail(path, entry))
+            normalized = np.concatenate([cached, tail])
+            new_entry["rows"] = len(normalized)
+            _save_array(os.path.join(cache_dir, new_entry["array"]), normalized)
+            return new_entry, f"{len(tail)} novas amostras"
+
+    raw = read_landmark_file(path)
+    # Normalizando in-place os dados lidos do CSV; o binário é mapeado somente leitura.
+    normalized = normalize_landmarks(raw, out=raw if raw.flags.writeable else None)
+    new_entry["rows"] = len(normalized)
+    _save_array(os.path.join(cache_dir, new_entry["array"]), normalized)
+    return new_entry, "processado"
+
+
+def build_cache(data_dir, cache_dir=CACHE_DIR):
+    """
+    Sincronizando o cache com os arquivos do diretório de dados e montando o
+    dataset combinado já normalizado.
+
+    Returns:
+        str: O diretório contendo X.npy, y.npy e classes.npy.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_path = os.path.join(cache_dir, "manifest.json")
+    manifest = {"version": CACHE_VERSION, "files": {}, "combined": None}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, 'r') as f:
+            stored = json.load(f)
+        if stored.get("version") == CACHE_VERSION:
+            manifest = stored
+
+    data_files = list_landmark_files(data_dir)
+    if not data_files:
+        raise ValueError(f"Nenhum arquivo de landmarks encontrado no diretório {data_dir}")
+
+    # Atualizando a entrada de cada classe e registrando o que foi reprocessado.
+    files = {}
+    for label, path in data_files.items():
+        files[label], status = _update_file(cache_dir, label, path, manifest["files"].get(label))
+        print(f"[INFO] Cache '{label}': {status} ({files[label]['rows']} amostras)")
+
+    # Identificando o dataset combinado pelo hash de todos os arquivos de entrada.
+    key_source = json.dumps([CACHE_VERSION] + [[label, files[label]["hash"]] for label in sorted(files)])
+    combined_key = hashlib.sha256(key_source.encode()).hexdigest()[:16]
+    entry_dir = os.path.join(cache_dir, combined_key)
+
+    if not os.path.exists(os.path.join(entry_dir, "classes.npy")):
+        # Montando o dataset combinado diretamente em um array float32 pré-alocado.
+        classes = np.array(sorted(files))
+        total = sum(files[label]["rows"] for label in classes)
+        os.makedirs(entry_dir, exist_ok=True)
+        X = np.lib.format.open_memmap(os.path.join(entry_dir, "X.npy"), mode='w+', dtype=np.float32, shape=(total, N_FEATURES))
+        y = np.empty(total, dtype=np.int64)
+        offset = 0
+        for index, label in enumerate(classes):
+            values = np.load(os.path.join(cache_dir, files[label]["array"]), mmap_mode='r')
+            X[offset:offset + len(values)] = values
+            y[offset:offset + len(values)] = index
+            offset += len(values)
+        X.flush()
+        del X
+        np.save(os.path.join(entry_dir, "y.npy"), y)
+        # Gravando as classes por último, marcando a entrada como completa.
+        np.save(os.path.join(entry_dir, "classes.npy"), classes)
+
+    # Removendo apenas os arrays e entradas combinadas do próprio cache que deixaram de ser referenciados.
+    referenced = {entry["array"] for entry in files.values()} | {combined_key}
+    for name in os.listdir(cache_dir):
+        if name not in referenced and CACHE_ENTRY_PATTERN.match(name):
+            target = os.path.join(cache_dir, name)
+            if os.path.isdir(target):
+                shutil.rmtree(target, ignore_errors=True)
+            else:
+                os.remove(target)
+
+    manifest = {"version": CACHE_VERSION, "files": files, "combined": combined_key}
+    with open(manifest_path + ".tmp", 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(manifest_path + ".tmp", manifest_path)
+    return entry_dir
+
+
+def open_dataset(entry_dir):
+    """
+    Abrindo o dataset combinado do cache via memória mapeada.
+
+    Returns:
+        tuple: Os landmarks normalizados (N, 63), os rótulos codificados e as classes.
+    """
+    X = np.load(os.path.join(entry_dir, "X.npy"), mmap_mode='r')
+    y = np.load(os.path.join(entry_dir, "y.npy"), mmap_mode='r')
+    classes = np.load(os.path.join(entry_dir, "classes.npy"))
+    return X, y, classes
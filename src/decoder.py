@@ -0,0 +1,466 @@
+# -*- coding: utf-8 -*-
+"""
+Decodificador Temporal sobre as Probabilidades do Classificador
+
+Em vez de limiarizar cada frame e votar sobre rótulos, este módulo mantém um
+agregado incremental do vetor de probabilidades, atualizado em O(classes) por
+frame, em um de três modos:
+    - window: média sobre uma janela deslizante dos últimos frames;
+    - ema: média móvel exponencial;
+    - markov: filtro direto (forward) de uma cadeia de Markov em que cada letra
+      tende a permanecer estável entre frames consecutivos.
+
+Sobre as probabilidades agregadas, a sequência de letras é decodificada por um
+Viterbi incremental, no lugar da confirmação por tempo de permanência. Os
+estados são as classes e um estado vazio, que explica os frames sem mão e as
+transições em que nenhuma classe atinge o limiar. Cada estado tende a
+permanecer o mesmo entre frames (`stay_probability`), e uma letra é emitida
+quando o seu segmento termina: ao passar para o estado vazio ou para outra
+letra, desde que o segmento tenha durado o tempo mínimo configurado. Como o
+melhor caminho ainda pode mudar, apenas as letras comuns aos caminhos dentro
+do feixe (`DECODER_BEAM`) são emitidas, e a classe "nenhum", quando existir,
+nunca é emitida.
+
+Também inclui um avaliador offline sobre fluxos de probabilidades gravados
+(.npz com `timestamps`, `probas`, `classes` e opcionalmente `reference`), que
+mede letras por minuto, a taxa de erro de letras e a distância de edição de
+cada configuração frente à confirmação por permanência da votação majoritária:
+    python src/decoder.py simulate --data-dir data/landmarks --output streams
+    python src/decoder.py evaluate streams/*.npz
+"""
+import argparse
+import itertools
+import math
+import os
+
+import numpy as np
+
+from recognition import CONFIRMATION_TIME, HISTORY_SIZE, SignRecognizer
+
+# Modos de agregação suportados.
+DECODER_MODES = ("window", "ema", "markov")
+# Parâmetros padrão do decodificador.
+DECODER_THRESHOLD = 0.6          # Probabilidade agregada a partir da qual uma letra explica o frame melhor que o estado vazio.
+MIN_SEGMENT_TIME = 0.3           # Duração mínima de um segmento para a sua letra ser emitida.
+EMA_ALPHA = 0.3                  # Peso do frame mais recente na média móvel exponencial.
+STAY_PROBABILITY = 0.95          # Probabilidade de o estado permanecer o mesmo entre frames.
+DECODER_BEAM = 10.0              # Diferença máxima de log-verossimilhança para um caminho permanecer no feixe.
+# Piso aplicado às probabilidades, evitando que uma classe zere de vez.
+PROBABILITY_FLOOR = 1e-4
+# Classe de "nenhum gesto" do dataset, tratada como estado vazio na emissão.
+BLANK_LABEL = "nenhum"
+
+
+class TemporalDecoder(SignRecognizer):
+    """
+    Substituindo a votação majoritária e a confirmação por permanência por um
+    agregado das probabilidades decodificado por Viterbi, mantendo a mesma
+    interface do SignRecognizer.
+
+    Args:
+        threshold: Probabilidade agregada que uma letra precisa superar para
+                   explicar o frame melhor que o estado vazio.
+        confirmation_time: A duração mínima, em segundos, de um segmento
+                   para a sua letra ser emitida.
+    """
+
+    def __init__(self, class_names, mode="markov", threshold=DECODER_THRESHOLD,
+                 confirmation_time=MIN_SEGMENT_TIME, window=HISTORY_SIZE,
+                 alpha=EMA_ALPHA, stay_probability=STAY_PROBABILITY, beam=DECODER_BEAM):
+        if mode not in DECODER_MODES:
+            raise ValueError(f"Modo de decodificação desconhecido: {mode}")
+        super().__init__(class_names, confirmation_time=confirmation_time)
+        self.mode = mode
+        self.threshold = threshold
+        self.alpha = alpha
+        self.stay_probability = stay_probability
+        self.beam = beam
+        n_classes = len(class_names)
+        self.aggregate = np.zeros(n_classes)
+        self._scratch = np.empty(n_classes)
+        self._ring = np.zeros((window, n_classes))
+        self._next = 0
+        self._filled = 0
+
+        # Estados do Viterbi: um por classe, seguidos do estado vazio.
+        self._blank = n_classes
+        self._emittable = [str(name) != BLANK_LABEL for name in class_names]
+        self._log_stay = math.log(stay_probability)
+        # Dividindo a saída de uma letra entre o estado vazio e as demais letras.
+        self._log_enter = math.log((1.0 - stay_probability) / n_classes)
+        self._log_leave = math.log((1.0 - stay_probability) / 2)
+        self._log_switch = math.log((1.0 - stay_probability) / 2 / max(n_classes - 1, 1))
+        self._log_blank = math.log(threshold)
+        self._emission = np.empty(n_classes + 1)
+        self._scores = np.empty(n_classes + 1)
+        self.reset_decoder()
+
+    def reset_aggregate(self):
+        self.aggregate[:] = 0.0
+        self._ring[:] = 0.0
+        self._next = 0
+        self._filled = 0
+
+    def reset_decoder(self):
+        """Reiniciando o Viterbi no estado vazio, descartando as letras ainda não emitidas."""
+        self._delta = np.full(len(self._emission), -np.inf)
+        self._delta[self._blank] = 0.0
+        # Início do segmento corrente e letras concluídas, ainda não emitidas, do melhor caminho até cada estado.
+        self._start = [None] * len(self._emission)
+        self._pending = [()] * len(self._emission)
+
+    def _accumulate(self, proba):
+        """Atualizando o agregado com um frame e retornando a distribuição suavizada."""
+        aggregate = self.aggregate
+        if self.mode == "window":
+            # Somando o frame novo e subtraindo o que sai da janela.
+            aggregate += proba
+            aggregate -= self._ring[self._next]
+            self._ring[self._next] = proba
+            self._next = (self._next + 1) % len(self._ring)
+            self._filled = min(self._filled + 1, len(self._ring))
+            return np.divide(aggregate, self._filled, out=self._scratch)
+
+        if self.mode == "ema":
+            if self._filled == 0:
+                aggregate[:] = proba
+            else:
+                aggregate *= 1.0 - self.alpha
+                np.multiply(proba, self.alpha, out=self._scratch)
+                aggregate += self._scratch
+        else:
+            # Propagando a crença pela transição e ponderando pela evidência do frame.
+            np.maximum(proba, PROBABILITY_FLOOR, out=self._scratch)
+            if self._filled == 0:
+                aggregate[:] = self._scratch
+            else:
+                aggregate *= self.stay_probability
+                aggregate += (1.0 - self.stay_probability) / len(aggregate)
+                aggregate *= self._scratch
+            aggregate /= aggregate.sum()
+        self._filled += 1
+        return aggregate
+
+    def _close(self, state, pending, now):
+        # Acrescentando a letra de um segmento encerrado, se emitível e longo o bastante.
+        start = self._start[state]
+        if state != self._blank and self._emittable[state] and start is not None \
+                and now - start >= self.confirmation_time:
+            return pending + ((state, start),)
+        return pending
+
+    def _step(self, smoothed, now):
+        """
+        Avançando o Viterbi com as probabilidades suavizadas de um frame (ou
+        None quando nenhuma mão foi detectada).
+
+        Returns:
+            int: O estado do melhor caminho no frame.
+        """
+        n_classes = self._blank
+        emission = self._emission
+        if smoothed is None:
+            # Sem mão, apenas o estado vazio explica o frame.
+            emission[:n_classes] = math.log(PROBABILITY_FLOOR)
+            emission[n_classes] = 0.0
+        else:
+            np.maximum(smoothed, PROBABILITY_FLOOR, out=emission[:n_classes])
+            np.log(emission[:n_classes], out=emission[:n_classes])
+            emission[n_classes] = self._log_blank
+
+        delta = self._delta
+        letters = delta[:n_classes]
+        first = int(np.argmax(letters))
+        top = letters[first]
+        if n_classes > 1:
+            letters[first] = -np.inf
+            second = int(np.argmax(letters))
+            letters[first] = top
+        else:
+            second = first
+        blank_score = delta[n_classes]
+        enter = blank_score + self._log_enter
+
+        # Escolhendo, para cada estado, o antecessor do melhor caminho.
+        scores = self._scores
+        predecessors = [0] * (n_classes + 1)
+        for state in range(n_classes):
+            stay = delta[state] + self._log_stay
+            other = first if state != first else second
+            switch = delta[other] + self._log_switch if other != state else -np.inf
+            if stay >= switch and stay >= enter:
+                scores[state], predecessors[state] = stay, state
+            elif switch >= enter:
+                scores[state], predecessors[state] = switch, other
+            else:
+                scores[state], predecessors[state] = enter, n_classes
+        stay = blank_score + self._log_stay
+        leave = top + self._log_leave
+        if stay >= leave:
+            scores[n_classes], predecessors[n_classes] = stay, n_classes
+        else:
+            scores[n_classes], predecessors[n_classes] = leave, first
+        scores += emission
+
+        # Propagando as letras concluídas e o início do segmento de cada estado.
+        starts, pendings = [None] * (n_classes + 1), [()] * (n_classes + 1)
+        for state, predecessor in enumerate(predecessors):
+            if predecessor == state:
+                starts[state], pendings[state] = self._start[state], self._pending[state]
+            else:
+                starts[state] = now
+                pendings[state] = self._close(predecessor, self._pending[predecessor], now)
+        # Normalizando pelo melhor caminho e descartando os que saíram do feixe.
+        best = int(np.argmax(scores))
+        scores -= scores[best]
+        scores[scores < -self.beam] = -np.inf
+        self._delta, self._scores = scores, delta
+        self._start, self._pending = starts, pendings
+        return best
+
+    def _commit(self):
+        """
+        Emitindo as letras comuns a todos os caminhos do feixe, que nenhuma
+        decodificação posterior pode mais alterar.
+
+        Returns:
+            tuple: As letras emitidas, com o início de cada segmento.
+        """
+        alive = [self._pending[state] for state in np.flatnonzero(np.isfinite(self._delta))]
+        common = min(len(pending) for pending in alive)
+        for pending in alive:
+            while common and pending[:common] != alive[0][:common]:
+                common -= 1
+        if not common:
+            return ()
+        committed = alive[0][:common]
+        self._pending = [pending[common:] if pending[:common] == committed else ()
+                         for pending in self._pending]
+        return committed
+
+    def _emit(self, committed):
+        for state, start in committed:
+            self.sentence.append(self.class_names[state])
+        if committed:
+            # Expondo a última letra emitida como confirmada, como na regra de permanência.
+            state, start = committed[-1]
+            self.current_stable_letter = self.class_names[state]
+            self.stable_letter_start_time = start
+            self.letter_confirmed = True
+
+    def update(self, prediction_proba, now):
+        """
+        Registrando as probabilidades de um frame (ou None quando nenhuma mão
+        foi detectada), avançando o Viterbi e emitindo as letras cujos
+        segmentos terminaram.
+
+        Returns:
+            str: A letra do melhor caminho no frame, ou "" no estado vazio.
+        """
+        smoothed = None
+        if prediction_proba is not None:
+            proba = np.ravel(prediction_proba)
+            smoothed = self._accumulate(proba)
+
+            # Mantendo o histórico de votos por frame, usado pela instrumentação.
+            frame_index = int(np.argmax(proba))
+            confident = proba[frame_index] >= self.confidence_threshold
+            self.predictions_history.append(self.class_names[frame_index] if confident else None)
+        else:
+            # Reiniciando o agregado se nenhuma mão for detectada.
+            self.reset_aggregate()
+            self.predictions_history.clear()
+
+        best = self._step(smoothed, now)
+        smoothed_label = self.class_names[best] if best != self._blank and self._emittable[best] else ""
+        # Exibindo o segmento corrente do melhor caminho, substituído pela letra emitida no frame.
+        self.current_stable_letter = smoothed_label
+        self.stable_letter_start_time = self._start[best] if smoothed_label else None
+        self.letter_confirmed = False
+        self._emit(self._commit())
+        return smoothed_label
+
+    def flush(self, now):
+        """Encerrando o fluxo e emitindo as letras pendentes do melhor caminho, inclusive a do segmento corrente."""
+        best = int(np.argmax(self._delta))
+        self._emit(self._close(best, self._pending[best], now))
+        self.reset_aggregate()
+        self.reset_decoder()
+
+
+def build_recognizer(class_names, decoder="majority", **kwargs):
+    """Criando o reconhecedor correspondente ao decodificador escolhido."""
+    if decoder == "majority":
+        return SignRecognizer(class_names, **kwargs)
+    return TemporalDecoder(class_names, mode=decoder, **kwargs)
+
+
+def edit_distance(a, b):
+    """Calculando a distância de Levenshtein entre duas sequências de letras."""
+    previous = list(range(len(b) + 1))
+    for i, item_a in enumerate(a, 1):
+        current = [i]
+        for j, item_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (item_a != item_b)))
+        previous = current
+    return previous[-1]
+
+
+def load_stream(path):
+    """
+    Lendo um fluxo de probabilidades gravado. Linhas com NaN representam
+    frames sem mão detectada.
+    """
+    with np.load(path, allow_pickle=False) as data:
+        stream = {
+            "timestamps": data["timestamps"],
+            "probas": data["probas"],
+            "classes": data["classes"],
+            "reference": str(data["reference"]) if "reference" in data.files else None,
+        }
+    return stream
+
+
+def decode_stream(stream, decoder="majority", **kwargs):
+    """Executando um reconhecedor sobre um fluxo gravado e retornando a frase emitida."""
+    recognizer = build_recognizer(stream["classes"], decoder, **kwargs)
+    for now, proba in zip(stream["timestamps"], stream["probas"]):
+        recognizer.update(None if np.isnan(proba[0]) else proba, float(now))
+    if len(stream["timestamps"]):
+        recognizer.flush(float(stream["timestamps"][-1]))
+    return [str(letter) for letter in recognizer.sentence]
+
+
+def evaluate(streams, configs):
+    """
+    Avaliando cada configuração sobre todos os fluxos.
+
+    Returns:
+        list: Um dicionário por configuração com letras por minuto, taxa de
+              erro, distância de edição total e a sua diferença frente à
+              primeira configuração (a referência por permanência).
+    """
+    rows = []
+    duration = sum(float(s["timestamps"][-1] - s["timestamps"][0]) for s in streams if len(s["timestamps"]) > 1)
+    for name, decoder, kwargs in configs:
+        emitted = 0
+        errors = 0
+        reference_length = 0
+        for stream in streams:
+            sentence = decode_stream(stream, decoder, **kwargs)
+            emitted += len(sentence)
+            if stream["reference"] is not None:
+                reference = list(stream["reference"])
+                errors += edit_distance(sentence, reference)
+                reference_length += len(reference)
+        rows.append({
+            "config": name,
+            "letters_per_minute": emitted / duration * 60 if duration > 0 else 0.0,
+            "letter_error_rate": errors / reference_length if reference_length else None,
+            "emitted": emitted,
+            "distance": errors if reference_length else None,
+        })
+    # Comparando a distância de edição de cada configuração com a da referência.
+    baseline = rows[0]["distance"] if rows else None
+    for row in rows:
+        row["distance_delta"] = row["distance"] - baseline if baseline is not None else None
+    return rows
+
+
+def default_configs():
+    """Montando a configuração de referência e a grade de decodificadores avaliados."""
+    configs = [(f"majority ({CONFIRMATION_TIME}s)", "majority", {})]
+    for mode, threshold, segment_time in itertools.product(DECODER_MODES, (0.6, 0.75, 0.9), (0.1, 0.2, 0.3, 0.5)):
+        kwargs = {"threshold": threshold, "confirmation_time": segment_time}
+        configs.append((f"{mode} lim={threshold} seg={segment_time}s", mode, kwargs))
+    return configs
+
+
+def simulate_streams(data_dir, models_dir, count, length, fps, seed):
+    """
+    Gerando fluxos de probabilidades a partir de amostras rotuladas: para cada
+    letra da referência, a mão permanece um tempo aleatório com amostras da
+    classe, passando por frames de transição com amostras de outras classes e
+    por um intervalo sem mão antes da próxima letra.
+    """
+    from dataset import load_dataset
+    from engine import load_classifier
+    from features import normalize_landmarks
+
+    X, y_raw = load_dataset(data_dir)
+    X = normalize_landmarks(X)
+    y_raw = np.asarray(y_raw)
+    predict_proba, class_names = load_classifier(models_dir)
+    class_names = np.asarray(class_names)
+    rows_by_label = {label: np.flatnonzero(y_raw == label) for label in np.unique(y_raw)}
+    letters = [label for label in rows_by_label if label != "nenhum"]
+
+    rng = np.random.default_rng(seed)
+    streams = []
+    for _ in range(count):
+        reference = [str(letter) for letter in rng.choice(letters, length)]
+        frames = []
+        for letter in reference:
+            # Simulando a transição entre letras com amostras de outras classes.
+            for _ in range(int(rng.uniform(0.1, 0.3) * fps)):
+                frames.append(rng.choice(rows_by_label[rng.choice(letters)]))
+            for _ in range(int(rng.uniform(1.0, 3.0) * fps)):
+                frames.append(rng.choice(rows_by_label[letter]))
+            for _ in range(int(rng.uniform(0.3, 0.8) * fps)):
+                frames.append(-1)
+
+        frames = np.asarray(frames)
+        probas = np.full((len(frames), len(class_names)), np.nan, dtype=np.float32)
+        detected = frames >= 0
+        probas[detected] = predict_proba(X[frames[detected]])
+        streams.append({
+            "timestamps": np.arange(len(frames)) / fps,
+            "probas": probas,
+            "classes": class_names,
+            "reference": "".join(reference) if all(len(letter) == 1 for letter in reference) else None,
+        })
+    return streams
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Avaliação offline de decodificadores temporais")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    evaluate_parser = subparsers.add_parser("evaluate", help="Avaliando decodificadores sobre fluxos gravados")
+    evaluate_parser.add_argument("streams", nargs="+", help="Arquivos .npz de fluxos de probabilidades")
+    evaluate_parser.add_argument("--reference", help="Sequência esperada, quando não gravada no fluxo")
+
+    simulate_parser = subparsers.add_parser("simulate", help="Gerando fluxos a partir de amostras rotuladas")
+    simulate_parser.add_argument("--data-dir", default="data/landmarks", help="Diretório de landmarks rotulados")
+    simulate_parser.add_argument("--models-dir", default="models", help="Diretório dos artefatos do modelo")
+    simulate_parser.add_argument("--output", default="streams", help="Diretório de saída dos fluxos")
+    simulate_parser.add_argument("--count", type=int, default=20, help="Quantidade de fluxos")
+    simulate_parser.add_argument("--length", type=int, default=8, help="Letras por fluxo")
+    simulate_parser.add_argument("--fps", type=float, default=30.0, help="Taxa de frames simulada")
+    simulate_parser.add_argument("--seed", type=int, default=42, help="Semente da simulação")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+
+    if args.command == "simulate":
+        streams = simulate_streams(args.data_dir, args.models_dir, args.count, args.length, args.fps, args.seed)
+        os.makedirs(args.output, exist_ok=True)
+        for i, stream in enumerate(streams):
+            path = os.path.join(args.output, f"stream_{i:03d}.npz")
+            arrays = {key: value for key, value in stream.items() if value is not None}
+            np.savez(path, **arrays)
+        print(f"[INFO] {len(streams)} fluxo(s) gravado(s) em '{args.output}'")
+    else:
+        streams = [load_stream(path) for path in args.streams]
+        for stream in streams:
+            if stream["reference"] is None:
+                stream["reference"] = args.reference
+        rows = evaluate(streams, default_configs())
+        print(f"{'configuração':<32}{'letras/min':>12}{'erro':>10}{'emitidas':>10}{'edição':>8}{'Δ dwell':>9}")
+        for row in sorted(rows, key=lambda r: -r["letters_per_minute"]):
+            error = f"{row['letter_error_rate'] * 100:.1f}%" if row["letter_error_rate"] is not None else "-"
+            distance = row["distance"] if row["distance"] is not None else "-"
+            delta = f"{row['distance_delta']:+d}" if row["distance_delta"] is not None else "-"
+            print(f"{row['config']:<32}{row['letters_per_minute']:>12.1f}{error:>10}{row['emitted']:>10}{distance:>8}{delta:>9}")
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""
+Renderização do Estado de Reconhecimento
+
+Este módulo desenha sobre o frame os landmarks detectados, o gesto corrente,
+a barra de progresso da confirmação e a frase formada.
+"""
+import cv2
+
+from recognition import CONFIRMATION_TIME
+
+
+def draw_landmarks(frame, hand_landmarks):
+    # Importando o MediaPipe apenas no primeiro desenho, fora do caminho de inicialização.
+    import mediapipe as mp
+
+    mp.solutions.drawing_utils.draw_landmarks(frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
+
+
+def render(frame, hand_landmarks, state, now, confirmation_time=CONFIRMATION_TIME):
+    """Desenhando os landmarks, o gesto corrente e a frase formada sobre o frame."""
+    H, W, _ = frame.shape
+    if hand_landmarks is not None:
+        draw_landmarks(frame, hand_landmarks)
+
+    # Gerenciando o texto de status principal.
+    if state.current_stable_letter:
+        display_text = f"Gesto: {state.current_stable_letter}"
+        if state.letter_confirmed:
+            display_text += " (Confirmado)"
+        elif state.stable_letter_start_time:
+            # Desenhando uma barra de progresso para a confirmação.
+            progress = (now - state.stable_letter_start_time) / confirmation_time
+            cv2.rectangle(frame, (10, 70), (10 + int(progress * 200), 90), (0, 255, 0), -1)
+    else:
+        display_text = "Aguardando gesto"
+
+    cv2.putText(frame, display_text, (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
+
+    # Desenhando a frase formada na parte inferior da tela.
+    cv2.rectangle(frame, (0, H - 60), (W, H), (0, 0, 0), -1)
+    cv2.putText(frame, " ".join(state.sentence), (20, H - 20), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
+
+
+def render_hands(frame, hands, now, confirmation_time=CONFIRMATION_TIME):
+    """
+    Desenhando várias mãos sobre o mesmo frame, cada uma com o seu gesto
+    corrente junto ao pulso e a sua frase em uma linha do painel inferior.
+
+    Args:
+        hands: Lista de tuplas (nome da mão, landmarks ou None, estado).
+    """
+    H, W, _ = frame.shape
+    panel_height = 40 * max(1, len(hands))
+    cv2.rectangle(frame, (0, H - panel_height), (W, H), (0, 0, 0), -1)
+
+    for i, (name, hand_landmarks, state) in enumerate(hands):
+        if hand_landmarks is not None:
+            draw_landmarks(frame, hand_landmarks)
+            # Posicionando o gesto corrente acima do pulso da mão.
+            wrist = hand_landmarks.landmark[0]
+            x, y = int(wrist.x * W), max(30, int(wrist.y * H) - 20)
+            if state.current_stable_letter:
+                label = state.current_stable_letter + (" (Confirmado)" if state.letter_confirmed else "")
+                cv2.putText(frame, label, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 1.0, (255, 255, 255), 2, cv2.LINE_AA)
+                if not state.letter_confirmed and state.stable_letter_start_time:
+                    progress = min(1.0, (now - state.stable_letter_start_time) / confirmation_time)
+                    cv2.rectangle(frame, (x, y + 8), (x + int(progress * 100), y + 16), (0, 255, 0), -1)
+
+        # Desenhando a frase de cada mão em uma linha do painel inferior.
+        line_y = H - panel_height + 28 + 40 * i
+        cv2.putText(frame, f"{name}: {' '.join(state.sentence)}", (20, line_y),
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.9, (255, 255, 255), 2, cv2.LINE_AA)
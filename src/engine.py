@@ -0,0 +1,590 @@
+# -*- coding: utf-8 -*-
+"""
+Motor de Inferência em NumPy Puro
+
+Este módulo exporta os pesos do MLPClassifier treinado para um arquivo .npz
+compacto, incorporando a média e o desvio do StandardScaler na primeira camada,
+e executa a propagação direta em float32 com ativações pré-alocadas, evitando
+a validação de entrada e o despacho do scikit-learn a cada frame.
+
+Executado diretamente, compara o motor com o `predict_proba` original,
+exportando antes o .npz a partir dos pickles existentes quando ele não existir:
+    python src/engine.py
+"""
+import hashlib
+import os
+import pickle
+import queue
+import threading
+import time
+import numpy as np
+
+from features import N_FEATURES
+
+# Diretório padrão dos artefatos gerados pelo treinamento.
+MODELS_DIR = "models"
+# Caminho padrão do artefato compacto gerado pelo treinamento.
+ENGINE_PATH = os.path.join(MODELS_DIR, "librasign_mlp.npz")
+# Artefato do primeiro estágio da cascata, gerado com `train.py --cascade`.
+CASCADE_FILE = "cascade.npz"
+# Arquivo gravado por último pelo treinamento, sinalizando artefatos completos.
+STATE_FILE = "training_state.json"
+# Intervalo entre as verificações de novos artefatos, em segundos.
+RELOAD_INTERVAL = 1.0
+# Variantes de precisão do motor e os respectivos artefatos, as reduzidas geradas com `train.py --quantize`.
+PRECISIONS = ("float32", "float16", "int8")
+VARIANT_FILES = {
+    "float32": "librasign_mlp.npz",
+    "float16": "librasign_mlp_float16.npz",
+    "int8": "librasign_mlp_int8.npz",
+}
+# Maior valor absoluto representável nos pesos e ativações quantizados.
+INT8_MAX = 127
+
+
+def fold_scaler(model, scaler):
+    """
+    Retornando os pesos e vieses do MLP em float64, com a padronização do
+    StandardScaler incorporada à primeira camada.
+
+    Sendo z = (x - média) / escala, a primeira camada z @ W + b equivale a
+    x @ (W / escala) + (b - (média / escala) @ W).
+    """
+    coefs = [np.asarray(c, dtype=np.float64) for c in model.coefs_]
+    intercepts = [np.asarray(b, dtype=np.float64) for b in model.intercepts_]
+
+    mean = scaler.mean_ if scaler.mean_ is not None else np.zeros(coefs[0].shape[0])
+    scale = scaler.scale_ if scaler.scale_ is not None else np.ones(coefs[0].shape[0])
+
+    # Incorporando a padronização aos pesos da primeira camada.
+    first = coefs[0] / scale[:, None]
+    intercepts[0] = intercepts[0] - (mean / scale) @ coefs[0]
+    coefs[0] = first
+    return coefs, intercepts
+
+
+def model_fingerprint(model, scaler, classes=None):
+    """
+    Identificando um modelo treinado pelos seus pesos, pela padronização e
+    pelas classes, gravado nos artefatos derivados dele para detectar os que
+    ficaram desatualizados após um novo treinamento.
+    """
+    digest = hashlib.sha256()
+    for array in model.coefs_ + model.intercepts_ + [scaler.mean_, scaler.scale_]:
+        digest.update(np.ascontiguousarray(array, dtype=np.float64).tobytes())
+    if classes is not None:
+        digest.update("\n".join(str(label) for label in classes).encode())
+    return digest.hexdigest()[:16]
+
+
+def read_fingerprint(path):
+    """Lendo a identificação do modelo gravada em um artefato, ou None quando ausente."""
+    with np.load(path, allow_pickle=False) as data:
+        return str(data["fingerprint"]) if "fingerprint" in data.files else None
+
+
+def is_current(path, models_dir=MODELS_DIR):
+    """
+    Verificando se um artefato derivado foi gerado a partir do mesmo modelo
+    que o motor principal do diretório.
+    """
+    engine_path = os.path.join(models_dir, VARIANT_FILES["float32"])
+    expected = read_fingerprint(engine_path) if os.path.exists(engine_path) else None
+    return read_fingerprint(path) == expected
+
+
+def export_engine(model, scaler, path=ENGINE_PATH, classes=None, dtype=np.float32):
+    """
+    Exportando os pesos e vieses do MLP para um arquivo .npz, com a
+    padronização do StandardScaler incorporada à primeira camada e os pesos
+    gravados no tipo `dtype` (float16 reduz o artefato à metade).
+    """
+    coefs, intercepts = fold_scaler(model, scaler)
+    arrays = {
+        "hidden_activation": np.array(model.activation),
+        "out_activation": np.array(model.out_activation_),
+        "fingerprint": np.array(model_fingerprint(model, scaler, classes)),
+    }
+    for i, (W, b) in enumerate(zip(coefs, intercepts)):
+        arrays[f"coef_{i}"] = W.astype(dtype)
+        arrays[f"intercept_{i}"] = b.astype(dtype)
+    if classes is not None:
+        arrays["classes"] = np.asarray(classes)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    np.savez(path, **arrays)
+    return path
+
+
+def _relu(x):
+    np.maximum(x, 0, out=x)
+
+
+def _tanh(x):
+    np.tanh(x, out=x)
+
+
+def _logistic(x):
+    np.negative(x, out=x)
+    np.exp(x, out=x)
+    x += 1
+    np.reciprocal(x, out=x)
+
+
+def _identity(x):
+    pass
+
+
+# Ativações aplicadas in-place sobre os buffers pré-alocados.
+ACTIVATIONS = {
+    "relu": _relu,
+    "tanh": _tanh,
+    "logistic": _logistic,
+    "identity": _identity,
+}
+
+
+class MLPEngine:
+    """
+    Executando a propagação direta do MLP exportado em NumPy puro.
+
+    A entrada é o vetor de landmarks já normalizado geometricamente (sem o
+    StandardScaler, que está incorporado à primeira camada). O array retornado
+    por `predict_proba` é um buffer reutilizado na chamada seguinte com o mesmo
+    tamanho de lote, devendo ser copiado se precisar ser mantido.
+    """
+
+    # Quantidade máxima de tamanhos de lote com buffers mantidos em cache.
+    MAX_CACHED_BATCHES = 8
+
+    def __init__(self, coefs, intercepts, hidden_activation="relu",
+                 out_activation="softmax", classes=None, dtype=np.float32):
+        if hidden_activation not in ACTIVATIONS:
+            raise ValueError(f"Ativação não suportada: {hidden_activation}")
+        self.dtype = np.dtype(dtype)
+        self.coefs = [np.ascontiguousarray(W, dtype=self.dtype) for W in coefs]
+        self.intercepts = [np.ascontiguousarray(b, dtype=self.dtype) for b in intercepts]
+        self.hidden_activation = hidden_activation
+        self.out_activation = out_activation
+        self.classes = classes
+        self.n_features = self.coefs[0].shape[0]
+        # Saída logística única representa o caso binário, expandido para duas colunas.
+        self._binary = out_activation == "logistic" and self.coefs[-1].shape[1] == 1
+        self.n_classes = 2 if self._binary else self.coefs[-1].shape[1]
+        self._buffers = {}
+        # Pré-alocando as ativações do caso mais comum, um frame por chamada.
+        self._activations(1)
+
+    @classmethod
+    def load(cls, path=ENGINE_PATH, dtype=np.float32):
+        """Carregando o motor a partir do arquivo .npz exportado pelo treinamento."""
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = sum(1 for key in data.files if key.startswith("coef_"))
+            coefs = [data[f"coef_{i}"] for i in range(n_layers)]
+            intercepts = [data[f"intercept_{i}"] for i in range(n_layers)]
+            classes = data["classes"] if "classes" in data.files else None
+            return cls(
+                coefs,
+                intercepts,
+                hidden_activation=str(data["hidden_activation"]),
+                out_activation=str(data["out_activation"]),
+                classes=classes,
+                dtype=dtype,
+            )
+
+    def _activations(self, n_samples):
+        buffers = self._buffers.get(n_samples)
+        if buffers is None:
+            if len(self._buffers) >= self.MAX_CACHED_BATCHES:
+                self._buffers.clear()
+            buffers = [np.empty((n_samples, W.shape[1]), dtype=self.dtype) for W in self.coefs]
+            if self._binary:
+                buffers.append(np.empty((n_samples, 2), dtype=self.dtype))
+            self._buffers[n_samples] = buffers
+        return buffers
+
+    def predict_proba(self, X):
+        """
+        Calculando as probabilidades de cada classe para um lote de amostras
+        com formato (N, 63).
+        """
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        buffers = self._activations(X.shape[0])
+        activation = ACTIVATIONS[self.hidden_activation]
+        last = len(self.coefs) - 1
+
+        a = X
+        for i, (W, b) in enumerate(zip(self.coefs, self.intercepts)):
+            out = buffers[i]
+            np.matmul(a, W, out=out)
+            out += b
+            if i < last:
+                activation(out)
+            a = out
+        return self._output(a, buffers)
+
+    def _output(self, a, buffers):
+        # Convertendo os valores da camada de saída em probabilidades, in-place.
+        if self._binary:
+            _logistic(a)
+            proba = buffers[-1]
+            proba[:, 1:] = a
+            np.subtract(1, a[:, 0], out=proba[:, 0])
+            return proba
+
+        if self.out_activation == "softmax":
+            # Subtraindo o máximo de cada linha para estabilidade numérica.
+            a -= a.max(axis=1, keepdims=True)
+            np.exp(a, out=a)
+            a /= a.sum(axis=1, keepdims=True)
+        else:
+            ACTIVATIONS[self.out_activation](a)
+        return a
+
+
+class CascadeClassifier:
+    """
+    Cascata de dois estágios: um classificador linear barato responde sozinho
+    quando a margem entre os seus dois maiores logits atinge o limiar calibrado
+    na validação cruzada e a sua maior probabilidade atinge a confiança mínima
+    do reconhecedor, e apenas as amostras incertas seguem para o segundo
+    estágio (o MLP).
+
+    Como o custo do MLP para um único frame é dominado pelo despacho das
+    operações do NumPy, o primeiro estágio usa um caminho dedicado para lotes
+    de uma amostra, com poucas operações sobre buffers pré-alocados. O array
+    retornado é reutilizado na chamada seguinte.
+    """
+
+    def __init__(self, coef, intercept, threshold, second, confidence=0.0):
+        self.coef = np.ascontiguousarray(coef, dtype=np.float32)
+        self.intercept = np.ascontiguousarray(intercept, dtype=np.float32)
+        self.threshold = threshold
+        self.confidence = confidence
+        self.second = second
+        self.early = 0
+        self.total = 0
+        self._logits = np.empty((1, self.coef.shape[1]), dtype=np.float32)
+        self._row = self._logits[0]
+
+    @classmethod
+    def load(cls, path, second):
+        """Carregando o primeiro estágio, o seu limiar e a confiança mínima a partir do .npz exportado."""
+        with np.load(path, allow_pickle=False) as data:
+            confidence = float(data["confidence"]) if "confidence" in data.files else 0.0
+            return cls(data["coef_0"], data["intercept_0"], float(data["threshold"]), second, confidence)
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        if X.shape[0] != 1:
+            return self._predict_batch(X)
+
+        self.total += 1
+        z = self._row
+        np.dot(X[0], self.coef, out=z)
+        z += self.intercept
+        # Calculando a margem entre os dois maiores logits sem ordenar o vetor.
+        best = z.argmax()
+        top = z[best]
+        z[best] = -np.inf
+        margin = top - z.max()
+        z[best] = top
+        if margin < self.threshold:
+            return self.second(X)
+
+        # Convertendo os logits em probabilidades diretamente no buffer.
+        z -= top
+        np.exp(z, out=z)
+        total = z.sum()
+        # Consultando o MLP quando a maior probabilidade (exp(0) / soma) não atinge a confiança mínima.
+        if total * self.confidence > 1.0:
+            return self.second(X)
+        self.early += 1
+        z /= total
+        return self._logits
+
+    def _predict_batch(self, X):
+        logits = X @ self.coef + self.intercept
+        top2 = np.partition(logits, -2, axis=1)[:, -2:]
+        accept = top2[:, 1] - top2[:, 0] >= self.threshold
+
+        logits -= top2[:, 1:]
+        proba = np.exp(logits, out=logits)
+        proba /= proba.sum(axis=1, keepdims=True)
+        accept &= proba.max(axis=1) >= self.confidence
+        self.total += len(X)
+        self.early += int(np.count_nonzero(accept))
+        if not accept.all():
+            # Substituindo as amostras incertas pelas probabilidades do segundo estágio.
+            proba[~accept] = self.second(X[~accept])
+        return proba
+
+    @property
+    def early_rate(self):
+        return self.early / self.total if self.total else 0.0
+
+
+class QuantizedEngine(MLPEngine):
+    """
+    Executando o MLP quantizado em int8 após o treinamento.
+
+    Cada camada recebe a sua entrada quantizada por canal, com as escalas
+    calibradas sobre as ativações do treinamento e incorporadas aos pesos, que
+    por sua vez são quantizados por neurônio de saída. O produto entre os
+    inteiros é acumulado em float32, exato enquanto |acumulado| < 2^24 (até
+    ~1000 entradas por neurônio), pois o NumPy não dispõe de multiplicação de
+    matrizes inteiras acelerada pelo BLAS.
+
+    Com a ReLU, que preserva escalas positivas, a escala de entrada da camada
+    seguinte é incorporada à reescala e ao viés da anterior, de modo que as
+    ativações ocultas já saem na escala de quantização.
+    """
+
+    def __init__(self, coefs, weight_scales, input_scales, intercepts, hidden_activation="relu",
+                 out_activation="softmax", classes=None):
+        super().__init__(coefs, intercepts, hidden_activation, out_activation, classes)
+        inverse_scales = [1.0 / np.asarray(s, dtype=np.float64) for s in input_scales]
+        weight_scales = [np.asarray(s, dtype=np.float64) for s in weight_scales]
+        self._fused = hidden_activation == "relu"
+        if self._fused:
+            for i in range(len(self.coefs) - 1):
+                weight_scales[i] = weight_scales[i] * inverse_scales[i + 1]
+                self.intercepts[i] = (self.intercepts[i] * inverse_scales[i + 1]).astype(np.float32)
+        self.weight_scales = [np.ascontiguousarray(s, dtype=np.float32) for s in weight_scales]
+        self.inverse_scales = [np.ascontiguousarray(s, dtype=np.float32) for s in inverse_scales]
+        self._quantized = {}
+
+    @classmethod
+    def load(cls, path):
+        """Carregando o motor quantizado a partir do .npz exportado com `train.py --quantize`."""
+        with np.load(path, allow_pickle=False) as data:
+            n_layers = sum(1 for key in data.files if key.startswith("coef_"))
+            return cls(
+                [data[f"coef_{i}"] for i in range(n_layers)],
+                [data[f"weight_scale_{i}"] for i in range(n_layers)],
+                [data[f"input_scale_{i}"] for i in range(n_layers)],
+                [data[f"intercept_{i}"] for i in range(n_layers)],
+                hidden_activation=str(data["hidden_activation"]),
+                out_activation=str(data["out_activation"]),
+                classes=data["classes"] if "classes" in data.files else None,
+            )
+
+    def _inputs(self, n_samples):
+        buffers = self._quantized.get(n_samples)
+        if buffers is None:
+            if len(self._quantized) >= self.MAX_CACHED_BATCHES:
+                self._quantized.clear()
+            buffers = [np.empty((n_samples, W.shape[0]), dtype=np.float32) for W in self.coefs]
+            self._quantized[n_samples] = buffers
+        return buffers
+
+    def predict_proba(self, X):
+        X = np.asarray(X)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        buffers = self._activations(X.shape[0])
+        inputs = self._inputs(X.shape[0])
+        activation = ACTIVATIONS[self.hidden_activation]
+        last = len(self.coefs) - 1
+
+        # Quantizando a entrada da primeira camada para inteiros em [-127, 127].
+        q = inputs[0]
+        np.multiply(X, self.inverse_scales[0], out=q)
+        np.rint(q, out=q)
+        np.clip(q, -INT8_MAX, INT8_MAX, out=q)
+        for i, (W, b) in enumerate(zip(self.coefs, self.intercepts)):
+            out = buffers[i]
+            np.matmul(q, W, out=out)
+            # Reescalando o acumulado pela escala de cada neurônio de saída.
+            out *= self.weight_scales[i]
+            out += b
+            if i == last:
+                break
+            activation(out)
+            if self._fused:
+                # Ativações não negativas, já na escala da camada seguinte.
+                np.rint(out, out=out)
+                np.minimum(out, INT8_MAX, out=out)
+                q = out
+            else:
+                q = inputs[i + 1]
+                np.multiply(out, self.inverse_scales[i + 1], out=q)
+                np.rint(q, out=q)
+                np.clip(q, -INT8_MAX, INT8_MAX, out=q)
+        return self._output(out, buffers)
+
+
+def load_engine(path):
+    """Carregando o motor exportado, quantizado ou em ponto flutuante."""
+    with np.load(path, allow_pickle=False) as data:
+        quantized = "weight_scale_0" in data.files
+    return QuantizedEngine.load(path) if quantized else MLPEngine.load(path)
+
+
+def load_classifier(models_dir=MODELS_DIR, cascade=False, precision="float32"):
+    """
+    Carregando o classificador a partir do diretório de artefatos, preferindo
+    o motor NumPy e recorrendo aos pickles do scikit-learn na sua ausência.
+
+    Com `precision`, usa a variante float16 ou int8 exportada pelo treinamento,
+    quando disponível e gerada a partir do modelo atual.
+
+    Com `cascade`, o classificador é precedido pelo primeiro estágio linear
+    exportado pelo treinamento, quando disponível e calibrado para o modelo atual.
+
+    Returns:
+        tuple: A função `predict_proba` que recebe landmarks normalizados com
+               formato (N, 63) e o array com os nomes das classes.
+    """
+    predict_proba, class_names = _load_model(models_dir, precision)
+    if cascade:
+        cascade_path = os.path.join(models_dir, CASCADE_FILE)
+        if os.path.exists(cascade_path) and is_current(cascade_path, models_dir):
+            return CascadeClassifier.load(cascade_path, predict_proba).predict_proba, class_names
+        if os.path.exists(cascade_path):
+            print(f"[AVISO] Cascata desatualizada em relação ao modelo, ignorando '{cascade_path}'")
+        else:
+            print(f"[AVISO] Cascata indisponível, execute o treinamento com --cascade para gerar '{cascade_path}'")
+    return predict_proba, class_names
+
+
+def _load_model(models_dir, precision="float32"):
+    class_names = np.load(os.path.join(models_dir, "classes.npy"))
+    if precision != "float32":
+        variant_path = os.path.join(models_dir, VARIANT_FILES[precision])
+        if os.path.exists(variant_path) and is_current(variant_path, models_dir):
+            return load_engine(variant_path).predict_proba, class_names
+        if os.path.exists(variant_path):
+            print(f"[AVISO] Variante {precision} desatualizada em relação ao modelo, ignorando '{variant_path}'")
+        else:
+            print(f"[AVISO] Variante {precision} indisponível, execute o treinamento com --quantize para gerar '{variant_path}'")
+    engine_path = os.path.join(models_dir, VARIANT_FILES["float32"])
+    if os.path.exists(engine_path):
+        # Usando o motor NumPy, com o StandardScaler incorporado à primeira camada.
+        return MLPEngine.load(engine_path).predict_proba, class_names
+
+    with open(os.path.join(models_dir, "librasign_mlp.pkl"), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(models_dir, "scaler.pkl"), 'rb') as f:
+        scaler = pickle.load(f)
+
+    def predict_proba(coords):
+        # Aplicando o StandardScaler carregado antes do MLP.
+        return model.predict_proba(scaler.transform(coords))
+
+    return predict_proba, class_names
+
+
+class ModelWatcher:
+    """
+    Observando o diretório de artefatos e carregando em segundo plano o
+    classificador gravado por um novo treinamento, completo ou incremental.
+
+    O novo classificador é aquecido na thread de observação e entregue por
+    `poll`, para que o laço de inferência o troque entre dois frames sem
+    interromper a câmera.
+    """
+
+    def __init__(self, models_dir=MODELS_DIR, interval=RELOAD_INTERVAL, cascade=False, precision="float32"):
+        self.models_dir = models_dir
+        self.interval = interval
+        self.cascade = cascade
+        self.precision = precision
+        self.reloads = 0
+        self._ready = queue.SimpleQueue()
+        self._stop = threading.Event()
+        self._signature = self._read_signature()
+        self._thread = threading.Thread(target=self._watch, name="model-watcher", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _read_signature(self):
+        # Usando o estado do treinamento quando existir, ou o artefato carregado na sua ausência.
+        for name in (STATE_FILE, "librasign_mlp.npz", "librasign_mlp.pkl"):
+            try:
+                stat = os.stat(os.path.join(self.models_dir, name))
+            except FileNotFoundError:
+                continue
+            return name, stat.st_mtime_ns, stat.st_size
+        return None
+
+    def _watch(self):
+        while not self._stop.wait(self.interval):
+            signature = self._read_signature()
+            if signature == self._signature:
+                continue
+            try:
+                predict_proba, class_names = load_classifier(self.models_dir, self.cascade, self.precision)
+                # Aquecendo o novo classificador antes de entregá-lo ao laço de inferência.
+                predict_proba(np.zeros((1, N_FEATURES), dtype=np.float32))
+            except Exception as e:
+                # Mantendo o classificador atual e tentando novamente na próxima verificação.
+                print(f"[AVISO] Falha ao recarregar os artefatos do modelo: {e}")
+                continue
+            # Descartando uma carga que coincidiu com outra gravação em andamento.
+            if self._read_signature() != signature:
+                continue
+            self._signature = signature
+            self.reloads += 1
+            self._ready.put((predict_proba, class_names))
+
+    def poll(self):
+        """Retornando o par (predict_proba, class_names) recarregado mais recente, ou None."""
+        item = None
+        while True:
+            try:
+                item = self._ready.get_nowait()
+            except queue.Empty:
+                return item
+
+    def stop(self):
+        self._stop.set()
+
+
+def _time_per_call(fn, X, repeat):
+    # Medindo a latência média por chamada em microssegundos.
+    fn(X)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(X)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+# Verificando a paridade e a latência do motor frente ao scikit-learn.
+if __name__ == "__main__":
+    print("[INFO] Carregando modelo MLP, normalizador e motor exportado")
+    with open("models/librasign_mlp.pkl", 'rb') as f:
+        model = pickle.load(f)
+    with open("models/scaler.pkl", 'rb') as f:
+        scaler = pickle.load(f)
+    if not os.path.exists(ENGINE_PATH):
+        # Convertendo os pickles existentes no artefato compacto usado pela inferência.
+        export_engine(model, scaler, ENGINE_PATH, np.load(os.path.join(MODELS_DIR, "classes.npy")))
+        print(f"[INFO] Motor de inferência exportado em '{ENGINE_PATH}'")
+    engine = MLPEngine.load(ENGINE_PATH)
+
+    # Gerando amostras sintéticas na distribuição aprendida pelo scaler.
+    rng = np.random.default_rng(42)
+    X = (rng.standard_normal((2000, engine.n_features)) * scaler.scale_ + scaler.mean_).astype(np.float32)
+
+    expected = model.predict_proba(scaler.transform(X))
+    actual = engine.predict_proba(X).copy()
+    max_diff = np.abs(expected - actual).max()
+    agreement = np.mean(expected.argmax(axis=1) == actual.argmax(axis=1))
+    print(f"[RESULTADO] Diferença máxima de probabilidade: {max_diff:.2e}")
+    print(f"[RESULTADO] Concordância de classe: {agreement * 100:.2f}%")
+    if max_diff > 1e-4 or agreement < 0.999:
+        raise SystemExit("[ERRO] Motor NumPy divergente do predict_proba do scikit-learn")
+
+    # Comparando a latência por chamada com um único frame, como no laço de inferência.
+    row = X[:1]
+    sklearn_us = _time_per_call(lambda x: model.predict_proba(scaler.transform(x)), row, 2000)
+    engine_us = _time_per_call(engine.predict_proba, row, 2000)
+    print(f"[RESULTADO] scikit-learn: {sklearn_us:.1f} us/chamada")
+    print(f"[RESULTADO] Motor NumPy:  {engine_us:.1f} us/chamada ({sklearn_us / engine_us:.1f}x)")
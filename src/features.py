@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+"""
+Normalização Geométrica dos Landmarks
+
+Este módulo concentra o pré-processamento aplicado às 63 coordenadas (x, y, z)
+dos 21 landmarks da mão, sendo importado tanto pelo treinamento quanto pela
+inferência para garantir que ambos utilizem exatamente a mesma transformação.
+"""
+import numpy as np
+
+# Quantidade de pontos anatômicos retornados pelo MediaPipe Hands.
+N_LANDMARKS = 21
+# Quantidade de coordenadas por amostra (21 pontos x 3 eixos).
+N_FEATURES = N_LANDMARKS * 3
+# Índices do pulso e da base do dedo médio, usados como referência geométrica.
+WRIST = 0
+MIDDLE_MCP = 9
+# Escala mínima aceita antes de considerar a distância degenerada.
+MIN_SCALE = 1e-6
+
+
+def normalize_landmarks(data, out=None):
+    """
+    Normalizando um lote de landmarks para ser invariante à posição e à
+    escala da mão, sem laços em Python.
+
+    Args:
+        data: Array com formato (N, 63) ou (63,) contendo as coordenadas brutas.
+        out: Array float32 opcional com formato (N, 63) para receber o resultado,
+             podendo ser o próprio `data` para normalização in-place.
+
+    Returns:
+        np.ndarray: Array float32 com formato (N, 63).
+    """
+    landmarks = np.asarray(data).reshape(-1, N_LANDMARKS, 3)
+    if out is None:
+        out = np.empty((landmarks.shape[0], N_FEATURES), dtype=np.float32)
+    points = out.reshape(-1, N_LANDMARKS, 3)
+
+    # Centralizando os pontos em relação ao pulso, copiado antes para que a
+    # normalização in-place não exija uma cópia temporária do lote inteiro.
+    wrist = landmarks[:, WRIST:WRIST + 1, :].copy()
+    np.subtract(landmarks, wrist, out=points)
+
+    # Normalizando pela distância entre o pulso e a base do dedo médio.
+    scale_dist = np.sqrt(np.einsum('ij,ij->i', points[:, MIDDLE_MCP, :], points[:, MIDDLE_MCP, :]))
+    scale_dist[scale_dist < MIN_SCALE] = 1.0 # Evitando divisão por zero.
+
+    points /= scale_dist[:, None, None]
+    return out
+
+
+class FrameNormalizer:
+    """
+    Normalizando um único frame de landmarks sobre um buffer pré-alocado,
+    evitando alocações a cada chamada no laço de inferência.
+
+    O array retornado é reutilizado na chamada seguinte, devendo ser consumido
+    (ou copiado) antes de normalizar o próximo frame.
+    """
+
+    def __init__(self):
+        # Buffer no formato (1, 63) esperado pelos classificadores.
+        self.buffer = np.empty((1, N_FEATURES), dtype=np.float32)
+        self._points = self.buffer.reshape(N_LANDMARKS, 3)
+
+    def __call__(self, coords):
+        points = self._points
+        landmarks = np.reshape(coords, (N_LANDMARKS, 3))
+
+        # Centralizando os pontos em relação ao pulso.
+        np.subtract(landmarks, landmarks[WRIST], out=points)
+
+        # Normalizando pela distância entre o pulso e a base do dedo médio.
+        reference = points[MIDDLE_MCP]
+        scale_dist = float(np.sqrt(np.dot(reference, reference)))
+        if scale_dist < MIN_SCALE: # Evitando divisão por zero.
+            scale_dist = 1.0
+
+        points /= scale_dist
+        return self.buffer
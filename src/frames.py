@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""
+Preparação dos Frames e Extração de Landmarks
+
+Este módulo concentra o tratamento de cada frame compartilhado pelos laços de
+captura, inferência e processamento em lote: o espelhamento e a conversão
+para RGB escrevem em buffers pré-alocados (argumento `dst` do OpenCV), e as
+coordenadas dos 21 landmarks são copiadas para um único array (21, 3) em
+float32, reutilizado a cada frame.
+
+Quando o frame espelhado não precisa ser exibido, o espelhamento dos pixels
+pode ser substituído pelo espelhamento matemático dos landmarks (x' = 1 - x),
+poupando uma cópia completa do frame.
+"""
+import threading
+
+import cv2
+import numpy as np
+
+from features import N_LANDMARKS
+
+
+class FrameBuffers:
+    """
+    Espelhando e convertendo os frames da câmera sobre buffers pré-alocados,
+    realocados apenas quando a resolução muda.
+
+    Nos laços síncronos, o frame espelhado é reaproveitado na chamada seguinte.
+    Com `pooled`, o frame espelhado pode seguir para a renderização em outra
+    thread enquanto o próximo frame é processado: cada chamada recebe um buffer
+    livre, que pertence ao chamador até ser devolvido com `release`, e um novo
+    é criado apenas quando todos estão em uso. O buffer devolvido por último é
+    o primeiro reaproveitado, por ainda estar no cache do processador. O buffer
+    RGB é consumido de forma síncrona pelo MediaPipe e reaproveitado na chamada
+    seguinte.
+    """
+
+    def __init__(self, pooled=False):
+        self.pooled = pooled
+        self.allocations = 0
+        self._free = []
+        self._lock = threading.Lock()
+        self._rgb = {}
+
+    def flip(self, frame):
+        """Espelhando o frame horizontalmente em um buffer pré-alocado."""
+        with self._lock:
+            out = self._free.pop() if self._free else None
+        if out is None or out.shape != frame.shape:
+            # Descartando os buffers de outra resolução e alocando um novo.
+            out = np.empty_like(frame)
+            self.allocations += 1
+        if not self.pooled:
+            self._free.append(out)
+        return cv2.flip(frame, 1, dst=out)
+
+    def release(self, frame):
+        """Devolvendo ao conjunto livre um frame espelhado com `pooled`, que deixa de ser usado pelo chamador."""
+        if self.pooled:
+            with self._lock:
+                self._free.append(frame)
+
+    def to_rgb(self, frame):
+        """
+        Convertendo o frame BGR para o formato RGB do MediaPipe, retornando um
+        buffer não gravável, válido até a próxima conversão com a mesma resolução.
+        """
+        rgb = self._rgb.get(frame.shape)
+        if rgb is None:
+            # Mantendo um buffer por resolução, como a reduzida das poses estáveis.
+            rgb = self._rgb[frame.shape] = np.empty_like(frame)
+            self.allocations += 1
+        rgb.flags.writeable = True
+        cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=rgb)
+        # Otimizando o desempenho ao passar a imagem como não gravável.
+        rgb.flags.writeable = False
+        return rgb
+
+
+class LandmarkBuffer:
+    """
+    Copiando as coordenadas dos landmarks de uma mão para um array (21, 3) em
+    float32 pré-alocado, opcionalmente espelhando-as horizontalmente.
+
+    O array retornado é reutilizado na chamada seguinte, devendo ser consumido
+    (ou copiado) antes de extrair o próximo frame.
+    """
+
+    def __init__(self, mirror=False):
+        self.mirror = mirror
+        self.coords = np.empty((N_LANDMARKS, 3), dtype=np.float32)
+        self._flat = self.coords.reshape(-1)
+        self._x = self.coords[:, 0]
+
+    def fill(self, hand_landmarks, out=None):
+        """
+        Copiando as coordenadas para o array do buffer ou, com `out`, para uma
+        linha (63,) de um lote pré-alocado, retornando o array preenchido.
+        """
+        flat = self._flat if out is None else out
+        i = 0
+        for lm in hand_landmarks.landmark:
+            flat[i] = lm.x
+            flat[i + 1] = lm.y
+            flat[i + 2] = lm.z
+            i += 3
+        if self.mirror:
+            # Espelhando as coordenadas normalizadas como o cv2.flip espelharia os pixels.
+            x = self._x if out is None else out[0::3]
+            np.subtract(1.0, x, out=x)
+        return self.coords if out is None else out
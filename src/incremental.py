@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+Treinamento Incremental do Classificador
+
+Acrescentar amostras de uma letra não exige repetir a validação cruzada e o
+treinamento do zero. Este módulo compara o manifesto do cache de dados com o
+estado gravado pelo último treinamento e identifica, por classe:
+    - arquivos inalterados, cujas amostras já foram vistas pelo modelo;
+    - arquivos que apenas receberam novas linhas, das quais só as novas são usadas;
+    - arquivos reescritos, cujas amostras são todas tratadas como novas.
+
+O StandardScaler é atualizado com os momentos acumulados das amostras novas
+(`partial_fit`), sem recalcular as estatísticas do dataset inteiro. Quando
+algum arquivo foi reescrito, as estatísticas ainda incluem amostras que
+deixaram de existir, e o scaler é reajustado sobre o dataset atual. O MLP
+continua o treinamento a partir dos pesos atuais com `partial_fit`, sobre as
+amostras novas misturadas a uma amostra aleatória das antigas (replay), que
+evita o esquecimento das demais classes.
+
+Classes novas ou removidas mudam a camada de saída e exigem o treinamento
+completo. Uso:
+    python src/train.py --data-dir data/landmarks --incremental
+"""
+import os
+import pickle
+import time
+
+import numpy as np
+
+from dataset import build_cache, is_extension, open_dataset, read_manifest
+from train import RANDOM_STATE, fit_scaler, load_state, save_artifacts
+
+# Quantidade máxima de amostras antigas, fora do replay, usadas para medir o esquecimento.
+EVAL_SAMPLES = 5000
+
+
+def find_new_samples(files, previous, class_offsets):
+    """
+    Separando os índices do dataset combinado em amostras novas e amostras
+    já vistas pelo modelo, classe a classe.
+
+    Returns:
+        tuple: Os índices novos, os antigos e a situação de cada classe.
+    """
+    new_index = []
+    old_index = []
+    status = {}
+    for label, (start, end) in class_offsets.items():
+        entry = files[label]
+        old = previous.get(label)
+        if old is not None and old["hash"] == entry["hash"]:
+            seen = end - start
+            status[label] = "inalterado"
+        elif old is not None and is_extension(entry["source"], old):
+            seen = old["rows"]
+            status[label] = f"{end - start - seen} novas amostras"
+        else:
+            seen = 0
+            status[label] = "reescrito" if old is not None else "sem registro"
+        old_index.append(np.arange(start, start + seen))
+        new_index.append(np.arange(start + seen, end))
+    return np.concatenate(new_index), np.concatenate(old_index), status
+
+
+def update_model(data_dir, cache_dir, models_dir, epochs=20, replay_ratio=2.0):
+    """Atualizando os artefatos do modelo com as amostras novas ou alteradas."""
+    start_time = time.perf_counter()
+    try:
+        state = load_state(models_dir)
+    except FileNotFoundError:
+        raise SystemExit("[ERRO] Estado do treinamento ausente, execute primeiro o treinamento completo")
+    if not state.get("files"):
+        raise SystemExit("[ERRO] O último treinamento não usou o cache, execute o treinamento completo sem --no-cache")
+
+    with open(os.path.join(models_dir, "librasign_mlp.pkl"), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(models_dir, "scaler.pkl"), 'rb') as f:
+        scaler = pickle.load(f)
+    trained_classes = np.load(os.path.join(models_dir, "classes.npy"))
+
+    entry_dir = build_cache(data_dir, cache_dir)
+    files = read_manifest(cache_dir)
+    X, y, classes = open_dataset(entry_dir)
+    if list(classes) != list(trained_classes):
+        raise SystemExit(f"[ERRO] As classes mudaram ({list(trained_classes)} -> {list(classes)}), "
+                         "execute o treinamento completo")
+
+    # Localizando o intervalo de cada classe, contíguo no dataset combinado.
+    counts = np.bincount(y, minlength=len(classes))
+    ends = np.cumsum(counts)
+    class_offsets = {label: (int(end - count), int(end)) for label, end, count in zip(classes, ends, counts)}
+    new_index, old_index, status = find_new_samples(files, state["files"], class_offsets)
+    for label, label_status in status.items():
+        print(f"[INFO] Classe '{label}': {label_status}")
+    if len(new_index) == 0:
+        print("[INFO] Nenhuma amostra nova, os artefatos permanecem inalterados")
+        return
+
+    rng = np.random.default_rng(RANDOM_STATE)
+    replay_size = min(len(old_index), int(len(new_index) * replay_ratio))
+    shuffled_old = rng.permutation(old_index)
+    replay_index, eval_index = shuffled_old[:replay_size], shuffled_old[replay_size:replay_size + EVAL_SAMPLES]
+    X_new, y_new = X[new_index], y[new_index]
+    X_eval, y_eval = X[np.sort(eval_index)], y[np.sort(eval_index)]
+
+    def accuracy(X_part, y_part):
+        if len(y_part) == 0:
+            return float("nan")
+        return float(np.mean(model.predict(scaler.transform(X_part)) == y_part))
+
+    before_new, before_old = accuracy(X_new, y_new), accuracy(X_eval, y_eval)
+
+    if any(label_status in ("reescrito", "sem registro") for label_status in status.values()):
+        # Reajustando o scaler, pois as amostras substituídas ainda compõem os momentos acumulados.
+        scaler = fit_scaler(X)
+        print("[INFO] Scaler reajustado sobre o dataset atual, pois há arquivos reescritos")
+    else:
+        # Atualizando média e variância do scaler com os momentos das amostras novas.
+        scaler.partial_fit(X_new)
+
+    # Continuando o treinamento a partir dos pesos atuais, com replay das amostras antigas.
+    train_index = np.concatenate([new_index, np.sort(replay_index)])
+    X_train, y_train = scaler.transform(X[train_index]), y[train_index]
+    for _ in range(epochs):
+        order = rng.permutation(len(y_train))
+        model.partial_fit(X_train[order], y_train[order])
+
+    after_new, after_old = accuracy(X_new, y_new), accuracy(X_eval, y_eval)
+    save_artifacts(model, scaler, classes, models_dir, files, mode="incremental")
+
+    print("-" * 30)
+    print(f"[RESULTADO] {len(new_index)} amostras novas e {replay_size} de replay, {epochs} épocas")
+    print(f"[RESULTADO] Acurácia nas amostras novas: {before_new * 100:.2f}% -> {after_new * 100:.2f}%")
+    print(f"[RESULTADO] Acurácia em {len(eval_index)} amostras antigas fora do replay: "
+          f"{before_old * 100:.2f}% -> {after_old * 100:.2f}%")
+    print(f"[RESULTADO] Atualização concluída em {time.perf_counter() - start_time:.2f}s")
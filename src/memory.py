@@ -0,0 +1,76 @@
+# -*- coding: utf-8 -*-
+"""
+Medição do Uso de Memória
+
+Este módulo mede a memória residente (RSS) do processo e o seu pico. No Linux,
+o pico pode ser reiniciado a cada fase (via /proc/self/clear_refs), permitindo
+atribuir o pico a fases específicas do treinamento; nos demais sistemas, é
+reportado o pico acumulado desde o início do processo.
+"""
+import sys
+import time
+from contextlib import contextmanager
+
+STATUS_PATH = "/proc/self/status"
+CLEAR_REFS_PATH = "/proc/self/clear_refs"
+
+
+def _read_status(field):
+    # Lendo um campo em KB de /proc/self/status, quando disponível.
+    try:
+        with open(STATUS_PATH, 'r') as f:
+            for line in f:
+                if line.startswith(field + ":"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def peak_memory_mb(children=False):
+    """
+    Retornando o pico de memória residente, em MB, do processo atual ou do
+    maior dos processos filhos já encerrados, quando disponível.
+    """
+    if not children:
+        peak = _read_status("VmHWM")
+        if peak is not None:
+            return peak
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    # O Linux reporta em KB e o macOS em bytes.
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def current_memory_mb():
+    """Retornando a memória residente atual do processo, em MB, quando disponível."""
+    return _read_status("VmRSS")
+
+
+def reset_peak():
+    """Reiniciando o pico de memória residente do processo, retornando se foi possível."""
+    try:
+        with open(CLEAR_REFS_PATH, 'w') as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _format_mb(value):
+    return f"{value:.0f} MB" if value is not None else "indisponível"
+
+
+@contextmanager
+def memory_phase(name):
+    """Reportando, ao final de uma fase, o seu tempo e o pico de memória residente."""
+    per_phase = reset_peak()
+    start = time.perf_counter()
+    yield
+    peak = peak_memory_mb()
+    scope = "pico da fase" if per_phase else "pico acumulado"
+    print(f"[INFO] Memória '{name}': {scope} {_format_mb(peak)}, atual {_format_mb(current_memory_mb())} "
+          f"({time.perf_counter() - start:.2f}s)")
@@ -0,0 +1,245 @@
+# -*- coding: utf-8 -*-
+"""
+Instrumentação do Laço de Inferência
+
+Este módulo coleta, durante a execução do predict.py, o tempo de cada estágio
+em janelas móveis e histogramas acumulados, a taxa de detecção de mãos, a
+contagem de votos descartados por baixa confiança e o tempo entre o primeiro
+voto estável de uma letra e a sua confirmação.
+
+As métricas podem ser exibidas sobre o vídeo e exportadas periodicamente como
+arquivo texto do Prometheus (.prom) ou como log JSON por linha (.jsonl).
+Quando desativada, a instrumentação é substituída por `NullMetrics`, cujos
+métodos não executam nenhuma operação.
+"""
+import bisect
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+
+# Limites superiores, em segundos, dos histogramas de tempo por estágio.
+STAGE_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+# Limites superiores, em segundos, do histograma de tempo até a confirmação.
+CONFIRM_BUCKETS = (0.5, 1.0, 2.0, 2.5, 3.0, 4.0, 6.0, 10.0)
+# Quantidade de medições mantidas na janela móvel de cada estágio.
+WINDOW_SIZE = 300
+
+
+class Histogram:
+    """Histograma acumulado no formato do Prometheus, com uma janela móvel de amostras."""
+
+    def __init__(self, buckets, window=WINDOW_SIZE):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+        self.window = np.zeros(window)
+        self._next = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+        # Sobrescrevendo a amostra mais antiga da janela circular.
+        self.window[self._next] = value
+        self._next = (self._next + 1) % len(self.window)
+
+    def percentiles(self, *qs):
+        """Calculando percentis sobre as amostras da janela móvel."""
+        filled = self.window[:min(self.count, len(self.window))]
+        if not len(filled):
+            return [0.0] * len(qs)
+        return list(np.percentile(filled, qs))
+
+
+class Metrics:
+    """Coletando as métricas do laço de inferência."""
+
+    enabled = True
+
+    def __init__(self, path=None, interval=10.0):
+        self.path = path
+        self.interval = interval
+        self.stages = {}
+        # Protegendo a inclusão de estágios, registrados pelas threads do pipeline.
+        self._stages_lock = threading.Lock()
+        self.frames = 0
+        self.hand_frames = 0
+        self.low_confidence_votes = 0
+        self.letters_confirmed = 0
+        self.time_to_confirm = Histogram(CONFIRM_BUCKETS)
+        self.last_time_to_confirm = {}
+        self._frame_times = deque(maxlen=60)
+        self._last_export = time.time()
+
+    def clock(self):
+        return time.perf_counter()
+
+    def record(self, stage, start):
+        """Registrando a duração de um estágio iniciado em `start`."""
+        elapsed = time.perf_counter() - start
+        histogram = self.stages.get(stage)
+        if histogram is None:
+            with self._stages_lock:
+                histogram = self.stages.setdefault(stage, Histogram(STAGE_BUCKETS))
+        histogram.observe(elapsed)
+
+    def stage_items(self):
+        """Copiando os estágios registrados, percorridos enquanto outras threads incluem novos."""
+        with self._stages_lock:
+            return list(self.stages.items())
+
+    def observe(self, recognizer, detected, was_confirmed, now):
+        """
+        Registrando o resultado de um frame após a atualização do reconhecedor.
+
+        Args:
+            recognizer: O SignRecognizer já atualizado com o frame.
+            detected: Se uma mão foi detectada no frame.
+            was_confirmed: O valor de `letter_confirmed` antes da atualização.
+            now: O instante usado na atualização.
+        """
+        self.frames += 1
+        self._frame_times.append(time.perf_counter())
+        if detected:
+            self.hand_frames += 1
+            # Contando os votos descartados por confiança insuficiente.
+            if recognizer.predictions_history and recognizer.predictions_history[-1] is None:
+                self.low_confidence_votes += 1
+        if recognizer.letter_confirmed and not was_confirmed:
+            elapsed = now - recognizer.stable_letter_start_time
+            self.letters_confirmed += 1
+            self.time_to_confirm.observe(elapsed)
+            self.last_time_to_confirm[recognizer.current_stable_letter] = elapsed
+
+    @property
+    def fps(self):
+        if len(self._frame_times) < 2:
+            return 0.0
+        return (len(self._frame_times) - 1) / (self._frame_times[-1] - self._frame_times[0])
+
+    @property
+    def detection_rate(self):
+        return self.hand_frames / self.frames if self.frames else 0.0
+
+    def overlay_lines(self):
+        """Montando as linhas do painel compacto exibido sobre o vídeo."""
+        lines = [f"FPS {self.fps:.1f}  mao {self.detection_rate * 100:.0f}%  baixa conf. {self.low_confidence_votes}"]
+        for stage, histogram in self.stage_items():
+            p50, p95 = histogram.percentiles(50, 95)
+            lines.append(f"{stage}: {p50 * 1000:.1f}/{p95 * 1000:.1f} ms")
+        if self.time_to_confirm.count:
+            lines.append(f"confirmacao: {self.time_to_confirm.total / self.time_to_confirm.count:.2f} s")
+        return lines
+
+    def draw(self, frame):
+        # Desenhando o painel no canto superior direito do frame.
+        import cv2
+
+        W = frame.shape[1]
+        for i, line in enumerate(self.overlay_lines()):
+            cv2.putText(frame, line, (W - 330, 20 + i * 18), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1, cv2.LINE_AA)
+
+    def maybe_export(self):
+        """Exportando as métricas se o intervalo configurado tiver passado."""
+        if self.path and time.time() - self._last_export >= self.interval:
+            self.export()
+
+    def export(self):
+        if not self.path:
+            return
+        self._last_export = time.time()
+        if self.path.endswith(".prom"):
+            # Gravando de forma atômica para que o coletor nunca leia um arquivo parcial.
+            temp_path = self.path + ".tmp"
+            with open(temp_path, 'w') as f:
+                f.write(self.to_prometheus())
+            os.replace(temp_path, self.path)
+        else:
+            with open(self.path, 'a') as f:
+                f.write(json.dumps(self.to_dict()) + "\n")
+
+    def to_dict(self):
+        stages = {}
+        for stage, histogram in self.stage_items():
+            p50, p95, p99 = histogram.percentiles(50, 95, 99)
+            stages[stage] = {"count": histogram.count, "p50_ms": p50 * 1000, "p95_ms": p95 * 1000, "p99_ms": p99 * 1000}
+        confirmations = self.time_to_confirm
+        return {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "frames": self.frames,
+            "fps": self.fps,
+            "detection_rate": self.detection_rate,
+            "low_confidence_votes": self.low_confidence_votes,
+            "letters_confirmed": self.letters_confirmed,
+            "time_to_confirm_mean_s": confirmations.total / confirmations.count if confirmations.count else None,
+            "time_to_confirm_last_s": self.last_time_to_confirm,
+            "stages": stages,
+        }
+
+    def to_prometheus(self):
+        lines = []
+
+        def histogram_lines(name, histogram, labels=""):
+            cumulative = 0
+            separator = "," if labels else ""
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}{separator}le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels}{separator}le="+Inf"}} {histogram.count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {histogram.total}")
+            lines.append(f"{name}_count{suffix} {histogram.count}")
+
+        lines.append("# HELP librasign_stage_seconds Tempo de cada estágio do laço de inferência.")
+        lines.append("# TYPE librasign_stage_seconds histogram")
+        for stage, histogram in self.stage_items():
+            histogram_lines("librasign_stage_seconds", histogram, f'stage="{stage}"')
+
+        lines.append("# HELP librasign_time_to_confirm_seconds Tempo entre o primeiro voto estável e a confirmação.")
+        lines.append("# TYPE librasign_time_to_confirm_seconds histogram")
+        histogram_lines("librasign_time_to_confirm_seconds", self.time_to_confirm)
+
+        counters = (
+            ("librasign_frames_total", "Frames processados.", self.frames),
+            ("librasign_hand_frames_total", "Frames com mão detectada.", self.hand_frames),
+            ("librasign_low_confidence_votes_total", "Votos descartados por baixa confiança.", self.low_confidence_votes),
+            ("librasign_letters_confirmed_total", "Letras confirmadas.", self.letters_confirmed),
+        )
+        for name, description, value in counters:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        lines.append("# HELP librasign_fps Taxa de frames processados por segundo.")
+        lines.append("# TYPE librasign_fps gauge")
+        lines.append(f"librasign_fps {self.fps}")
+        return "\n".join(lines) + "\n"
+
+
+class NullMetrics:
+    """Substituindo a instrumentação desativada por operações vazias."""
+
+    enabled = False
+
+    def clock(self):
+        return 0.0
+
+    def record(self, stage, start):
+        pass
+
+    def observe(self, recognizer, detected, was_confirmed, now):
+        pass
+
+    def draw(self, frame):
+        pass
+
+    def maybe_export(self):
+        pass
+
+    def export(self):
+        pass
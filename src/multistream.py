@@ -0,0 +1,265 @@
+# -*- coding: utf-8 -*-
+"""
+Reconhecimento Simultâneo de Várias Fontes de Vídeo e Várias Mãos
+
+Este script atende, em um único processo, várias câmeras (índices de
+dispositivo) ou vídeos gravados, considerando todas as mãos detectadas em
+cada fonte. A cada ciclo, o MediaPipe é executado em paralelo sobre o frame
+mais recente de cada fonte, com uma instância de `Hands` por fonte, e os
+landmarks de todas as fontes e mãos são empilhados em um único lote para a
+normalização e o classificador. Cada par (fonte, mão) mantém a sua própria
+suavização temporal e a sua própria frase.
+
+As mãos são identificadas pela lateralidade informada pelo MediaPipe
+("Left"/"Right"), que permanece estável entre frames consecutivos.
+
+Uso:
+    python src/multistream.py 0 1 --max-hands 2
+    python src/multistream.py sala1.mp4 sala2.mp4 --no-display
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from decoder import DECODER_MODES, build_recognizer
+from display import render_hands
+from engine import MODELS_DIR, load_classifier
+from features import N_FEATURES, normalize_landmarks
+from frames import FrameBuffers, LandmarkBuffer
+from pipeline import LatestQueue
+
+# Intervalo entre os relatórios de desempenho no console.
+STATS_INTERVAL = 5.0
+
+
+def parse_source(source):
+    # Interpretando números como índices de dispositivo e o restante como arquivos.
+    return int(source) if source.isdigit() else source
+
+
+class Stream:
+    """
+    Fonte de vídeo com a sua própria instância do MediaPipe Hands. Câmeras são
+    lidas por uma thread dedicada, mantendo apenas o frame mais recente;
+    arquivos são lidos quadro a quadro, usando o instante do vídeo como relógio.
+    """
+
+    def __init__(self, index, source, max_hands):
+        self.index = index
+        self.source = source
+        self.live = isinstance(source, int)
+        self.capture = cv2.VideoCapture(source)
+        if not self.capture.isOpened():
+            raise SystemExit(f"[ERRO] Não foi possível abrir a fonte de vídeo: {source}")
+        self.hands = mp.solutions.hands.Hands(
+            max_num_hands=max_hands,
+            min_detection_confidence=0.7,
+            min_tracking_confidence=0.7
+        )
+        self.finished = False
+        self.frames_processed = 0
+        self.frames = LatestQueue(1)
+        # Buffers do espelhamento e da conversão de cores, próprios de cada fonte.
+        self.buffers = FrameBuffers()
+        if self.live:
+            self._reader = threading.Thread(target=self._read_loop, name=f"camera-{index}", daemon=True)
+            self._reader.start()
+
+    def _read_loop(self):
+        try:
+            while not self.finished:
+                ret, frame = self.capture.read()
+                if not ret:
+                    print(f"[AVISO] Frame da fonte {self.source} não pôde ser lido, encerrando")
+                    break
+                self.frames.put((time.time(), frame))
+        finally:
+            self.frames.close()
+
+    def next(self):
+        """Retornando o próximo par (instante, frame), ou None se não houver frame novo."""
+        if self.live:
+            item = self.frames.get(timeout=0)
+            if item is None and self.frames.closed:
+                self.finished = True
+            return item
+        ret, frame = self.capture.read()
+        if not ret:
+            self.finished = True
+            return None
+        return self.capture.get(cv2.CAP_PROP_POS_MSEC) / 1000.0, frame
+
+    def detect(self, frame):
+        """Espelhando o frame e executando o MediaPipe, que libera o GIL durante o grafo."""
+        frame = self.buffers.flip(frame)
+        result = self.hands.process(self.buffers.to_rgb(frame))
+        self.frames_processed += 1
+        return frame, result
+
+    def close(self):
+        self.finished = True
+        self.hands.close()
+        self.capture.release()
+
+
+def hand_entries(result):
+    """Listando as mãos detectadas com uma chave estável baseada na lateralidade."""
+    if not result.multi_hand_landmarks:
+        return []
+    entries = []
+    for hand_landmarks, handedness in zip(result.multi_hand_landmarks, result.multi_handedness):
+        key = handedness.classification[0].label
+        # Diferenciando mãos com a mesma lateralidade no mesmo frame.
+        while key in (entry[0] for entry in entries):
+            key += "+"
+        entries.append((key, hand_landmarks))
+    return entries
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Reconhecimento simultâneo de várias fontes de vídeo e mãos")
+    parser.add_argument("sources", nargs="+", help="Índices de câmera ou caminhos de vídeo")
+    parser.add_argument("--max-hands", type=int, default=2, help="Mãos detectadas por fonte")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+    parser.add_argument("--decoder", choices=("majority",) + DECODER_MODES, default="majority",
+                        help="Suavização temporal: votação majoritária ou agregado das probabilidades")
+    parser.add_argument("--no-display", action="store_true", help="Executando sem janelas, reportando no console")
+    parser.add_argument("--no-batch", action="store_true",
+                        help="Classificando cada mão separadamente, para comparação de custo")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Carregando os artefatos do modelo uma única vez para todas as fontes.
+    print("[INFO] Carregando classificador e classes")
+    predict_proba, class_names = load_classifier(args.models_dir)
+
+    streams = [Stream(i, parse_source(source), args.max_hands) for i, source in enumerate(args.sources)]
+    print(f"[INFO] {len(streams)} fonte(s) com até {args.max_hands} mão(s) cada")
+
+    # Pré-alocando os lotes com a capacidade máxima de mãos por ciclo.
+    capacity = len(streams) * args.max_hands
+    raw = np.empty((capacity, N_FEATURES), dtype=np.float32)
+    normalized = np.empty((capacity, N_FEATURES), dtype=np.float32)
+    # Copiando os landmarks de cada mão diretamente para a sua linha do lote.
+    landmark_buffer = LandmarkBuffer()
+
+    # Mantendo um reconhecedor independente por par (fonte, mão).
+    recognizers = {}
+    confirmation_time = build_recognizer(class_names, args.decoder).confirmation_time
+    classifier_calls = 0
+    hands_classified = 0
+    ticks = 0
+    cpu_start = time.process_time()
+    wall_start = last_stats_time = time.time()
+
+    executor = ThreadPoolExecutor(max_workers=len(streams))
+    try:
+        while not all(stream.finished for stream in streams):
+            items = []
+            for stream in streams:
+                if not stream.finished:
+                    item = stream.next()
+                    if item is not None:
+                        items.append((stream, item[0], item[1]))
+            if not items:
+                time.sleep(0.002)
+                continue
+            ticks += 1
+
+            # Executando o MediaPipe de todas as fontes em paralelo.
+            detections = list(executor.map(lambda item: item[0].detect(item[2]), items))
+
+            # Empilhando os landmarks de todas as fontes e mãos em um único lote.
+            owners = []
+            for (stream, now, _), (_, result) in zip(items, detections):
+                for key, hand_landmarks in hand_entries(result):
+                    landmark_buffer.fill(hand_landmarks, out=raw[len(owners)])
+                    owners.append((stream.index, key, hand_landmarks, now))
+
+            n = len(owners)
+            if n:
+                normalize_landmarks(raw[:n], out=normalized[:n])
+                if args.no_batch:
+                    proba = np.vstack([predict_proba(normalized[i:i + 1]) for i in range(n)])
+                    classifier_calls += n
+                else:
+                    proba = predict_proba(normalized[:n])
+                    classifier_calls += 1
+                hands_classified += n
+
+            # Atualizando cada par (fonte, mão) com a sua linha do lote.
+            seen = set()
+            for i, (stream_index, key, _, now) in enumerate(owners):
+                pair = (stream_index, key)
+                recognizer = recognizers.get(pair)
+                if recognizer is None:
+                    recognizer = recognizers[pair] = build_recognizer(class_names, args.decoder)
+                confirmed = len(recognizer.sentence)
+                recognizer.update(proba[i], now)
+                seen.add(pair)
+                if args.no_display and len(recognizer.sentence) > confirmed:
+                    print(f"[RESULTADO] fonte {streams[stream_index].source} / {key}: {''.join(recognizer.sentence)}")
+
+            # Reiniciando a suavização das mãos que saíram de cena nas fontes processadas.
+            for stream, now, _ in items:
+                for pair, recognizer in recognizers.items():
+                    if pair[0] == stream.index and pair not in seen:
+                        recognizer.update(None, now)
+
+            if not args.no_display:
+                for (stream, now, _), (frame, result) in zip(items, detections):
+                    detected = dict(hand_entries(result))
+                    hands = [
+                        (key, detected.get(key), recognizer.snapshot())
+                        for (stream_index, key), recognizer in recognizers.items()
+                        if stream_index == stream.index
+                    ]
+                    render_hands(frame, hands, now, confirmation_time)
+                    cv2.imshow(f"Librasign - fonte {stream.source}", frame)
+                key = cv2.waitKey(1) & 0xFF
+                # Tecla ESC para sair.
+                if key == 27:
+                    break
+                # Tecla 'c' para limpar todas as frases.
+                if key == ord('c'):
+                    for recognizer in recognizers.values():
+                        recognizer.clear()
+
+            if time.time() - last_stats_time >= STATS_INTERVAL:
+                frames = sum(stream.frames_processed for stream in streams)
+                print(f"[INFO] ciclos={ticks} frames={frames} mãos={hands_classified} "
+                      f"chamadas_classificador={classifier_calls}")
+                last_stats_time = time.time()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown()
+        for stream in streams:
+            stream.close()
+        cv2.destroyAllWindows()
+
+    # Reportando o custo total amortizado por fonte.
+    wall = time.time() - wall_start
+    cpu = time.process_time() - cpu_start
+    frames = sum(stream.frames_processed for stream in streams)
+    print("-" * 30)
+    for stream in streams:
+        print(f"[RESULTADO] fonte {stream.source}: {stream.frames_processed} frames")
+    for (stream_index, key), recognizer in sorted(recognizers.items()):
+        print(f"[RESULTADO] fonte {streams[stream_index].source} / {key}: {''.join(recognizer.sentence)}")
+    print(f"[RESULTADO] {hands_classified} mão(s) classificada(s) em {classifier_calls} chamada(s) ao classificador")
+    if frames:
+        print(f"[RESULTADO] CPU: {cpu / frames * 1000:.2f} ms por frame, {cpu / len(streams):.2f}s por fonte "
+              f"em {wall:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
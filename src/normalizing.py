@@ -6,78 +6,220 @@ Aviso: Este módulo representa uma abordagem de processamento baseada em imagens
 e não está sendo utilizado pela metodologia atual do projeto, que opera
 diretamente sobre coordenadas geométricas (landmarks).
 
-Este arquivo está sendo mantido para fins de documentação.
+Este arquivo está sendo mantido para fins de documentação e para experimentos
+de comparação. As imagens são decodificadas e redimensionadas em paralelo e
+entregues em lotes com formato (N, 224, 224, 1), sem acumular o conjunto
+inteiro em listas. O tensor pré-processado pode ser gravado uma única vez em um
+cache em memória mapeada, reaproveitado enquanto as imagens não mudarem.
+
+Uso:
+    python src/normalizing.py --data-dir data/raw --workers 8
 """
+import argparse
+import hashlib
+import json
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
 import cv2
 import numpy as np
 
+from memory import peak_memory_mb
+
 # Diretório fonte para as imagens brutas.
 DATA_DIR = "data/raw"
+# Diretório do cache do tensor pré-processado.
+CACHE_DIR = "data/cache/images"
 
 # Dimensão padronizada para as imagens, garantindo entrada uniforme na rede neural.
 IMG_SIZE = 224
+# Quantidade de imagens por lote entregue ao consumidor.
+BATCH_SIZE = 256
 
 
-def load_and_preprocess_images():
+def list_images(data_dir=DATA_DIR):
     """
-    Executando o carregamento e o pré-processamento de um conjunto de dados visual,
-    percorrendo a estrutura de diretórios, processando as imagens em escala
-    monocromática, redimensionando-as e normalizando seus valores de pixel.
-    
-    Returns:
-        tuple: Uma estrutura contendo dois arrays NumPy:
-               - data: Um tensor com as imagens processadas.
-               - labels: Um vetor com os identificadores categóricos.
+    Percorrendo a estrutura de diretórios, em que cada subdiretório é uma
+    classe, e listando os caminhos das imagens com os seus rótulos.
     """
-    data = []
+    paths = []
     labels = []
-    
-    # Percorrendo a estrutura de diretórios para identificar as classes.
-    for label in os.listdir(DATA_DIR):
-        label_path = os.path.join(DATA_DIR, label)
-        
+    for label in sorted(os.listdir(data_dir)):
+        label_path = os.path.join(data_dir, label)
+
         # Validando se o item é um diretório.
         if not os.path.isdir(label_path):
             continue
-        
-        # Processando individualmente cada arquivo de imagem.
-        for img_name in os.listdir(label_path):
-            img_path = os.path.join(label_path, img_name)
-            
-            # Carregando a imagem em escala de cinza para otimizar memória e reduzir complexidade.
-            img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
-            
-            # Verificando se a imagem foi carregada corretamente.
-            if img is None:
-                print(f"[AVISO] Não foi possível ler a imagem: {img_path}")
-                continue
-            
-            # Aplicando o redimensionamento para garantir uniformidade dimensional.
-            img = cv2.resize(img, (IMG_SIZE, IMG_SIZE))
-            
-            # Normalizando os valores de pixel para o intervalo [0, 1].
-            img = img.astype(np.float32) / 255.0
-            
-            # Acumulando a imagem processada e seu rótulo.
-            data.append(img)
+        for img_name in sorted(os.listdir(label_path)):
+            paths.append(os.path.join(label_path, img_name))
             labels.append(label)
-    
-    # Convertendo as listas para arrays NumPy para otimização numérica.
-    data = np.array(data)
-    labels = np.array(labels)
-    
-    # Expandindo a dimensionalidade do tensor para o formato (N, H, W, C).
-    data = np.expand_dims(data, axis=-1)
-    
-    return data, labels
+    return paths, np.array(labels)
+
+
+def load_image(img_path):
+    """
+    Carregando uma imagem em escala de cinza e redimensionando-a, no formato
+    uint8. Executado nas threads do pool, já que o OpenCV libera o GIL.
+    """
+    # Carregando a imagem em escala de cinza para otimizar memória e reduzir complexidade.
+    img = cv2.imread(img_path, cv2.IMREAD_GRAYSCALE)
+
+    # Verificando se a imagem foi carregada corretamente.
+    if img is None:
+        return None
+
+    # Aplicando o redimensionamento para garantir uniformidade dimensional.
+    return cv2.resize(img, (IMG_SIZE, IMG_SIZE))
+
+
+def iter_image_batches(data_dir=DATA_DIR, batch_size=BATCH_SIZE, workers=None):
+    """
+    Gerando lotes de imagens pré-processadas, decodificando o lote seguinte em
+    paralelo enquanto o atual é consumido. A memória ocupada fica limitada a
+    cerca de dois lotes, independentemente do tamanho do conjunto.
+
+    Yields:
+        tuple: Um tensor float32 com formato (N, 224, 224, 1), normalizado para
+               o intervalo [0, 1], e o vetor de rótulos correspondente.
+    """
+    paths, labels = list_images(data_dir)
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        def submit(start):
+            return [executor.submit(load_image, path) for path in paths[start:start + batch_size]]
+
+        pending = submit(0) if paths else None
+        for start in range(0, len(paths), batch_size):
+            futures = pending
+            # Antecipando a decodificação do próximo lote.
+            pending = submit(start + batch_size) if start + batch_size < len(paths) else None
+
+            batch = np.empty((len(futures), IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+            keep = np.ones(len(futures), dtype=bool)
+            for i, future in enumerate(futures):
+                img = future.result()
+                if img is None:
+                    print(f"[AVISO] Não foi possível ler a imagem: {paths[start + i]}")
+                    keep[i] = False
+                    continue
+                # Normalizando os valores de pixel para o intervalo [0, 1] diretamente no lote.
+                np.divide(img, np.float32(255.0), out=batch[i, :, :, 0])
+
+            batch_labels = labels[start:start + len(futures)]
+            if not keep.all():
+                batch, batch_labels = batch[keep], batch_labels[keep]
+            yield batch, batch_labels
+
+
+def _fingerprint(paths):
+    """Identificando o conjunto de imagens pelos caminhos, tamanhos e datas de modificação."""
+    digest = hashlib.sha256(f"{IMG_SIZE}".encode())
+    for path in paths:
+        stat = os.stat(path)
+        digest.update(f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}\n".encode())
+    return digest.hexdigest()
+
+
+def build_image_cache(data_dir=DATA_DIR, cache_dir=CACHE_DIR, batch_size=BATCH_SIZE, workers=None):
+    """
+    Gravando o tensor pré-processado em memória mapeada, lote a lote, ou
+    reaproveitando o cache existente se as imagens não mudaram.
+
+    Returns:
+        str: O diretório do cache, com images.npy, labels.npy e meta.json.
+    """
+    paths, _ = list_images(data_dir)
+    fingerprint = _fingerprint(paths)
+    meta_path = os.path.join(cache_dir, "meta.json")
+    if os.path.exists(meta_path):
+        with open(meta_path, 'r') as f:
+            if json.load(f).get("fingerprint") == fingerprint:
+                return cache_dir
+
+    os.makedirs(cache_dir, exist_ok=True)
+    # Reservando espaço para todas as imagens; as ilegíveis deixam linhas sobrando ao final.
+    images = np.lib.format.open_memmap(
+        os.path.join(cache_dir, "images.npy"), mode="w+", dtype=np.float32,
+        shape=(len(paths), IMG_SIZE, IMG_SIZE, 1),
+    )
+    labels = []
+    count = 0
+    for batch, batch_labels in iter_image_batches(data_dir, batch_size, workers):
+        images[count:count + len(batch)] = batch
+        labels.extend(batch_labels)
+        count += len(batch)
+    images.flush()
+    del images
+
+    np.save(os.path.join(cache_dir, "labels.npy"), np.array(labels))
+    # Gravando os metadados por último, validando o cache apenas quando completo.
+    with open(meta_path, 'w') as f:
+        json.dump({"fingerprint": fingerprint, "count": count, "img_size": IMG_SIZE}, f)
+    return cache_dir
+
+
+def open_image_cache(cache_dir=CACHE_DIR):
+    """Abrindo o tensor em cache via memória mapeada, sem carregá-lo na memória."""
+    labels = np.load(os.path.join(cache_dir, "labels.npy"))
+    images = np.load(os.path.join(cache_dir, "images.npy"), mmap_mode="r")
+    return images[:len(labels)], labels
+
+
+def load_and_preprocess_images(data_dir=DATA_DIR, batch_size=BATCH_SIZE, workers=None):
+    """
+    Executando o carregamento e o pré-processamento de um conjunto de dados visual,
+    preenchendo um único tensor pré-alocado a partir dos lotes.
+
+    Para conjuntos maiores que a memória, use `iter_image_batches` ou
+    `build_image_cache` com `open_image_cache`.
+
+    Returns:
+        tuple: Uma estrutura contendo dois arrays NumPy:
+               - data: Um tensor com as imagens processadas, no formato (N, H, W, C).
+               - labels: Um vetor com os identificadores categóricos.
+    """
+    paths, _ = list_images(data_dir)
+    data = np.empty((len(paths), IMG_SIZE, IMG_SIZE, 1), dtype=np.float32)
+    labels = []
+    count = 0
+    for batch, batch_labels in iter_image_batches(data_dir, batch_size, workers):
+        data[count:count + len(batch)] = batch
+        labels.extend(batch_labels)
+        count += len(batch)
+    return data[:count], np.array(labels)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Carregamento das imagens do pipeline legado")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="Diretório das imagens, com uma pasta por classe")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Diretório do cache em memória mapeada")
+    parser.add_argument("--no-cache", action="store_true", help="Apenas percorrendo os lotes, sem gravar o cache")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Imagens por lote")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Threads de decodificação")
+    return parser.parse_args()
 
 
 # Verificando se o script está sendo executado diretamente.
 if __name__ == "__main__":
-    X, y = load_and_preprocess_images()
-    print(f"Total de imagens carregadas: {len(X)}")
-    print(f"Formato dos dados das imagens (com canal): {X.shape}")
-    
+    args = parse_args()
+    start = time.perf_counter()
+    if args.no_cache:
+        total = 0
+        classes = set()
+        for batch, batch_labels in iter_image_batches(args.data_dir, args.batch_size, args.workers):
+            total += len(batch)
+            classes.update(batch_labels)
+        shape = (total, IMG_SIZE, IMG_SIZE, 1)
+    else:
+        X, y = open_image_cache(build_image_cache(args.data_dir, args.cache_dir, args.batch_size, args.workers))
+        total, shape, classes = len(X), X.shape, set(y)
+    elapsed = time.perf_counter() - start
+
+    print(f"Total de imagens carregadas: {total}")
+    print(f"Formato dos dados das imagens (com canal): {shape}")
+
     # Utilizando uma operação de conjunto para identificar as classes únicas.
-    print(f"Classes (rótulos) encontradas: {sorted(list(set(y)))}")
\ No newline at end of file
+    print(f"Classes (rótulos) encontradas: {sorted(str(label) for label in classes)}")
+    peak = peak_memory_mb()
+    print(f"[RESULTADO] {total / elapsed if elapsed > 0 else 0.0:.1f} imagens/s em {elapsed:.2f}s, "
+          f"pico de memória: {f'{peak:.0f} MB' if peak is not None else 'indisponível'}")
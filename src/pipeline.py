@@ -0,0 +1,158 @@
+# -*- coding: utf-8 -*-
+"""
+Pipeline Multithread de Captura, Processamento e Renderização
+
+Este módulo separa a leitura da câmera e o processamento de cada frame em
+threads dedicadas, conectadas por filas limitadas que descartam o item mais
+antigo. Dessa forma, um frame lento no MediaPipe não bloqueia a leitura da
+câmera nem a janela, e o sistema trabalha sempre sobre o frame mais recente.
+
+A renderização permanece na thread principal, pois o `cv2.imshow` e o
+`cv2.waitKey` exigem isso em algumas plataformas.
+"""
+import threading
+import time
+from collections import deque
+
+
+class LatestQueue:
+    """
+    Fila limitada com política de descarte do item mais antigo, contabilizando
+    os itens descartados e repassando-os a `on_drop`, quando informado.
+    """
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self.maxsize = maxsize
+        self.on_drop = on_drop
+        self.dropped = 0
+        self.closed = False
+        self._items = deque()
+        self._cond = threading.Condition()
+
+    def put(self, item):
+        dropped = None
+        with self._cond:
+            # Descartando o item mais antigo quando a fila está cheia.
+            if len(self._items) >= self.maxsize:
+                dropped = self._items.popleft()
+                self.dropped += 1
+            self._items.append(item)
+            self._cond.notify()
+        if dropped is not None and self.on_drop is not None:
+            self.on_drop(dropped)
+
+    def get(self, timeout=None):
+        """
+        Obtendo o próximo item, ou None em caso de tempo esgotado ou de fila
+        encerrada e vazia.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._items or self.closed, timeout)
+            if self._items:
+                return self._items.popleft()
+            return None
+
+    def close(self):
+        # Sinalizando aos consumidores que nenhum novo item será produzido.
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def __len__(self):
+        return len(self._items)
+
+
+class FramePipeline:
+    """
+    Conectando a leitura da câmera e o processamento dos frames em threads
+    separadas.
+
+    Args:
+        capture: Objeto com o método `read()` no padrão do `cv2.VideoCapture`.
+        process: Função que recebe um frame e retorna o resultado a renderizar.
+        queue_size: Capacidade de cada fila entre os estágios.
+        metrics: Instrumentação opcional que recebe o tempo de leitura da câmera.
+        on_drop: Função opcional que recebe os resultados descartados sem renderização.
+    """
+
+    def __init__(self, capture, process, queue_size=1, metrics=None, on_drop=None):
+        self.capture = capture
+        self.metrics = metrics
+        self.process = process
+        self.frames = LatestQueue(queue_size)
+        self.results = LatestQueue(queue_size, on_drop)
+        self.frames_read = 0
+        self.frames_processed = 0
+        # Latência média entre a leitura do frame e o fim do processamento.
+        self.latency = 0.0
+        self._stop = threading.Event()
+        self._reader = threading.Thread(target=self._read_loop, name="camera-reader", daemon=True)
+        self._worker = threading.Thread(target=self._process_loop, name="inference-worker", daemon=True)
+
+    def start(self):
+        self._reader.start()
+        self._worker.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self.frames.close()
+        self._reader.join(timeout=1.0)
+        self._worker.join(timeout=1.0)
+
+    @property
+    def finished(self):
+        # Indicando que não há mais resultados a serem produzidos.
+        return self.results.closed and not len(self.results)
+
+    def _read_loop(self):
+        try:
+            while not self._stop.is_set():
+                start = time.perf_counter()
+                ret, frame = self.capture.read()
+                if self.metrics is not None:
+                    self.metrics.record("camera", start)
+                if not ret:
+                    print("[AVISO] Frame da câmera não pôde ser lido, encerrando")
+                    break
+                self.frames_read += 1
+                self.frames.put((time.perf_counter(), frame))
+        finally:
+            self.frames.close()
+
+    def _process_loop(self):
+        try:
+            while not self._stop.is_set():
+                item = self.frames.get()
+                if item is None:
+                    break
+                captured_at, frame = item
+                result = self.process(frame)
+                self.frames_processed += 1
+                # Atualizando a média móvel exponencial da latência.
+                elapsed = time.perf_counter() - captured_at
+                self.latency = elapsed if self.frames_processed == 1 else 0.9 * self.latency + 0.1 * elapsed
+                self.results.put(result)
+        finally:
+            self.results.close()
+
+    def stats(self):
+        """Reunindo a profundidade das filas e as contagens de frames descartados."""
+        return {
+            "frames_read": self.frames_read,
+            "frames_processed": self.frames_processed,
+            "camera_queue_depth": len(self.frames),
+            "camera_dropped": self.frames.dropped,
+            "render_queue_depth": len(self.results),
+            "render_dropped": self.results.dropped,
+            "latency_ms": self.latency * 1000,
+        }
+
+    def format_stats(self):
+        stats = self.stats()
+        return (
+            f"lidos={stats['frames_read']} processados={stats['frames_processed']} "
+            f"fila_camera={stats['camera_queue_depth']} descartados_camera={stats['camera_dropped']} "
+            f"fila_render={stats['render_queue_depth']} descartados_render={stats['render_dropped']} "
+            f"latencia={stats['latency_ms']:.1f}ms"
+        )
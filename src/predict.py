@@ -1,175 +1,242 @@
 # -*- coding: utf-8 -*-
-import cv2
-import mediapipe as mp
-import numpy as np
-import pickle
+import argparse
+import queue
 import time
-from collections import deque
 
-def normalize_landmarks(data):
-    """
-    Normalizando um único conjunto de 63 coordenadas de landmarks,
-    replicando o pré-processamento usado no treinamento para garantir
-    invariância à posição e à escala da mão.
-    """
-    # Remodelando para 21 pontos (x, y, z).
-    landmarks = data.reshape((21, 3))
-
-    # Centralizando os pontos em relação ao pulso.
-    base_point = landmarks[0].copy()
-    relative_landmarks = landmarks - base_point
-
-    # Normalizando pela distância entre o pulso e a base do dedo médio.
-    scale_dist = np.linalg.norm(relative_landmarks[9])
-    if scale_dist < 1e-6: # Evitando divisão por zero.
-        scale_dist = 1.0
-
-    scaled_landmarks = relative_landmarks / scale_dist
-    return scaled_landmarks.flatten()
+from engine import PRECISIONS, ModelWatcher, load_classifier
+from features import FrameNormalizer
+from gating import CACHE_TOLERANCE, SKIP_INTERVAL, MotionGate, ProbabilityCache, format_stats
+from metrics import Metrics, NullMetrics
+from pipeline import FramePipeline
+from startup import CameraOpener, create_hands, warm_up
+from decoder import DECODER_MODES, build_recognizer
+from replay import SessionRecorder
+
+parser = argparse.ArgumentParser(description="Reconhecimento em tempo real do alfabeto manual de LIBRAS")
+parser.add_argument("--metrics", action="store_true", help="Ativando a instrumentação e o painel de desempenho")
+parser.add_argument("--metrics-file", help="Arquivo de exportação periódica das métricas (.prom ou .jsonl)")
+parser.add_argument("--metrics-interval", type=float, default=10.0, help="Intervalo entre exportações, em segundos")
+parser.add_argument("--decoder", choices=("majority",) + DECODER_MODES, default="majority",
+                    help="Suavização temporal: votação majoritária ou agregado das probabilidades")
+parser.add_argument("--adaptive", action="store_true",
+                    help="Pulando o classificador e o MediaPipe enquanto a mão permanece parada")
+parser.add_argument("--cache-tolerance", type=float, default=CACHE_TOLERANCE,
+                    help="Variação máxima dos landmarks normalizados para reutilizar as probabilidades")
+parser.add_argument("--skip-interval", type=int, default=SKIP_INTERVAL,
+                    help="Executando o MediaPipe a cada k frames durante poses estáveis")
+parser.add_argument("--downscale", type=float, default=1.0, help="Escala do frame enviado ao MediaPipe em poses estáveis")
+parser.add_argument("--confirmation-time", type=float, help="Tempo de estabilidade para confirmar uma letra (ou duração mínima de um segmento, com --decoder), em segundos")
+parser.add_argument("--cascade", action="store_true",
+                    help="Respondendo com o classificador linear quando confiante, consultando o MLP apenas nos frames incertos")
+parser.add_argument("--precision", choices=PRECISIONS, default="float32",
+                    help="Variante de precisão do motor, as reduzidas geradas com train.py --quantize")
+parser.add_argument("--no-reload", action="store_true",
+                    help="Desativando a recarga automática dos artefatos gravados por um novo treinamento")
+parser.add_argument("--record", help="Gravando os landmarks da sessão para reprodução com replay.py (.npz)")
+parser.add_argument("--record-video", help="Gravando também o vídeo bruto da câmera (.mp4), junto com --record")
+args = parser.parse_args()
+if args.record_video and not args.record:
+    parser.error("--record-video requer --record")
+
+# Coletando métricas apenas quando solicitado, sem custo no caso contrário.
+metrics = Metrics(args.metrics_file, args.metrics_interval) if args.metrics or args.metrics_file else NullMetrics()
+
+# Abrindo a câmera em segundo plano enquanto o MediaPipe e o modelo são carregados.
+startup_time = time.perf_counter()
+camera = CameraOpener(0).start()
+
+# Importando o OpenCV e os módulos que dependem dele apenas após iniciar a abertura da câmera.
+import cv2  # noqa: E402
+
+from display import render  # noqa: E402
+from frames import FrameBuffers, LandmarkBuffer  # noqa: E402
 
 # Carregando os artefatos do modelo previamente treinado.
-print("[INFO] Carregando modelo MLP, normalizador e classes")
-with open("models/librasign_mlp.pkl", 'rb') as f:
-    model = pickle.load(f)
-with open("models/scaler.pkl", 'rb') as f:
-    scaler = pickle.load(f)
-
-class_names = np.load("models/classes.npy")
+print("[INFO] Carregando classificador e classes")
+predict_proba, class_names = load_classifier(cascade=args.cascade, precision=args.precision)
 
 # Inicializando a solução MediaPipe Hands.
-hands = mp.solutions.hands.Hands(
+hands = create_hands(
     min_detection_confidence=0.7,
     min_tracking_confidence=0.7
 )
-# Obtendo o utilitário de desenho.
-mp_draw = mp.solutions.drawing_utils
-
-# Parâmetros para a lógica de inferência.
-HISTORY_SIZE = 10           # Usando os últimos 10 frames para estabilizar a predição.
-CONFIDENCE_THRESHOLD = 0.75 # Confiança mínima para uma predição ser considerada válida.
-predictions_history = deque(maxlen=HISTORY_SIZE)
-
-# Parâmetros para a construção de frases.
-sentence = []
-CONFIRMATION_TIME = 2.0 # Tempo de estabilidade para confirmar uma letra.
-stable_letter_start_time = None
-current_stable_letter = ""
-letter_confirmed = False
-
-# Inicializando a captura de vídeo.
-cap = cv2.VideoCapture(0)
+# Aquecendo o MediaPipe e o classificador antes do primeiro frame real.
+warm_up(hands, predict_proba)
+# Normalizador de frame único com buffer pré-alocado.
+normalize_frame = FrameNormalizer()
+# Buffers reaproveitados pelo espelhamento, pela conversão de cores e pelos landmarks.
+frame_buffers = FrameBuffers(pooled=True)
+landmark_buffer = LandmarkBuffer()
+# Estado de suavização temporal e de construção de frases.
+recognizer_options = {} if args.confirmation_time is None else {"confirmation_time": args.confirmation_time}
+recognizer = build_recognizer(class_names, args.decoder, **recognizer_options)
+# Processamento adaptativo opcional, guiado pelo movimento da mão e da cena.
+gate = MotionGate(args.skip_interval, downscale=args.downscale) if args.adaptive else None
+cache = ProbabilityCache(args.cache_tolerance) if args.adaptive else None
+last_result = None
+# Observando o diretório de artefatos para trocar o modelo sem reiniciar a câmera.
+watcher = None if args.no_reload else ModelWatcher(cascade=args.cascade, precision=args.precision).start()
+# Comandos de edição da frase enviados pela janela à thread de inferência.
+commands = queue.SimpleQueue()
+# Gravação opcional da sessão, reproduzível offline com o relógio virtual.
+recorder = SessionRecorder(args.record, args.record_video) if args.record else None
+
+# Intervalo entre os relatórios de desempenho do pipeline no console.
+STATS_INTERVAL = 5.0
+
+
+def process_frame(frame):
+    """
+    Executando o MediaPipe e o classificador sobre um frame na thread de
+    inferência, retornando o necessário para a renderização.
+    """
+    global last_result, predict_proba, class_names, recognizer
+    # Trocando o classificador entre dois frames quando um novo treinamento for concluído.
+    reloaded = watcher.poll() if watcher is not None else None
+    if reloaded is not None:
+        predict_proba, new_class_names = reloaded
+        if list(new_class_names) != list(class_names):
+            # Reiniciando a suavização, cujo histórico se refere às classes anteriores.
+            recognizer = build_recognizer(new_class_names, args.decoder, **recognizer_options)
+        class_names = new_class_names
+        if cache is not None:
+            cache.clear()
+        print(f"[INFO] Modelo recarregado ({watcher.reloads}ª recarga)")
+
+    # Aplicando os comandos de edição pendentes antes de atualizar a frase.
+    while True:
+        try:
+            command = commands.get_nowait()
+        except queue.Empty:
+            break
+        if recorder is not None:
+            recorder.command(command)
+        if command == "delete":
+            recognizer.delete_last()
+        elif command == "clear":
+            recognizer.clear()
+
+    # Espelhando o frame para uma visualização intuitiva.
+    raw_frame = frame
+    start = metrics.clock()
+    frame = frame_buffers.flip(frame)
+    metrics.record("flip", start)
+    # Reaproveitando o último resultado do MediaPipe enquanto a cena permanece estável.
+    if gate is None or gate.should_process(frame):
+        # Convertendo para o formato RGB do MediaPipe.
+        start = metrics.clock()
+        image_rgb = frame_buffers.to_rgb(frame if gate is None else gate.prepare(frame))
+        metrics.record("cvtColor", start)
+
+        start = metrics.clock()
+        last_result = hands.process(image_rgb)
+        metrics.record("mediapipe", start)
+    result = last_result
+
+    # Verificando se landmarks de mão foram detectados.
+    hand_landmarks = None
+    coords_raw = None
+    prediction_proba = None
+    if result.multi_hand_landmarks:
+        hand_landmarks = result.multi_hand_landmarks[0]
+        start = metrics.clock()
+
+        # 1. Extraindo as coordenadas brutas.
+        coords_raw = landmark_buffer.fill(hand_landmarks)
+
+        # 2. Aplicando a normalização de pose e escala.
+        coords_normalized = normalize_frame(coords_raw)
+
+        # 3. Obtendo as probabilidades de cada classe, com a padronização aplicada.
+        cache_hit = False
+        if cache is None:
+            prediction_proba = predict_proba(coords_normalized)
+        else:
+            prediction_proba, cache_hit = cache.classify(coords_normalized, predict_proba)
+        metrics.record("classificador", start)
+    elif cache is not None:
+        cache.clear()
+    if gate is not None:
+        # Considerando estável a cena sem mão ou com a mão parada.
+        gate.update(prediction_proba is None or cache_hit)
+
+    # Atualizando a suavização temporal e a confirmação (ou decodificação) das letras.
+    now = time.time()
+    was_confirmed = recognizer.letter_confirmed
+    recognizer.update(prediction_proba, now)
+    if recorder is not None:
+        recorder.record(now, coords_raw, raw_frame)
+    metrics.observe(recognizer, hand_landmarks is not None, was_confirmed, now)
+    return frame, hand_landmarks, recognizer.snapshot()
+
+
+# Aguardando a abertura da câmera iniciada em segundo plano.
+cap = camera.result()
 if not cap.isOpened():
     print("[ERRO] Não foi possível abrir a câmera, verifique a conexão")
     exit()
+print(f"[INFO] Inicialização concluída em {time.perf_counter() - startup_time:.2f}s "
+      f"(abertura da câmera: {camera.elapsed:.2f}s, em paralelo)")
 
 # Criando a janela de visualização de forma explícita.
 WINDOW_NAME = "Librasign - Tradutor de LIBRAS"
 cv2.namedWindow(WINDOW_NAME)
 
+# Iniciando as threads de leitura da câmera e de inferência.
+# Devolvendo ao conjunto de buffers os frames espelhados descartados pela fila de resultados.
+pipeline = FramePipeline(cap, process_frame, metrics=metrics,
+                         on_drop=lambda item: frame_buffers.release(item[0])).start()
+last_stats_time = time.time()
+
 print("[INFO] Sistema pronto, pressione 'ESC' para sair")
 
 
+# Renderizando na thread principal o resultado mais recente do pipeline.
 while True:
-    ret, frame = cap.read()
-    if not ret:
+    item = pipeline.results.get(timeout=0.05)
+    if item is None and pipeline.finished:
         break
-    
-    H, W, _ = frame.shape
-    # Espelhando o frame para uma visualização intuitiva.
-    frame = cv2.flip(frame, 1)
-    # Convertendo para o formato RGB do MediaPipe.
-    image_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
 
-    # Otimizando o desempenho ao passar a imagem como não gravável.
-    image_rgb.flags.writeable = False
-    result = hands.process(image_rgb)
-    image_rgb.flags.writeable = True
-
-    # Verificando se landmarks de mão foram detectados.
-    if result.multi_hand_landmarks:
-        hand_landmarks = result.multi_hand_landmarks[0]
-        mp_draw.draw_landmarks(frame, hand_landmarks, mp.solutions.hands.HAND_CONNECTIONS)
-        
-        # 1. Extraindo as coordenadas brutas.
-        coords_raw = np.array([[lm.x, lm.y, lm.z] for lm in hand_landmarks.landmark]).flatten()
-        
-        # 2. Aplicando a normalização de pose e escala.
-        coords_normalized = normalize_landmarks(coords_raw).reshape(1, -1)
-        
-        # 3. Aplicando o StandardScaler carregado.
-        scaled_coords = scaler.transform(coords_normalized)
-        
-        # Obtendo as probabilidades de cada classe.
-        prediction_proba = model.predict_proba(scaled_coords)
-        prediction_index = np.argmax(prediction_proba)
-        confidence = prediction_proba[0][prediction_index]
-        
-        # Adicionando a predição ao histórico se a confiança for suficiente.
-        if confidence >= CONFIDENCE_THRESHOLD:
-            predictions_history.append(class_names[prediction_index])
-        else:
-            # Usando None para predições incertas.
-            predictions_history.append(None)
-    else:
-        # Limpando o histórico se nenhuma mão for detectada.
-        predictions_history.clear()
-
-    # Aplicando um filtro de votação majoritária para suavizar a predição.
-    valid_preds = [p for p in predictions_history if p is not None]
-    smoothed_label = max(set(valid_preds), key=valid_preds.count) if valid_preds else ""
-
-    # Implementando a lógica de confirmação por tempo de permanência.
-    if smoothed_label and smoothed_label != current_stable_letter:
-        # Iniciando o cronômetro para uma nova letra estável.
-        current_stable_letter = smoothed_label
-        stable_letter_start_time = time.time()
-        letter_confirmed = False
-    elif smoothed_label and smoothed_label == current_stable_letter:
-        # Verificando se a letra permaneceu estável pelo tempo necessário.
-        if not letter_confirmed and (time.time() - stable_letter_start_time) >= CONFIRMATION_TIME:
-            # Adicionando a letra à frase.
-            sentence.append(current_stable_letter)
-            # Marcando como confirmada para evitar repetições.
-            letter_confirmed = True
-    elif not smoothed_label:
-        # Resetando o estado se nenhuma letra estável for detectada.
-        current_stable_letter = ""
-        stable_letter_start_time = None
-        letter_confirmed = False
-    
-    # Gerenciando o texto de status principal.
-    if current_stable_letter:
-        display_text = f"Gesto: {current_stable_letter}"
-        if letter_confirmed:
-            display_text += " (Confirmado)"
-        elif stable_letter_start_time:
-            # Desenhando uma barra de progresso para a confirmação.
-            progress = (time.time() - stable_letter_start_time) / CONFIRMATION_TIME
-            cv2.rectangle(frame, (10, 70), (10 + int(progress * 200), 90), (0, 255, 0), -1)
-    else:
-        display_text = "Aguardando gesto"
-    
-    cv2.putText(frame, display_text, (10, 50), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
-    
-    # Desenhando a frase formada na parte inferior da tela.
-    cv2.rectangle(frame, (0, H - 60), (W, H), (0, 0, 0), -1)
-    cv2.putText(frame, " ".join(sentence), (20, H - 20), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 3, cv2.LINE_AA)
-    
-    cv2.imshow(WINDOW_NAME, frame)
-    
-    key = cv2.waitKey(5) & 0xFF
+    if item is not None:
+        frame, hand_landmarks, state = item
+        start = metrics.clock()
+        render(frame, hand_landmarks, state, time.time(), recognizer.confirmation_time)
+        metrics.record("render", start)
+        metrics.draw(frame)
+        cv2.imshow(WINDOW_NAME, frame)
+        # Devolvendo o frame espelhado, já copiado pela janela, ao conjunto de buffers.
+        frame_buffers.release(frame)
+
+    # Reportando periodicamente a profundidade das filas e os descartes.
+    if time.time() - last_stats_time >= STATS_INTERVAL:
+        print(f"[INFO] Pipeline: {pipeline.format_stats()}")
+        if gate is not None:
+            print(f"[INFO] Adaptativo: {format_stats(gate, cache)}")
+        last_stats_time = time.time()
+    metrics.maybe_export()
+
+    key = cv2.waitKey(1) & 0xFF
     # Tecla ESC para sair.
     if key == 27:
         break
     # Tecla Backspace para apagar.
     if key == 8:
-        if sentence:
-            sentence.pop()
+        commands.put("delete")
     # Tecla 'c' para limpar a frase.
     if key == ord('c'):
-        sentence.clear()
+        commands.put("clear")
 
 # Liberando os recursos ao final da execução.
 print("[INFO] Encerrando aplicação")
+if watcher is not None:
+    watcher.stop()
+pipeline.stop()
+print(f"[INFO] Pipeline: {pipeline.format_stats()}")
+if gate is not None:
+    print(f"[INFO] Adaptativo: {format_stats(gate, cache)}")
+metrics.export()
+if recorder is not None:
+    print(f"[INFO] Sessão com {len(recorder)} frames salva em '{recorder.close()}'")
+hands.close()
 cap.release()
-cv2.destroyAllWindows()
\ No newline at end of file
+cv2.destroyAllWindows()
@@ -0,0 +1,254 @@
+# -*- coding: utf-8 -*-
+"""
+Variantes de Precisão Reduzida do Motor de Inferência
+
+O MLP é treinado em float64 pelo scikit-learn e exportado em float32 para o
+motor NumPy. Este módulo gera, a partir do mesmo modelo, duas variantes
+menores para dispositivos com pouca memória:
+
+- float16: pesos gravados em meia precisão, reduzindo o artefato à metade e
+  convertidos para float32 na carga, pois o NumPy não acelera operações em
+  float16;
+- int8: quantização após o treinamento, com as entradas de cada camada
+  quantizadas por canal (escalas calibradas sobre as ativações do
+  treinamento) e os pesos quantizados por neurônio de saída, reduzindo o
+  artefato a um quarto.
+
+O `train.py --quantize` avalia as variantes nos mesmos folds da validação
+cruzada, frente ao modelo completo em float64, e exporta os artefatos
+usados pelo predict.py com `--precision`. Executado diretamente, exporta as
+variantes a partir dos pickles existentes e compara acurácia, tamanho e
+latência sobre um diretório de landmarks:
+    python src/quantize.py data/landmarks
+"""
+import argparse
+import os
+import time
+
+import numpy as np
+
+from engine import (ACTIVATIONS, INT8_MAX, MODELS_DIR, VARIANT_FILES, MLPEngine, QuantizedEngine,
+                    export_engine, fold_scaler, model_fingerprint)
+
+# Modelo de referência, com a precisão completa do treinamento.
+REFERENCE = "float64"
+# Amostras de treinamento usadas na calibração das escalas de ativação.
+CALIBRATION_ROWS = 8192
+# Percentil do valor absoluto das ativações que define a escala de cada canal.
+CALIBRATION_PERCENTILE = 99.99
+# Linhas por bloco na avaliação das variantes.
+CHUNK_ROWS = 4096
+# Frames e rodadas alternadas da medição de latência.
+LATENCY_FRAMES = 2000
+BENCHMARK_ROUNDS = 3
+
+
+def calibration_sample(X, index=None, rows=CALIBRATION_ROWS, seed=42):
+    """Copiando uma amostra aleatória das linhas informadas para a calibração."""
+    index = np.arange(len(X)) if index is None else np.asarray(index)
+    if len(index) > rows:
+        index = np.sort(np.random.default_rng(seed).choice(index, rows, replace=False))
+    return np.array(X[index], dtype=np.float32)
+
+
+def calibrate_scales(coefs, intercepts, activation, X):
+    """
+    Propagando as amostras de calibração pelo modelo em float64 e retornando,
+    para cada camada, a escala de quantização de cada canal de entrada.
+    """
+    scales = []
+    a = np.asarray(X, dtype=np.float64)
+    last = len(coefs) - 1
+    for i, (W, b) in enumerate(zip(coefs, intercepts)):
+        limit = np.percentile(np.abs(a), CALIBRATION_PERCENTILE, axis=0)
+        # Usando escala unitária nos canais constantes, como as coordenadas do pulso.
+        scales.append(np.where(limit > 0, limit / INT8_MAX, 1.0))
+        a = a @ W + b
+        if i < last:
+            ACTIVATIONS[activation](a)
+    return scales
+
+
+def quantize_model(model, scaler, X_calibration):
+    """
+    Quantizando o MLP em int8. A escala de cada canal de entrada é incorporada
+    aos pesos antes da quantização por neurônio de saída, de modo que a
+    inferência precisa apenas de um vetor de escalas por camada.
+
+    Returns:
+        tuple: Os pesos int8, as escalas dos pesos, as escalas das entradas e os vieses.
+    """
+    coefs, intercepts = fold_scaler(model, scaler)
+    input_scales = calibrate_scales(coefs, intercepts, model.activation, X_calibration)
+    quantized, weight_scales = [], []
+    for W, input_scale in zip(coefs, input_scales):
+        folded = W * input_scale[:, None]
+        limit = np.abs(folded).max(axis=0)
+        weight_scale = np.where(limit > 0, limit / INT8_MAX, 1.0)
+        quantized.append(np.clip(np.rint(folded / weight_scale), -INT8_MAX, INT8_MAX).astype(np.int8))
+        weight_scales.append(weight_scale)
+    return quantized, weight_scales, input_scales, intercepts
+
+
+def build_variants(model, scaler, X_calibration, classes=None):
+    """
+    Montando em memória o modelo de referência (float64) e as variantes
+    float32, float16 e int8 do motor NumPy.
+
+    Returns:
+        dict: O motor de cada variante, indexado pelo nome da precisão.
+    """
+    coefs, intercepts = fold_scaler(model, scaler)
+    options = {"hidden_activation": model.activation, "out_activation": model.out_activation_, "classes": classes}
+    return {
+        REFERENCE: MLPEngine(coefs, intercepts, dtype=np.float64, **options),
+        "float32": MLPEngine(coefs, intercepts, **options),
+        "float16": MLPEngine([W.astype(np.float16) for W in coefs], [b.astype(np.float16) for b in intercepts],
+                             **options),
+        "int8": QuantizedEngine(*quantize_model(model, scaler, X_calibration), **options),
+    }
+
+
+def predict_variants(variants, X, labels):
+    """Retornando as classes previstas por cada variante, avaliadas em blocos."""
+    predictions = {name: np.empty(len(X), dtype=labels.dtype) for name in variants}
+    for start in range(0, len(X), CHUNK_ROWS):
+        block = X[start:start + CHUNK_ROWS]
+        for name, engine in variants.items():
+            predictions[name][start:start + len(block)] = labels[engine.predict_proba(block).argmax(axis=1)]
+    return predictions
+
+
+def export_variants(model, scaler, classes, X_calibration, models_dir=MODELS_DIR):
+    """
+    Exportando as variantes float16 e int8 de forma atômica, antes do estado
+    do treinamento; a variante float32 é o artefato padrão do motor.
+
+    Returns:
+        list: Os caminhos dos artefatos exportados.
+    """
+    float16_path = os.path.join(models_dir, VARIANT_FILES["float16"])
+    export_engine(model, scaler, float16_path + ".tmp.npz", classes, dtype=np.float16)
+    os.replace(float16_path + ".tmp.npz", float16_path)
+
+    quantized, weight_scales, input_scales, intercepts = quantize_model(model, scaler, X_calibration)
+    arrays = {
+        "hidden_activation": np.array(model.activation),
+        "out_activation": np.array(model.out_activation_),
+        "classes": np.asarray(classes),
+        "fingerprint": np.array(model_fingerprint(model, scaler, classes)),
+    }
+    for i, (W, weight_scale, input_scale, b) in enumerate(zip(quantized, weight_scales, input_scales, intercepts)):
+        arrays[f"coef_{i}"] = W
+        arrays[f"weight_scale_{i}"] = weight_scale.astype(np.float32)
+        arrays[f"input_scale_{i}"] = input_scale.astype(np.float32)
+        arrays[f"intercept_{i}"] = b.astype(np.float32)
+    int8_path = os.path.join(models_dir, VARIANT_FILES["int8"])
+    np.savez(int8_path + ".tmp.npz", **arrays)
+    os.replace(int8_path + ".tmp.npz", int8_path)
+    return [float16_path, int8_path]
+
+
+def weights_kb(engine):
+    """Retornando a memória ocupada pelos pesos e escalas do motor carregado, em KB."""
+    arrays = engine.coefs + engine.intercepts + getattr(engine, "weight_scales", []) + getattr(engine, "inverse_scales", [])
+    return sum(a.nbytes for a in arrays) / 1024
+
+
+def measure_latency(variants, X, rounds=BENCHMARK_ROUNDS):
+    """
+    Medindo a latência média por frame de cada variante, com um frame por
+    chamada como no laço de inferência, alternando as variantes a cada rodada
+    e mantendo a menor medição, menos sensível a ruído do sistema.
+    """
+    latencies = dict.fromkeys(variants, np.inf)
+    for _ in range(rounds):
+        for name, engine in variants.items():
+            engine.predict_proba(X[:1])
+            start = time.perf_counter()
+            for i in range(len(X)):
+                engine.predict_proba(X[i:i + 1])
+            latencies[name] = min(latencies[name], (time.perf_counter() - start) / len(X) * 1e6)
+    return latencies
+
+
+def report(y_true, predictions, latencies, sizes=None):
+    """Reportando acurácia, tamanho e latência de cada variante frente à referência."""
+    reference_accuracy = np.mean(predictions[REFERENCE] == y_true)
+    for name, y_pred in predictions.items():
+        accuracy = np.mean(y_pred == y_true)
+        agreement = np.mean(y_pred == predictions[REFERENCE])
+        line = (f"[RESULTADO] {name:>7}: acurácia {accuracy * 100:.2f}% ({(accuracy - reference_accuracy) * 100:+.2f} p.p.), "
+                f"concordância {agreement * 100:.2f}%, {latencies[name]:.1f} us/frame "
+                f"({latencies[REFERENCE] / latencies[name]:.2f}x)")
+        if sizes is not None and name in sizes:
+            line += f", artefato {sizes[name]:.1f} KB"
+        print(line)
+
+
+def report_variants(model, scaler, classes, shared_dir, y_true, fold_predictions, models_dir=MODELS_DIR):
+    """
+    Reportando as variantes avaliadas nos folds da validação cruzada e
+    exportando as do modelo final, calibradas sobre o dataset completo, com a
+    latência por frame medida sobre uma amostra do próprio dataset.
+
+    Args:
+        fold_predictions: As predições de cada variante, uma entrada por fold.
+    """
+    from dataset import open_dataset
+
+    X, _, _ = open_dataset(shared_dir)
+    X_calibration = calibration_sample(X)
+    paths = export_variants(model, scaler, classes, X_calibration, models_dir)
+    predictions = {name: np.concatenate([fold[name] for fold in fold_predictions]) for name in fold_predictions[0]}
+    latencies = measure_latency(build_variants(model, scaler, X_calibration, classes),
+                                calibration_sample(X, rows=LATENCY_FRAMES))
+    sizes = {name: os.path.getsize(path) / 1024 for name, path in zip(("float16", "int8"), paths)}
+    report(y_true, predictions, latencies, sizes)
+    print(f"[INFO] Variantes exportadas em {', '.join(repr(path) for path in paths)}")
+    return paths
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Comparação entre as variantes de precisão do motor de inferência")
+    parser.add_argument("data_dir", help="Diretório de landmarks rotulados")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+    parser.add_argument("--limit", type=int, default=20000, help="Máximo de frames avaliados")
+    return parser.parse_args()
+
+
+def main():
+    import pickle
+
+    from dataset import load_dataset
+    from features import normalize_landmarks
+
+    args = parse_args()
+    with open(os.path.join(args.models_dir, "librasign_mlp.pkl"), 'rb') as f:
+        model = pickle.load(f)
+    with open(os.path.join(args.models_dir, "scaler.pkl"), 'rb') as f:
+        scaler = pickle.load(f)
+    classes = np.load(os.path.join(args.models_dir, "classes.npy"))
+
+    X_raw, y_raw = load_dataset(args.data_dir)
+    X = normalize_landmarks(X_raw, out=X_raw)
+    y = np.searchsorted(classes, np.asarray(y_raw))
+    # Calibrando sobre todo o diretório, como o treinamento faz com o dataset completo.
+    X_calibration = calibration_sample(X)
+    paths = export_variants(model, scaler, classes, X_calibration, args.models_dir)
+    print(f"[INFO] Variantes exportadas em {', '.join(repr(path) for path in paths)}")
+
+    step = max(1, len(X) // args.limit) if args.limit else 1
+    X, y = X[::step], y[::step]
+    variants = build_variants(model, scaler, X_calibration, classes)
+    predictions = predict_variants(variants, X, np.arange(len(classes)))
+    latencies = measure_latency(variants, X[:LATENCY_FRAMES])
+    sizes = {name: os.path.getsize(os.path.join(args.models_dir, path)) / 1024 for name, path in VARIANT_FILES.items()}
+    print(f"[INFO] {len(X)} frames avaliados, latência medida sobre {min(len(X), LATENCY_FRAMES)}")
+    report(y, predictions, latencies, sizes)
+    for name, engine in variants.items():
+        print(f"[INFO] {name:>7}: pesos em memória {weights_kb(engine):.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+"""
+Suavização Temporal e Construção de Frases
+
+Este módulo reúne a lógica aplicada às probabilidades do classificador a cada
+frame: o filtro de votação majoritária sobre o histórico recente e a confirmação
+de letras por tempo de permanência. O instante atual é sempre recebido como
+argumento, permitindo o uso com relógio real ou virtual.
+"""
+from collections import deque, namedtuple
+
+import numpy as np
+
+# Parâmetros para a lógica de inferência.
+HISTORY_SIZE = 10           # Usando os últimos 10 frames para estabilizar a predição.
+CONFIDENCE_THRESHOLD = 0.75 # Confiança mínima para uma predição ser considerada válida.
+# Parâmetros para a construção de frases.
+CONFIRMATION_TIME = 2.0     # Tempo de estabilidade para confirmar uma letra.
+
+# Estado imutável exposto para renderização em outra thread.
+RecognitionState = namedtuple(
+    "RecognitionState",
+    ["current_stable_letter", "stable_letter_start_time", "letter_confirmed", "sentence"],
+)
+
+
+class SignRecognizer:
+    """
+    Mantendo o histórico de predições, a letra estável corrente e a frase
+    formada pelas letras confirmadas.
+    """
+
+    def __init__(self, class_names, history_size=HISTORY_SIZE,
+                 confidence_threshold=CONFIDENCE_THRESHOLD, confirmation_time=CONFIRMATION_TIME):
+        self.class_names = class_names
+        self.confidence_threshold = confidence_threshold
+        self.confirmation_time = confirmation_time
+        self.predictions_history = deque(maxlen=history_size)
+        self.sentence = []
+        self.stable_letter_start_time = None
+        self.current_stable_letter = ""
+        self.letter_confirmed = False
+
+    def update(self, prediction_proba, now):
+        """
+        Registrando as probabilidades de um frame (ou None quando nenhuma mão
+        foi detectada) e atualizando a confirmação de letras.
+
+        Returns:
+            str: A letra suavizada pela votação majoritária, ou "" se não houver.
+        """
+        if prediction_proba is not None:
+            prediction_proba = np.ravel(prediction_proba)
+            prediction_index = int(np.argmax(prediction_proba))
+            confidence = prediction_proba[prediction_index]
+
+            # Adicionando a predição ao histórico se a confiança for suficiente.
+            if confidence >= self.confidence_threshold:
+                self.predictions_history.append(self.class_names[prediction_index])
+            else:
+                # Usando None para predições incertas.
+                self.predictions_history.append(None)
+        else:
+            # Limpando o histórico se nenhuma mão for detectada.
+            self.predictions_history.clear()
+
+        # Aplicando um filtro de votação majoritária para suavizar a predição.
+        valid_preds = [p for p in self.predictions_history if p is not None]
+        smoothed_label = max(set(valid_preds), key=valid_preds.count) if valid_preds else ""
+
+        self.confirm(smoothed_label, now)
+        return smoothed_label
+
+    def confirm(self, smoothed_label, now):
+        """Aplicando a lógica de confirmação por tempo de permanência."""
+        if smoothed_label and smoothed_label != self.current_stable_letter:
+            # Iniciando o cronômetro para uma nova letra estável.
+            self.current_stable_letter = smoothed_label
+            self.stable_letter_start_time = now
+            self.letter_confirmed = False
+        elif smoothed_label and smoothed_label == self.current_stable_letter:
+            # Verificando se a letra permaneceu estável pelo tempo necessário.
+            if not self.letter_confirmed and (now - self.stable_letter_start_time) >= self.confirmation_time:
+                # Adicionando a letra à frase.
+                self.sentence.append(self.current_stable_letter)
+                # Marcando como confirmada para evitar repetições.
+                self.letter_confirmed = True
+        elif not smoothed_label:
+            # Resetando o estado se nenhuma letra estável for detectada.
+            self.current_stable_letter = ""
+            self.stable_letter_start_time = None
+            self.letter_confirmed = False
+
+    def flush(self, now):
+        """Encerrando um fluxo; a regra de permanência já emite as letras ao confirmá-las."""
+
+    def delete_last(self):
+        # Apagando a última letra da frase.
+        if self.sentence:
+            self.sentence.pop()
+
+    def clear(self):
+        # Limpando a frase.
+        self.sentence.clear()
+
+    def snapshot(self):
+        """Copiando o estado atual para consumo seguro por outra thread."""
+        return RecognitionState(
+            self.current_stable_letter,
+            self.stable_letter_start_time,
+            self.letter_confirmed,
+            tuple(self.sentence),
+        )
@@ -0,0 +1,280 @@
+# -*- coding: utf-8 -*-
+"""
+Gravação e Reprodução Determinística de Sessões
+
+O predict.py, executado com `--record sessao.npz`, grava os landmarks brutos
+de cada frame processado, com o instante em que foram observados (e,
+opcionalmente, o vídeo bruto com `--record-video`). Este módulo reproduz a
+sessão pelo mesmo caminho do laço ao vivo (normalização, classificador,
+suavização temporal e confirmação ou decodificação das letras), usando um
+relógio virtual com os instantes gravados no lugar de `time.time()`. A frase
+emitida depende apenas da sessão e da configuração, permitindo comparar
+alterações do laço sem a câmera:
+    python src/replay.py sessao.npz
+    python src/replay.py sessao.npz --decoder majority markov --decisions decisoes.csv
+    python src/replay.py sessao.npz --realtime
+
+Por padrão os frames são reproduzidos o mais rápido possível; com
+`--realtime`, no ritmo em que foram gravados.
+"""
+import argparse
+import csv
+import os
+import time
+
+import numpy as np
+
+from features import N_FEATURES
+
+
+class SessionRecorder:
+    """
+    Acumulando os frames de uma sessão ao vivo e gravando-os, ao final, em um
+    arquivo .npz. Frames sem mão detectada são gravados como linhas de NaN.
+    """
+
+    def __init__(self, path, video_path=None, fps=30.0):
+        self.path = path
+        self.video_path = video_path
+        self.fps = fps
+        self._timestamps = []
+        self._landmarks = []
+        self._command_frames = []
+        self._commands = []
+        self._video = None
+        self._empty = np.full(N_FEATURES, np.nan, dtype=np.float32)
+
+    def __len__(self):
+        return len(self._timestamps)
+
+    def command(self, name):
+        """Registrando um comando de edição, aplicado antes do próximo frame."""
+        self._command_frames.append(len(self._timestamps))
+        self._commands.append(name)
+
+    def record(self, now, coords, frame=None):
+        """
+        Registrando os landmarks brutos de um frame (ou None quando nenhuma mão
+        foi detectada) e, se solicitado, o frame original da câmera.
+        """
+        self._timestamps.append(now)
+        # Copiando, pois o laço ao vivo reutiliza o array de coordenadas a cada frame.
+        self._landmarks.append(self._empty if coords is None else np.array(coords, dtype=np.float32).reshape(-1))
+        if self.video_path is not None and frame is not None:
+            if self._video is None:
+                import cv2
+
+                # Criando o arquivo de vídeo com as dimensões do primeiro frame.
+                height, width = frame.shape[:2]
+                self._video = cv2.VideoWriter(self.video_path, cv2.VideoWriter_fourcc(*"mp4v"),
+                                              self.fps, (width, height))
+            self._video.write(frame)
+
+    def close(self):
+        """Gravando a sessão de forma atômica e encerrando o vídeo, retornando o caminho."""
+        if self._video is not None:
+            self._video.release()
+            self._video = None
+        landmarks = np.vstack(self._landmarks) if self._landmarks else np.empty((0, N_FEATURES), dtype=np.float32)
+        temp_path = self.path + ".tmp.npz"
+        np.savez(
+            temp_path,
+            timestamps=np.asarray(self._timestamps, dtype=np.float64),
+            landmarks=landmarks,
+            command_frames=np.asarray(self._command_frames, dtype=np.int64),
+            commands=np.asarray(self._commands, dtype=str),
+        )
+        os.replace(temp_path, self.path)
+        return self.path
+
+
+def load_session(path):
+    """Lendo uma sessão gravada pelo SessionRecorder."""
+    with np.load(path, allow_pickle=False) as data:
+        session = {
+            "timestamps": data["timestamps"],
+            "landmarks": data["landmarks"],
+            "command_frames": data["command_frames"] if "command_frames" in data.files else np.empty(0, np.int64),
+            "commands": data["commands"] if "commands" in data.files else np.empty(0, str),
+            "reference": str(data["reference"]) if "reference" in data.files else None,
+        }
+    return session
+
+
+class VirtualClock:
+    """
+    Relógio da reprodução, que avança para os instantes gravados. No modo
+    `realtime`, aguarda o tempo de parede correspondente antes de avançar.
+    """
+
+    def __init__(self, realtime=False, speed=1.0):
+        self.realtime = realtime
+        self.speed = speed
+        self.now = None
+        self._origin = None
+        self._wall_origin = None
+
+    def advance(self, timestamp):
+        """Avançando o relógio para um instante gravado, retornando-o."""
+        timestamp = float(timestamp)
+        if self._origin is None:
+            self._origin = timestamp
+            self._wall_origin = time.perf_counter()
+        elif self.realtime:
+            delay = self._wall_origin + (timestamp - self._origin) / self.speed - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        self.now = timestamp
+        return timestamp
+
+    def time(self):
+        """Retornando o instante virtual atual, no lugar de `time.time()`."""
+        return self.now
+
+
+def replay(session, predict_proba, class_names, decoder="majority", clock=None, cache=None, **recognizer_options):
+    """
+    Reproduzindo uma sessão pelo caminho do laço ao vivo.
+
+    Returns:
+        dict: A frase emitida, as decisões por frame, o tempo de parede e o
+        tempo gasto no processamento dos frames.
+    """
+    from decoder import build_recognizer
+    from features import FrameNormalizer
+
+    clock = clock or VirtualClock()
+    normalize_frame = FrameNormalizer()
+    recognizer = build_recognizer(class_names, decoder, **recognizer_options)
+    commands = {}
+    for frame_index, command in zip(session["command_frames"], session["commands"]):
+        commands.setdefault(int(frame_index), []).append(str(command))
+
+    timestamps = session["timestamps"]
+    origin = float(timestamps[0]) if len(timestamps) else 0.0
+    decisions = []
+    processing = 0.0
+    wall_start = time.perf_counter()
+    for i, (timestamp, coords) in enumerate(zip(timestamps, session["landmarks"])):
+        now = clock.advance(timestamp)
+        start = time.perf_counter()
+        # Aplicando os comandos de edição na mesma posição da sessão ao vivo.
+        for command in commands.get(i, ()):
+            if command == "delete":
+                recognizer.delete_last()
+            elif command == "clear":
+                recognizer.clear()
+
+        prediction_proba = None
+        if not np.isnan(coords[0]):
+            coords_normalized = normalize_frame(coords)
+            if cache is None:
+                prediction_proba = predict_proba(coords_normalized)
+            else:
+                prediction_proba, _ = cache.classify(coords_normalized, predict_proba)
+        elif cache is not None:
+            cache.clear()
+
+        length = len(recognizer.sentence)
+        smoothed_label = recognizer.update(prediction_proba, clock.time())
+        processing += time.perf_counter() - start
+
+        if prediction_proba is None:
+            prediction, confidence = "", float("nan")
+        else:
+            proba = np.ravel(prediction_proba)
+            index = int(np.argmax(proba))
+            prediction, confidence = str(class_names[index]), float(proba[index])
+        confirmed = str(recognizer.sentence[-1]) if len(recognizer.sentence) > length else ""
+        decisions.append((i, now - origin, prediction_proba is not None, prediction, confidence,
+                          str(smoothed_label), confirmed))
+
+    return {
+        "sentence": [str(letter) for letter in recognizer.sentence],
+        "decisions": decisions,
+        "wall_time": time.perf_counter() - wall_start,
+        "processing_time": processing,
+    }
+
+
+def write_decisions(path, decisions):
+    """Exportando as decisões por frame em CSV."""
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(["frame", "timestamp", "hand", "prediction", "confidence", "smoothed", "confirmed"])
+        for frame, timestamp, hand, prediction, confidence, smoothed, confirmed in decisions:
+            writer.writerow([frame, f"{timestamp:.4f}", int(hand), prediction,
+                             "" if np.isnan(confidence) else f"{confidence:.4f}", smoothed, confirmed])
+
+
+def _decisions_path(path, decoder, several):
+    # Separando os arquivos por decodificador quando mais de um for comparado.
+    if not several:
+        return path
+    root, extension = os.path.splitext(path)
+    return f"{root}_{decoder}{extension or '.csv'}"
+
+
+def parse_args():
+    from decoder import DECODER_MODES
+    from engine import MODELS_DIR, PRECISIONS
+    from gating import CACHE_TOLERANCE
+
+    parser = argparse.ArgumentParser(description="Reprodução determinística de uma sessão gravada pelo predict.py")
+    parser.add_argument("session", help="Sessão gravada com predict.py --record (.npz)")
+    parser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+    parser.add_argument("--decoder", nargs="+", choices=("majority",) + DECODER_MODES, default=["majority"],
+                        help="Suavizações temporais reproduzidas, em sequência, para comparação")
+    parser.add_argument("--confirmation-time", type=float, help="Tempo de estabilidade para confirmar uma letra (ou duração mínima de um segmento, com --decoder), em segundos")
+    parser.add_argument("--cascade", action="store_true", help="Usando a cascata de classificadores")
+    parser.add_argument("--precision", choices=PRECISIONS, default="float32", help="Variante de precisão do motor")
+    parser.add_argument("--adaptive", action="store_true", help="Reutilizando as probabilidades enquanto a mão permanece parada")
+    parser.add_argument("--cache-tolerance", type=float, default=CACHE_TOLERANCE,
+                        help="Variação máxima dos landmarks normalizados para reutilizar as probabilidades")
+    parser.add_argument("--realtime", action="store_true", help="Reproduzindo no ritmo em que a sessão foi gravada")
+    parser.add_argument("--speed", type=float, default=1.0, help="Fator de velocidade da reprodução com --realtime")
+    parser.add_argument("--reference", help="Frase esperada, para o cálculo da distância de edição")
+    parser.add_argument("--decisions", help="Arquivo CSV de saída com as decisões por frame")
+    return parser.parse_args()
+
+
+def main():
+    from decoder import edit_distance
+    from engine import load_classifier
+    from gating import ProbabilityCache
+
+    args = parse_args()
+    session = load_session(args.session)
+    frames = len(session["timestamps"])
+    if frames == 0:
+        raise SystemExit(f"[ERRO] A sessão '{args.session}' não contém frames")
+    duration = float(session["timestamps"][-1] - session["timestamps"][0])
+    detected = int(np.count_nonzero(~np.isnan(session["landmarks"][:, 0])))
+    print(f"[INFO] Sessão '{args.session}': {frames} frames em {duration:.1f}s, mão detectada em {detected}")
+
+    predict_proba, class_names = load_classifier(args.models_dir, cascade=args.cascade, precision=args.precision)
+    # Aquecendo o classificador para que a primeira chamada não distorça o tempo medido.
+    predict_proba(np.zeros((1, N_FEATURES), dtype=np.float32))
+    recognizer_options = {} if args.confirmation_time is None else {"confirmation_time": args.confirmation_time}
+    reference = args.reference if args.reference is not None else session["reference"]
+
+    for decoder in args.decoder:
+        cache = ProbabilityCache(args.cache_tolerance) if args.adaptive else None
+        clock = VirtualClock(args.realtime, args.speed)
+        result = replay(session, predict_proba, class_names, decoder, clock, cache, **recognizer_options)
+        sentence = "".join(result["sentence"])
+        print(f"[RESULTADO] {decoder}: frase '{sentence}'")
+        if reference is not None:
+            print(f"[RESULTADO] {decoder}: distância de edição {edit_distance(result['sentence'], list(reference))} "
+                  f"em relação a '{reference}'")
+        print(f"[RESULTADO] {decoder}: {frames / result['processing_time']:.0f} frames/s de processamento "
+              f"({result['processing_time'] / frames * 1e6:.1f} us por frame), "
+              f"{frames / result['wall_time']:.0f} frames/s de parede")
+        if args.decisions:
+            path = _decisions_path(args.decisions, decoder, len(args.decoder) > 1)
+            write_decisions(path, result["decisions"])
+            print(f"[INFO] Decisões por frame salvas em '{path}'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,432 @@
+# -*- coding: utf-8 -*-
+"""
+Servidor Local de Inferência com Agrupamento de Requisições
+
+Este script carrega os artefatos do diretório `models` uma única vez e expõe o
+classificador via HTTP, em uma porta TCP ou em um socket Unix, para que os
+clientes executem apenas o MediaPipe. Requisições concorrentes são agrupadas
+em uma única chamada a `predict_proba`, respeitando um orçamento de latência.
+
+Rotas:
+    - POST /predict: recebe um ou mais vetores de 63 coordenadas, em JSON
+      ({"landmarks": [...], "normalized": false}) ou em float32 binário
+      (Content-Type: application/octet-stream, cabeçalho X-Normalized
+      opcional), e retorna as probabilidades de cada classe no mesmo formato;
+    - GET /classes: retorna os nomes das classes, na ordem das probabilidades;
+    - GET /stats: retorna a vazão e a distribuição do tamanho dos lotes.
+
+Uso:
+    python src/server.py serve --port 8765 --max-batch 32 --max-delay-ms 2
+    python src/server.py serve --socket /tmp/librasign.sock
+    python src/server.py load --spawn --max-batch 1 32 --clients 16
+"""
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import socket
+import socketserver
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from engine import MODELS_DIR, load_classifier
+from features import N_FEATURES, normalize_landmarks
+
+# Parâmetros padrão do agrupamento de requisições.
+MAX_BATCH = 32        # Quantidade máxima de vetores por chamada ao classificador.
+MAX_DELAY_MS = 2.0    # Espera máxima do primeiro pedido da fila antes de processar o lote.
+DEFAULT_PORT = 8765
+BINARY_TYPE = "application/octet-stream"
+
+
+class _Request:
+    """Pedido pendente de classificação, aguardado pela thread do cliente."""
+
+    __slots__ = ("X", "arrived", "done", "result", "error")
+
+    def __init__(self, X):
+        self.X = X
+        self.arrived = time.perf_counter()
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class MicroBatcher:
+    """
+    Agrupando pedidos concorrentes em lotes para o classificador. O lote é
+    processado quando atinge `max_batch` vetores ou quando o pedido mais antigo
+    espera `max_delay` segundos.
+    """
+
+    def __init__(self, predict_proba, max_batch=MAX_BATCH, max_delay=MAX_DELAY_MS / 1000):
+        self.predict_proba = predict_proba
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.requests = 0
+        self.rows = 0
+        self.batches = 0
+        self.batch_sizes = {}
+        self.queue_wait = 0.0
+        self.started = time.time()
+        self._pending = deque()
+        self._pending_rows = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._loop, name="micro-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, X):
+        """Enfileirando vetores já normalizados e aguardando as probabilidades."""
+        request = _Request(X)
+        with self._cond:
+            self._pending.append(request)
+            self._pending_rows += len(X)
+            self._cond.notify()
+        request.done.wait()
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=1.0)
+
+    def _next_batch(self):
+        """Aguardando o lote encher ou o orçamento de latência se esgotar."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._pending or self._closed)
+            if not self._pending:
+                return None
+            deadline = self._pending[0].arrived + self.max_delay
+            while self._pending_rows < self.max_batch and not self._closed:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            # Retirando pedidos inteiros até o limite de vetores do lote.
+            batch = [self._pending.popleft()]
+            rows = len(batch[0].X)
+            while self._pending and rows + len(self._pending[0].X) <= self.max_batch:
+                request = self._pending.popleft()
+                batch.append(request)
+                rows += len(request.X)
+            self._pending_rows -= rows
+            return batch
+
+    def _loop(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+            start = time.perf_counter()
+            rows = sum(len(request.X) for request in batch)
+            try:
+                X = batch[0].X if len(batch) == 1 else np.concatenate([request.X for request in batch])
+                proba = self.predict_proba(X)
+                offset = 0
+                for request in batch:
+                    # Copiando a fatia, pois o motor reutiliza o buffer de saída.
+                    request.result = np.array(proba[offset:offset + len(request.X)], dtype=np.float32)
+                    offset += len(request.X)
+            except Exception as exc:
+                for request in batch:
+                    request.error = exc
+
+            self.batches += 1
+            self.requests += len(batch)
+            self.rows += rows
+            self.batch_sizes[len(batch)] = self.batch_sizes.get(len(batch), 0) + 1
+            self.queue_wait += sum(start - request.arrived for request in batch)
+            for request in batch:
+                request.done.set()
+
+    def stats(self):
+        elapsed = time.time() - self.started
+        return {
+            "uptime_s": elapsed,
+            "requests": self.requests,
+            "rows": self.rows,
+            "batches": self.batches,
+            "requests_per_s": self.requests / elapsed if elapsed > 0 else 0.0,
+            "rows_per_s": self.rows / elapsed if elapsed > 0 else 0.0,
+            "mean_batch_requests": self.requests / self.batches if self.batches else 0.0,
+            "mean_queue_wait_ms": self.queue_wait / self.requests * 1000 if self.requests else 0.0,
+            "batch_sizes": {str(size): count for size, count in sorted(self.batch_sizes.items())},
+            "max_batch": self.max_batch,
+            "max_delay_ms": self.max_delay * 1000,
+        }
+
+
+class InferenceHandler(BaseHTTPRequestHandler):
+    """Atendendo as rotas do servidor com conexões persistentes."""
+
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        # Desativando o algoritmo de Nagle em TCP, evitando o atraso entre cabeçalhos e corpo.
+        self.disable_nagle_algorithm = self.server.address_family != socket.AF_UNIX
+        super().setup()
+
+    def log_message(self, format, *args):
+        # Silenciando o log por requisição do http.server.
+        pass
+
+    def _send(self, status, body, content_type="application/json"):
+        if not isinstance(body, bytes):
+            body = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            self._send(200, self.server.batcher.stats())
+        elif self.path == "/classes":
+            self._send(200, {"classes": [str(name) for name in self.server.class_names]})
+        else:
+            self._send(404, {"error": "rota não encontrada"})
+
+    def do_POST(self):
+        if self.path != "/predict":
+            self._send(404, {"error": "rota não encontrada"})
+            return
+        binary = self.headers.get("Content-Type", "").startswith(BINARY_TYPE)
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length < 0:
+                raise ValueError(f"Content-Length inválido: {length}")
+            body = self.rfile.read(length)
+            if binary:
+                X = np.frombuffer(body, dtype="<f4")
+                normalized = self.headers.get("X-Normalized", "0") == "1"
+            else:
+                payload = json.loads(body)
+                X = np.asarray(payload["landmarks"], dtype=np.float32)
+                normalized = bool(payload.get("normalized", False))
+            if X.size == 0 or X.size % N_FEATURES:
+                raise ValueError(f"esperados vetores de {N_FEATURES} valores, recebidos {X.size}")
+            X = X.reshape(-1, N_FEATURES)
+        except (ValueError, KeyError, TypeError) as exc:
+            self._send(400, {"error": str(exc)})
+            return
+
+        # Normalizando no servidor quando o cliente envia as coordenadas brutas.
+        if not normalized:
+            X = normalize_landmarks(X)
+        proba = self.server.batcher.submit(X)
+        if binary:
+            self._send(200, proba.astype("<f4").tobytes(), BINARY_TYPE)
+        else:
+            self._send(200, {"probabilities": proba.tolist()})
+
+
+class TCPHTTPServer(ThreadingHTTPServer):
+    """Servidor HTTP sobre TCP, com uma fila de conexões pendentes ampliada."""
+
+    request_queue_size = 128
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Servidor HTTP sobre socket Unix, com uma thread por conexão."""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+    def get_request(self):
+        # Substituindo o endereço vazio do cliente para o log do http.server.
+        request, _ = super().get_request()
+        return request, ("unix", 0)
+
+
+def create_server(models_dir=MODELS_DIR, host="127.0.0.1", port=DEFAULT_PORT, socket_path=None,
+                  max_batch=MAX_BATCH, max_delay=MAX_DELAY_MS / 1000):
+    """Carregando o classificador e criando o servidor HTTP ou Unix."""
+    predict_proba, class_names = load_classifier(models_dir)
+    if socket_path:
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        server = UnixHTTPServer(socket_path, InferenceHandler)
+    else:
+        server = TCPHTTPServer((host, port), InferenceHandler)
+    server.batcher = MicroBatcher(predict_proba, max_batch, max_delay)
+    server.class_names = class_names
+    return server
+
+
+def serve(args):
+    server = create_server(args.models_dir, args.host, args.port, args.socket,
+                           args.max_batch, args.max_delay_ms / 1000)
+    address = args.socket or f"http://{args.host}:{args.port}"
+    print(f"[INFO] Servidor pronto em {address} (lote máximo {args.max_batch}, espera máxima {args.max_delay_ms} ms)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.batcher.close()
+        if args.socket and os.path.exists(args.socket):
+            os.unlink(args.socket)
+        print(f"[INFO] Estatísticas: {json.dumps(server.batcher.stats())}")
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    """Conexão HTTP do cliente sobre socket Unix."""
+
+    def __init__(self, socket_path, timeout=10.0):
+        super().__init__("localhost", timeout=timeout)
+        self.socket_path = socket_path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.socket_path)
+
+
+def connect(host, port, socket_path):
+    if socket_path:
+        return UnixHTTPConnection(socket_path)
+    return http.client.HTTPConnection(host, port, timeout=10.0)
+
+
+def request(connection, method, path, body=None, headers=None):
+    connection.request(method, path, body=body, headers=headers or {})
+    response = connection.getresponse()
+    return response.status, response.read()
+
+
+def _client_loop(options):
+    """
+    Enviando pedidos de um vetor em sequência por uma conexão persistente,
+    em um processo próprio, e retornando as latências observadas.
+    """
+    host, port, socket_path, payload, headers, duration = options
+    connection = connect(host, port, socket_path)
+    latencies = []
+    errors = 0
+    try:
+        stop_at = time.perf_counter() + duration
+        while time.perf_counter() < stop_at:
+            start = time.perf_counter()
+            status, _ = request(connection, "POST", "/predict", payload, headers)
+            if status == 200:
+                latencies.append(time.perf_counter() - start)
+            else:
+                errors += 1
+    finally:
+        connection.close()
+    return latencies, errors
+
+
+def run_load(args):
+    """
+    Gerando carga com clientes concorrentes, cada um em um processo, e
+    retornando a vazão obtida e as estatísticas de agrupamento do servidor.
+    """
+    # Usando landmarks sintéticos de uma mão, no formato bruto enviado pelos clientes.
+    rng = np.random.default_rng(42)
+    X = rng.uniform(0.3, 0.7, (1, N_FEATURES)).astype(np.float32)
+    if args.format == "binary":
+        payload = X.astype("<f4").tobytes()
+        headers = {"Content-Type": BINARY_TYPE}
+    else:
+        payload = json.dumps({"landmarks": X[0].tolist()}).encode()
+        headers = {"Content-Type": "application/json"}
+
+    options = (args.host, args.port, args.socket, payload, headers, args.duration)
+    with multiprocessing.Pool(args.clients) as pool:
+        results = pool.map(_client_loop, [options] * args.clients)
+    latencies = np.concatenate([np.asarray(result[0]) for result in results])
+    errors = sum(result[1] for result in results)
+
+    connection = connect(args.host, args.port, args.socket)
+    _, body = request(connection, "GET", "/stats")
+    connection.close()
+    stats = json.loads(body)
+    p50, p95 = np.percentile(latencies, (50, 95)) if len(latencies) else (0.0, 0.0)
+    return {
+        "requests_per_s": len(latencies) / args.duration,
+        "p50_ms": p50 * 1000,
+        "p95_ms": p95 * 1000,
+        "errors": errors,
+        "mean_batch_requests": stats["mean_batch_requests"],
+    }
+
+
+def _spawned_server(args, max_batch, ready):
+    server = create_server(args.models_dir, args.host, args.port, args.socket, max_batch, args.max_delay_ms / 1000)
+    ready.set()
+    server.serve_forever()
+
+
+def load(args):
+    if not args.spawn:
+        result = run_load(args)
+        print(f"[RESULTADO] {result['requests_per_s']:.0f} req/s, p50 {result['p50_ms']:.2f} ms, "
+              f"p95 {result['p95_ms']:.2f} ms, lote médio {result['mean_batch_requests']:.1f}, erros {result['errors']}")
+        return
+
+    # Comparando a vazão com diferentes tamanhos máximos de lote em servidores dedicados.
+    print(f"[INFO] Gerando carga com {args.clients} cliente(s) por {args.duration:.0f}s em cada configuração")
+    print(f"{'lote máx.':>10}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'lote médio':>12}{'erros':>8}")
+    for max_batch in args.max_batch:
+        ready = multiprocessing.Event()
+        process = multiprocessing.Process(target=_spawned_server, args=(args, max_batch, ready), daemon=True)
+        process.start()
+        ready.wait(timeout=30.0)
+        time.sleep(0.2)
+        try:
+            result = run_load(args)
+        finally:
+            process.terminate()
+            process.join()
+            if args.socket and os.path.exists(args.socket):
+                os.unlink(args.socket)
+        print(f"{max_batch:>10}{result['requests_per_s']:>10.0f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['mean_batch_requests']:>12.1f}{result['errors']:>8}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Servidor local de inferência do classificador")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    def add_address(subparser):
+        subparser.add_argument("--host", default="127.0.0.1", help="Endereço TCP do servidor")
+        subparser.add_argument("--port", type=int, default=DEFAULT_PORT, help="Porta TCP do servidor")
+        subparser.add_argument("--socket", help="Caminho do socket Unix, no lugar da porta TCP")
+        subparser.add_argument("--models-dir", default=MODELS_DIR, help="Diretório dos artefatos do modelo")
+        subparser.add_argument("--max-delay-ms", type=float, default=MAX_DELAY_MS,
+                               help="Espera máxima de um pedido pelo lote, em milissegundos")
+
+    serve_parser = subparsers.add_parser("serve", help="Iniciando o servidor")
+    add_address(serve_parser)
+    serve_parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="Vetores máximos por lote")
+
+    load_parser = subparsers.add_parser("load", help="Gerando carga contra o servidor")
+    add_address(load_parser)
+    load_parser.add_argument("--clients", type=int, default=16, help="Clientes concorrentes, um processo cada")
+    load_parser.add_argument("--duration", type=float, default=5.0, help="Duração de cada medição, em segundos")
+    load_parser.add_argument("--format", choices=["binary", "json"], default="binary", help="Formato das requisições")
+    load_parser.add_argument("--spawn", action="store_true", help="Iniciando um servidor próprio para cada lote máximo")
+    load_parser.add_argument("--max-batch", type=int, nargs="+", default=[1, MAX_BATCH],
+                             help="Lotes máximos comparados com --spawn")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.command == "serve":
+        serve(args)
+    else:
+        load(args)
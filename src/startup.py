@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+Inicialização Rápida do Reconhecimento em Tempo Real
+
+Este módulo reúne o caminho de inicialização do predict.py:
+    - CameraOpener: abre a câmera em segundo plano, enquanto o MediaPipe e o
+      modelo são carregados na thread principal;
+    - create_hands: importa o MediaPipe apenas quando necessário;
+    - warm_up: executa o MediaPipe e o classificador sobre entradas sintéticas
+      antes do primeiro frame real, antecipando a inicialização do grafo e as
+      alocações das primeiras chamadas.
+
+O modelo de landmarks do MediaPipe só é executado após a detecção de uma
+palma, então o aquecimento cobre o detector de palmas e o classificador, mas
+não o primeiro frame com mão.
+
+Executado diretamente, mede em processos novos os tempos de importação,
+carregamento do modelo e primeira predição do caminho antigo (pickles do
+scikit-learn, sem aquecimento) e do caminho rápido:
+    python src/startup.py --repeat 5
+"""
+import argparse
+import json
+import os
+import pickle
+import platform
+import subprocess
+import sys
+import threading
+import time
+
+import numpy as np
+
+from features import N_FEATURES
+
+# Resolução dos frames sintéticos do aquecimento, igual à padrão das webcams.
+WARMUP_SHAPE = (480, 640, 3)
+# Quantidade de chamadas de aquecimento do MediaPipe e do classificador.
+WARMUP_ITERATIONS = 2
+# Diretório padrão dos resultados em JSON.
+RESULTS_DIR = "benchmarks"
+
+
+class CameraOpener:
+    """Abrindo a câmera em uma thread, já que a abertura pode levar segundos."""
+
+    def __init__(self, index=0):
+        self.index = index
+        self.capture = None
+        self.elapsed = None
+        self._thread = threading.Thread(target=self._open, name="camera-open", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def _open(self):
+        import cv2
+
+        start = time.perf_counter()
+        self.capture = cv2.VideoCapture(self.index)
+        self.elapsed = time.perf_counter() - start
+
+    def result(self, timeout=None):
+        """Aguardando a abertura e retornando o `cv2.VideoCapture`."""
+        self._thread.join(timeout)
+        return self.capture
+
+
+def create_hands(**kwargs):
+    """Importando o MediaPipe e inicializando a solução Hands."""
+    import mediapipe as mp
+
+    return mp.solutions.hands.Hands(**kwargs)
+
+
+def warm_up(hands, predict_proba, shape=WARMUP_SHAPE, iterations=WARMUP_ITERATIONS):
+    """Executando o MediaPipe e o classificador sobre entradas sintéticas."""
+    image = np.zeros(shape, dtype=np.uint8)
+    image.flags.writeable = False
+    features = np.zeros((1, N_FEATURES), dtype=np.float32)
+    for _ in range(iterations):
+        hands.process(image)
+        predict_proba(features)
+    # Mantendo o grafo já inicializado: `hands.reset()` o recriaria, desfazendo o
+    # aquecimento, e frames sem mão não deixam estado de rastreamento.
+
+
+def measure(mode, models_dir, camera):
+    """
+    Medindo, no processo atual, cada fase da inicialização até a primeira
+    predição, no caminho antigo ("baseline") ou no rápido ("fast").
+    """
+    phases = {}
+    clock = time.perf_counter
+    start = last = clock()
+
+    def mark(name):
+        nonlocal last
+        now = clock()
+        phases[name] = now - last
+        last = now
+
+    opener = None
+    if mode == "fast" and camera is not None:
+        opener = CameraOpener(camera).start()
+
+    import cv2
+    mark("import_cv2")
+    import mediapipe  # noqa: F401
+    mark("import_mediapipe")
+
+    if mode == "baseline":
+        # Reproduzindo o caminho original: pickles do scikit-learn e câmera em série.
+        with open(os.path.join(models_dir, "librasign_mlp.pkl"), 'rb') as f:
+            model = pickle.load(f)
+        with open(os.path.join(models_dir, "scaler.pkl"), 'rb') as f:
+            scaler = pickle.load(f)
+        mark("load_model")
+
+        def predict_proba(coords):
+            return model.predict_proba(scaler.transform(coords))
+
+        if camera is not None:
+            cv2.VideoCapture(camera)
+            mark("open_camera")
+        hands = create_hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        mark("create_hands")
+    else:
+        from engine import load_classifier
+
+        predict_proba, _ = load_classifier(models_dir)
+        mark("load_model")
+        hands = create_hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+        mark("create_hands")
+        warm_up(hands, predict_proba)
+        mark("warm_up")
+        if opener is not None:
+            opener.result()
+            mark("open_camera")
+
+    # Medindo a primeira chamada real e o regime permanente.
+    rng = np.random.default_rng(42)
+    frames = [rng.integers(0, 256, WARMUP_SHAPE, dtype=np.uint8) for _ in range(11)]
+    row = rng.normal(0, 1, (1, N_FEATURES)).astype(np.float32)
+    hands.process(frames[0])
+    mark("first_process")
+    predict_proba(row)
+    mark("first_predict")
+    phases["time_to_first_prediction"] = clock() - start
+
+    steady = clock()
+    for frame in frames[1:]:
+        hands.process(frame)
+    phases["steady_process"] = (clock() - steady) / (len(frames) - 1)
+    steady = clock()
+    for _ in range(100):
+        predict_proba(row)
+    phases["steady_predict"] = (clock() - steady) / 100
+    phases["sklearn_imported"] = float("sklearn" in sys.modules)
+    hands.close()
+    return phases
+
+
+def run_child(mode, models_dir, camera):
+    """Executando a medição em um interpretador novo, incluindo o seu tempo de partida."""
+    command = [sys.executable, os.path.abspath(__file__), "--child", mode, "--models-dir", models_dir]
+    if camera is not None:
+        command += ["--camera", str(camera)]
+    start = time.perf_counter()
+    output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+    phases = json.loads(output.strip().splitlines()[-1])
+    phases["process_total"] = time.perf_counter() - start
+    return phases
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Benchmark de inicialização do reconhecimento")
+    parser.add_argument("--models-dir", default="models", help="Diretório dos artefatos do modelo")
+    parser.add_argument("--repeat", type=int, default=3, help="Execuções de cada caminho")
+    parser.add_argument("--camera", type=int, help="Índice da câmera incluída na medição")
+    parser.add_argument("--output", help="Arquivo JSON de saída dos resultados")
+    parser.add_argument("--child", choices=["baseline", "fast"], help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.child:
+        print(json.dumps(measure(args.child, args.models_dir, args.camera)))
+        raise SystemExit
+
+    modes = [mode for mode, artifact in (("baseline", "librasign_mlp.pkl"), ("fast", "librasign_mlp.npz"))
+             if os.path.exists(os.path.join(args.models_dir, artifact))]
+    if not modes:
+        raise SystemExit(f"[ERRO] Nenhum artefato de modelo encontrado em '{args.models_dir}'")
+
+    results = {}
+    for mode in modes:
+        print(f"[INFO] Medindo o caminho '{mode}' em {args.repeat} processo(s) novo(s)")
+        runs = [run_child(mode, args.models_dir, args.camera) for _ in range(args.repeat)]
+        results[mode] = {name: float(np.median([run[name] for run in runs])) for name in runs[0]}
+
+    names = [name for name in results[modes[0]] if name != "sklearn_imported"]
+    for mode in modes[1:]:
+        names += [name for name in results[mode] if name not in names and name != "sklearn_imported"]
+    print(f"{'fase (mediana, ms)':<28}" + "".join(f"{mode:>12}" for mode in modes))
+    for name in names:
+        values = "".join(
+            f"{results[mode][name] * 1000:>12.1f}" if name in results[mode] else f"{'-':>12}" for mode in modes
+        )
+        print(f"{name:<28}{values}")
+    for mode in modes:
+        print(f"[RESULTADO] '{mode}' importa o scikit-learn: {'sim' if results[mode]['sklearn_imported'] else 'não'}")
+
+    report = {
+        "meta": {"timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"), "platform": platform.platform(),
+                 "python": platform.python_version(), "repeat": args.repeat, "camera": args.camera},
+        "results": results,
+    }
+    output = args.output or os.path.join(RESULTS_DIR, f"startup_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"[INFO] Resultados salvos em '{output}'")
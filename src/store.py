@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+Armazenamento Binário de Landmarks
+
+Este módulo grava as amostras de cada classe em um arquivo binário somente de
+acréscimo, com linhas float32 precedidas por um cabeçalho fixo que guarda a
+quantidade de amostras. Assim, a contagem é obtida sem percorrer o arquivo, as
+escritas são agrupadas em lotes e o treinamento pode abrir os dados via
+memória mapeada, sem cópia.
+
+Formato do arquivo <rótulo>.f32:
+    - 32 bytes de cabeçalho: assinatura, versão, colunas por amostra e contagem;
+    - contagem x colunas valores float32 em ordem de linha.
+
+Também é possível converter entre este formato e os CSVs do dataset público:
+    python src/store.py import data/landmarks
+    python src/store.py export data/landmarks
+"""
+import argparse
+import os
+import struct
+
+import numpy as np
+
+from features import N_FEATURES
+
+# Extensão dos arquivos binários de landmarks.
+STORE_EXTENSION = ".f32"
+# Assinatura, versão, colunas por amostra e contagem, alinhados em 32 bytes.
+MAGIC = b"LSLM"
+VERSION = 1
+HEADER_FORMAT = "<4sIIQ12x"
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# Posição do campo de contagem dentro do cabeçalho.
+COUNT_OFFSET = 12
+
+
+def store_path(data_dir, label):
+    """Montando o caminho do arquivo binário de uma classe."""
+    return os.path.join(data_dir, f"{label}{STORE_EXTENSION}")
+
+
+def read_header(path):
+    """
+    Lendo o cabeçalho de um arquivo binário de landmarks.
+
+    Returns:
+        tuple: A quantidade de colunas por amostra e a quantidade de amostras.
+    """
+    with open(path, 'rb') as f:
+        header = f.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise ValueError(f"Cabeçalho incompleto em {path}")
+    magic, version, n_features, count = struct.unpack(HEADER_FORMAT, header)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"Arquivo de landmarks inválido: {path}")
+    return n_features, count
+
+
+def count_samples(path):
+    """Obtendo a quantidade de amostras gravadas, sem ler os dados."""
+    try:
+        return read_header(path)[1]
+    except FileNotFoundError:
+        return 0
+
+
+def open_landmarks(path):
+    """
+    Abrindo um arquivo binário de landmarks como memória mapeada somente
+    leitura, sem copiar os dados.
+
+    Returns:
+        np.ndarray: Array float32 com formato (N, colunas).
+    """
+    n_features, count = read_header(path)
+    if count == 0:
+        return np.empty((0, n_features), dtype=np.float32)
+    return np.memmap(path, dtype=np.float32, mode='r', offset=HEADER_SIZE, shape=(count, n_features))
+
+
+class LandmarkWriter:
+    """
+    Acrescentando amostras a um arquivo binário de landmarks com escrita
+    agrupada em lotes.
+
+    As amostras ficam em um buffer pré-alocado e são gravadas quando ele
+    enche ou quando `flush` é chamado. A contagem no cabeçalho só é
+    atualizada após a gravação dos dados, de modo que uma interrupção nunca
+    expõe linhas incompletas.
+    """
+
+    def __init__(self, path, n_features=N_FEATURES, buffer_rows=64):
+        self.path = path
+        self.n_features = n_features
+        self._buffer = np.empty((buffer_rows, n_features), dtype=np.float32)
+        self._pending = 0
+
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        if os.path.exists(path):
+            stored_features, self._stored = read_header(path)
+            if stored_features != n_features:
+                raise ValueError(f"Arquivo {path} possui {stored_features} colunas, esperado {n_features}")
+            self._file = open(path, 'r+b')
+            # Descartando eventuais linhas incompletas após a última contagem válida.
+            self._file.truncate(HEADER_SIZE + self._stored * self._row_bytes)
+        else:
+            self._stored = 0
+            self._file = open(path, 'w+b')
+            self._file.write(struct.pack(HEADER_FORMAT, MAGIC, VERSION, n_features, 0))
+        self._file.seek(0, os.SEEK_END)
+
+    @property
+    def _row_bytes(self):
+        return self.n_features * 4
+
+    @property
+    def count(self):
+        """Quantidade total de amostras, incluindo as ainda não gravadas."""
+        return self._stored + self._pending
+
+    def append(self, row):
+        # Copiando a amostra para o buffer, convertendo para float32.
+        self._buffer[self._pending] = np.ravel(row)
+        self._pending += 1
+        if self._pending == len(self._buffer):
+            self.flush()
+
+    def extend(self, rows):
+        """Gravando um lote de amostras diretamente, sem passar pelo buffer."""
+        rows = np.ascontiguousarray(np.reshape(rows, (-1, self.n_features)), dtype=np.float32)
+        self.flush()
+        self._file.write(rows.tobytes())
+        self._stored += len(rows)
+        self._write_count()
+
+    def flush(self):
+        if self._pending:
+            self._file.write(self._buffer[:self._pending].tobytes())
+            self._stored += self._pending
+            self._pending = 0
+            self._write_count()
+
+    def _write_count(self):
+        # Atualizando a contagem no cabeçalho após a gravação dos dados.
+        self._file.flush()
+        self._file.seek(COUNT_OFFSET)
+        self._file.write(struct.pack("<Q", self._stored))
+        self._file.flush()
+        self._file.seek(0, os.SEEK_END)
+
+    def close(self):
+        if self._file is not None:
+            self.flush()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def import_csv(csv_path, path=None, chunk_rows=4096):
+    """Convertendo um CSV de landmarks no formato do dataset para o formato binário."""
+    path = path or os.path.splitext(csv_path)[0] + STORE_EXTENSION
+    if os.path.exists(path):
+        os.remove(path)
+    with LandmarkWriter(path) as writer:
+        chunk = []
+        with open(csv_path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                chunk.append(np.array(line.split(','), dtype=np.float32))
+                if len(chunk) == chunk_rows:
+                    writer.extend(np.vstack(chunk))
+                    chunk = []
+        if chunk:
+            writer.extend(np.vstack(chunk))
+        return path, writer.count
+
+
+def export_csv(path, csv_path=None):
+    """Convertendo um arquivo binário de landmarks para o formato CSV do dataset."""
+    csv_path = csv_path or os.path.splitext(path)[0] + ".csv"
+    data = open_landmarks(path)
+    with open(csv_path, 'w', newline='') as f:
+        for row in data:
+            f.write(",".join(repr(float(v)) for v in row))
+            f.write("\n")
+    return csv_path, len(data)
+
+
+# Convertendo diretórios inteiros entre CSV e o formato binário.
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Conversão entre CSV e o formato binário de landmarks")
+    parser.add_argument("command", choices=["import", "export"], help="import: CSV para binário, export: binário para CSV")
+    parser.add_argument("data_dir", help="Diretório contendo os arquivos de landmarks")
+    args = parser.parse_args()
+
+    source_extension = ".csv" if args.command == "import" else STORE_EXTENSION
+    convert = import_csv if args.command == "import" else export_csv
+    for file in sorted(os.listdir(args.data_dir)):
+        if file.endswith(source_extension):
+            output_path, count = convert(os.path.join(args.data_dir, file))
+            print(f"[INFO] {file} -> {os.path.basename(output_path)} ({count} amostras)")
@@ -1,152 +1,411 @@
 # -*- coding: utf-8 -*-
+import argparse
+import json
+import math
 import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
 import numpy as np
-import pandas as pd
-from sklearn.model_selection import StratifiedKFold
+from sklearn.model_selection import ParameterGrid, StratifiedKFold
 from sklearn.neural_network import MLPClassifier
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.metrics import accuracy_score, confusion_matrix
+from threadpoolctl import threadpool_limits
 import pickle
-import kagglehub
 
-def normalize_landmarks(data):
+from dataset import CACHE_DIR, build_cache, download_dataset, load_dataset, open_dataset, read_manifest
+from engine import CASCADE_FILE, PRECISIONS, STATE_FILE, VARIANT_FILES, export_engine, model_fingerprint, read_fingerprint
+from features import normalize_landmarks
+from memory import memory_phase, peak_memory_mb
+
+# Diretório de saída dos artefatos do modelo.
+MODELS_DIR = "models"
+# Quantidade de partições da validação cruzada.
+N_SPLITS = 5
+# Semente para reprodutibilidade.
+RANDOM_STATE = 42
+
+# Hiperparâmetros padrão do classificador MLP.
+DEFAULT_PARAMS = {
+    "hidden_layer_sizes": (128, 64), # Arquitetura das camadas ocultas.
+    "max_iter": 300,                 # Máximo de iterações do otimizador.
+    "alpha": 0.001,                  # Parâmetro de regularização L2.
+}
+
+# Espaço de busca da varredura opcional de hiperparâmetros.
+SWEEP_GRID = {
+    "hidden_layer_sizes": [(64, 32), (128, 64), (256, 128)],
+    "alpha": [0.0001, 0.001, 0.01],
+    "max_iter": [200, 300],
+}
+# Linhas por bloco no ajuste do scaler e na avaliação dos folds.
+CHUNK_ROWS = 16384
+# Fator de redução da varredura por divisões sucessivas (successive halving).
+HALVING_FACTOR = 3
+
+
+def share_dataset(X, y, classes, shared_dir):
     """
-    Normalizando um conjunto de landmarks para ser invariante
-    à posição e à escala da mão.
+    Gravando os dados de treinamento no mesmo formato do cache, para que os
+    processos trabalhadores os abram via memória mapeada, em vez de recebê-los
+    serializados.
     """
-    normalized_data = []
-    # Iterando sobre cada amostra de dados.
-    for sample in data:
-        # Remodelando para 21 pontos (x, y, z).
-        landmarks = sample.reshape((21, 3))
-
-        # Centralizando os pontos em relação ao pulso.
-        base_point = landmarks[0].copy()
-        relative_landmarks = landmarks - base_point
-
-        # Normalizando pela distância entre o pulso e a base do dedo médio.
-        scale_dist = np.linalg.norm(relative_landmarks[9])
-        if scale_dist < 1e-6: # Evitando divisão por zero.
-            scale_dist = 1.0
-
-        scaled_landmarks = relative_landmarks / scale_dist
-        # Achatando de volta para 63 coordenadas.
-        normalized_data.append(scaled_landmarks.flatten())
-    return np.array(normalized_data)
-
-print("[INFO] Carregando dataset de landmarks")
-
-# Baixando o dataset do Kaggle Hub para garantir consistência.
-print("[INFO] Baixando o dataset 'librasign' do Kaggle Hub")
-kaggle_dataset_path = kagglehub.dataset_download("heitorccf/librasign")
-
-# Ajustando o DATA_DIR para a subpasta correta dos CSVs.
-DATA_DIR = os.path.join(kaggle_dataset_path, "landmarks")
-
-print(f"[INFO] Lendo dados de: {DATA_DIR}")
-
-# Inicializando listas para características (X) e rótulos (y).
-X_raw, y_raw = [], []
-
-# Iterando sobre os arquivos CSV para construir a matriz de características.
-for file in os.listdir(DATA_DIR):
-    if file.endswith('.csv'):
-        # Extraindo o rótulo do nome do arquivo.
-        label = file.split('.')[0]
-        df = pd.read_csv(os.path.join(DATA_DIR, file), header=None)
-        # Adicionando os valores dos landmarks.
-        X_raw.append(df.values)
-        # Duplicando o rótulo para cada amostra no arquivo.
-        y_raw.extend([label] * len(df))
-
-# Verificando se algum dado foi carregado.
-if not X_raw:
-    raise ValueError(f"Nenhum arquivo .csv encontrado no diretório {DATA_DIR}")
-
-# Empilhando os arrays de características.
-X = np.vstack(X_raw)
-
-# Aplicando a codificação numérica aos rótulos textuais.
-le = LabelEncoder()
-y = le.fit_transform(y_raw)
-
-# Persistindo o mapeamento de classes para uso na inferência.
-MODELS_DIR = "models"
-os.makedirs(MODELS_DIR, exist_ok=True)
-np.save(os.path.join(MODELS_DIR, 'classes.npy'), le.classes_)
-
-print("[INFO] Normalizando landmarks para invariância de posição e escala")
-X_normalized = normalize_landmarks(X)
-
-print("[INFO] Iniciando treinamento com validação cruzada (K=5)")
-n_splits = 5
-# Usando StratifiedKFold para manter a proporção das classes nos folds.
-skf = StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42)
-accuracies = []
-all_y_true = []
-all_y_pred = []
-
-# Iterando sobre cada fold da validação cruzada.
-for i, (train_index, test_index) in enumerate(skf.split(X_normalized, y)):
-    print(f"--- FOLD {i + 1}/{n_splits} ---")
-    X_train, X_test = X_normalized[train_index], X_normalized[test_index]
+    np.save(os.path.join(shared_dir, "X.npy"), X)
+    np.save(os.path.join(shared_dir, "y.npy"), y)
+    np.save(os.path.join(shared_dir, "classes.npy"), classes)
+    return shared_dir
+
+
+def _init_worker():
+    # Limitando o BLAS a uma thread por processo para evitar disputa por núcleos.
+    threadpool_limits(1)
+
+
+def build_model(params):
+    """Inicializando o classificador MLP com os hiperparâmetros informados."""
+    return MLPClassifier(
+        random_state=RANDOM_STATE, # Semente para reprodutibilidade.
+        verbose=False,             # Desativando a saída detalhada do treinamento.
+        **params
+    )
+
+
+def fit_scaler(X, chunk_rows=CHUNK_ROWS):
+    """
+    Ajustando o StandardScaler em blocos de linhas, acumulando média e
+    variância sem os temporários do tamanho da matriz criados pelo `fit`.
+    """
+    scaler = StandardScaler()
+    for start in range(0, len(X), chunk_rows):
+        scaler.partial_fit(X[start:start + chunk_rows])
+    return scaler
+
+
+def standardize_inplace(X, scaler):
+    """Aplicando a padronização do scaler diretamente sobre a matriz float32."""
+    X -= scaler.mean_.astype(X.dtype)
+    X /= scaler.scale_.astype(X.dtype)
+    return X
+
+
+def fit_fold(shared_dir, train_index, test_index, params, sample_weight=None, variants=False):
+    """
+    Treinando e avaliando o MLP em uma partição da validação cruzada,
+    opcionalmente ponderando as amostras de treinamento.
+
+    Apenas o conjunto de treinamento é copiado do dataset mapeado em memória,
+    sendo padronizado in-place; o conjunto de teste é avaliado em blocos.
+
+    Com `variants`, o conjunto de teste também é avaliado pelas variantes de
+    precisão do motor, calibradas sobre o conjunto de treinamento do fold.
+
+    Returns:
+        tuple: A acurácia, os rótulos verdadeiros e as predições do fold,
+               seguidos, com `variants`, das predições de cada variante.
+    """
+    X, y, _ = open_dataset(shared_dir)
+    if variants:
+        from quantize import build_variants, calibration_sample, predict_variants
+
+        X_calibration = calibration_sample(X, train_index)
+    X_train = X[train_index]
     y_train, y_test = y[train_index], y[test_index]
 
     # Aplicando StandardScaler aos dados de cada fold.
-    scaler = StandardScaler()
-    X_train_scaled = scaler.fit_transform(X_train)
-    X_test_scaled = scaler.transform(X_test)
-
-    # Inicializando e treinando o classificador MLP.
-    model = MLPClassifier(
-        hidden_layer_sizes=(128, 64), # Arquitetura das camadas ocultas.
-        max_iter=300,                  # Máximo de iterações do otimizador.
-        random_state=42,               # Semente para reprodutibilidade.
-        verbose=False,                 # Desativando a saída detalhada do treinamento.
-        alpha=0.001                    # Parâmetro de regularização L2.
-    )
+    scaler = fit_scaler(X_train)
+    standardize_inplace(X_train, scaler)
+
     # Treinando o modelo no conjunto de treinamento.
-    model.fit(X_train_scaled, y_train)
-
-    # Realizando predições no conjunto de teste.
-    y_pred = model.predict(X_test_scaled)
-    # Calculando e armazenando a acurácia.
-    accuracy = accuracy_score(y_test, y_pred)
-    accuracies.append(accuracy)
-    print(f"Acurácia do Fold {i + 1}: {accuracy * 100:.2f}%")
-
-    # Coletando rótulos e predições para a matriz de confusão final.
-    all_y_true.extend(y_test)
-    all_y_pred.extend(y_pred)
-
-# Calculando a acurácia média e o desvio padrão.
-mean_accuracy = np.mean(accuracies)
-std_accuracy = np.std(accuracies)
-print("-" * 30)
-print(f"[RESULTADO] Acurácia Média: {mean_accuracy * 100:.2f}% (+/- {std_accuracy * 100:.2f}%)")
-
-# Gerando e salvando a matriz de confusão.
-conf_matrix = confusion_matrix(all_y_true, all_y_pred)
-np.save(os.path.join(MODELS_DIR, 'confusion_matrix.npy'), conf_matrix)
-print(f"[INFO] Matriz de confusão salva em '{os.path.join(MODELS_DIR, 'confusion_matrix.npy')}'")
-
-print("[INFO] Treinando o modelo final com todo o dataset")
-# Treinando o modelo uma última vez com todos os dados para maximizar o aprendizado.
-final_scaler = StandardScaler().fit(X_normalized)
-X_final_scaled = final_scaler.transform(X_normalized)
-final_model = MLPClassifier(
-    hidden_layer_sizes=(128, 64),
-    max_iter=300,
-    random_state=42,
-    alpha=0.001
-)
-final_model.fit(X_final_scaled, y)
-
-print("[INFO] Salvando artefatos finais do modelo")
-# Persistindo o modelo treinado e o scaler para uso em tempo real.
-with open(os.path.join(MODELS_DIR, "librasign_mlp.pkl"), 'wb') as f:
-    pickle.dump(final_model, f)
-with open(os.path.join(MODELS_DIR, "scaler.pkl"), 'wb') as f:
-    pickle.dump(final_scaler, f)
-
-print("[INFO] Processo de treinamento aprimorado concluído com sucesso")
\ No newline at end of file
+    model = build_model(params)
+    model.fit(X_train, y_train, sample_weight=sample_weight)
+    del X_train
+
+    # Realizando predições no conjunto de teste, bloco a bloco.
+    y_pred = np.empty(len(test_index), dtype=y_train.dtype)
+    variant_pred = {}
+    if variants:
+        engines = build_variants(model, scaler, X_calibration)
+        variant_pred = {name: np.empty_like(y_pred) for name in engines}
+    for start in range(0, len(test_index), CHUNK_ROWS):
+        block = X[test_index[start:start + CHUNK_ROWS]]
+        if variants:
+            # Avaliando as variantes antes da padronização, incorporada aos seus pesos.
+            for name, predictions in predict_variants(engines, block, model.classes_).items():
+                variant_pred[name][start:start + len(block)] = predictions
+        y_pred[start:start + len(block)] = model.predict(standardize_inplace(block, scaler))
+    if variants:
+        return accuracy_score(y_test, y_pred), np.asarray(y_test), y_pred, variant_pred
+    return accuracy_score(y_test, y_pred), np.asarray(y_test), y_pred
+
+
+def fit_final(shared_dir, params):
+    """Treinando o modelo final com todo o dataset, padronizado sobre uma única cópia."""
+    X, y, _ = open_dataset(shared_dir)
+    final_scaler = fit_scaler(X)
+    final_model = build_model(params)
+    final_model.fit(standardize_inplace(np.array(X), final_scaler), y)
+    return final_model, final_scaler
+
+
+def _replace_file(path, write):
+    # Gravando em um arquivo temporário e substituindo o destino de forma atômica.
+    temp_path = path + ".tmp"
+    with open(temp_path, 'wb') as f:
+        write(f)
+    os.replace(temp_path, path)
+
+
+def save_artifacts(model, scaler, classes, models_dir=MODELS_DIR, files=None, mode="completo"):
+    """
+    Gravando os artefatos do modelo, cada um substituído atomicamente, e por
+    último o estado do treinamento, que sinaliza ao predict.py que um novo
+    conjunto completo de artefatos está disponível. Os artefatos derivados de
+    um modelo anterior são removidos antes do estado.
+
+    Args:
+        files: As entradas do manifesto do cache usadas no treinamento, que
+               permitem ao treinamento incremental identificar as amostras novas.
+    """
+    os.makedirs(models_dir, exist_ok=True)
+    _replace_file(os.path.join(models_dir, "classes.npy"), lambda f: np.save(f, classes))
+    _replace_file(os.path.join(models_dir, "librasign_mlp.pkl"), lambda f: pickle.dump(model, f))
+    _replace_file(os.path.join(models_dir, "scaler.pkl"), lambda f: pickle.dump(scaler, f))
+
+    # Exportando os pesos em formato compacto para o motor de inferência em NumPy.
+    engine_path = os.path.join(models_dir, "librasign_mlp.npz")
+    export_engine(model, scaler, engine_path + ".tmp.npz", classes)
+    os.replace(engine_path + ".tmp.npz", engine_path)
+
+    # Removendo a cascata e as variantes exportadas a partir de outro modelo, que não correspondem aos novos pesos.
+    fingerprint = model_fingerprint(model, scaler, classes)
+    for name in [CASCADE_FILE] + [VARIANT_FILES[precision] for precision in PRECISIONS if precision != "float32"]:
+        path = os.path.join(models_dir, name)
+        if os.path.exists(path) and read_fingerprint(path) != fingerprint:
+            os.remove(path)
+            print(f"[INFO] Artefato desatualizado removido: '{path}'")
+
+    state_path = os.path.join(models_dir, STATE_FILE)
+    version = load_state(models_dir).get("version", 0) + 1 if os.path.exists(state_path) else 1
+    state = {"version": version, "mode": mode, "samples_seen": int(scaler.n_samples_seen_), "files": files or {}}
+    _replace_file(state_path, lambda f: f.write(json.dumps(state, indent=2).encode()))
+    return engine_path
+
+
+def load_state(models_dir=MODELS_DIR):
+    """Lendo o estado do último treinamento gravado junto aos artefatos."""
+    with open(os.path.join(models_dir, STATE_FILE), 'r') as f:
+        return json.load(f)
+
+
+def _evaluate(executor, shared_dir, folds, candidates, fraction):
+    """
+    Avaliando cada candidato em todos os folds, opcionalmente sobre uma fração
+    do conjunto de treinamento, e retornando a acurácia média de cada um.
+    """
+    rng = np.random.default_rng(RANDOM_STATE)
+    futures = []
+    for params in candidates:
+        candidate_futures = []
+        for train_index, test_index in folds:
+            if fraction < 1.0:
+                size = max(1, int(len(train_index) * fraction))
+                train_index = np.sort(rng.permutation(train_index)[:size])
+            candidate_futures.append(executor.submit(fit_fold, shared_dir, train_index, test_index, params))
+        futures.append(candidate_futures)
+    return [np.mean([f.result()[0] for f in candidate_futures]) for candidate_futures in futures]
+
+
+def run_sweep(executor, shared_dir, folds, strategy):
+    """
+    Executando a varredura de hiperparâmetros em grade completa ou por
+    divisões sucessivas, em que cada rodada mantém o melhor terço dos
+    candidatos e triplica a fração de dados de treinamento.
+
+    Returns:
+        dict: Os hiperparâmetros com a maior acurácia média na validação cruzada.
+    """
+    candidates = list(ParameterGrid(SWEEP_GRID))
+    print(f"[INFO] Varredura '{strategy}' sobre {len(candidates)} combinações de hiperparâmetros")
+
+    fraction = 1.0
+    if strategy == "halving":
+        # Contando as reduções até a última rodada com mais de um candidato, avaliada com todos os dados.
+        n_rounds = 0
+        remaining = len(candidates)
+        while math.ceil(remaining / HALVING_FACTOR) > 1:
+            remaining = math.ceil(remaining / HALVING_FACTOR)
+            n_rounds += 1
+        fraction = 1.0 / HALVING_FACTOR ** n_rounds
+
+    while True:
+        fraction = min(fraction, 1.0)
+        scores = _evaluate(executor, shared_dir, folds, candidates, fraction)
+        ranking = sorted(zip(scores, range(len(candidates))), key=lambda item: -item[0])
+        print(f"--- Rodada com {len(candidates)} candidatos e {fraction * 100:.1f}% dos dados ---")
+        for score, index in ranking:
+            print(f"{score * 100:.2f}%  {candidates[index]}")
+
+        if fraction >= 1.0 or len(candidates) == 1:
+            return candidates[ranking[0][1]]
+
+        # Mantendo os melhores candidatos para a próxima rodada.
+        keep = max(1, math.ceil(len(candidates) / HALVING_FACTOR))
+        if keep == 1:
+            # Dispensando uma rodada com um único candidato, repetida pela validação cruzada principal.
+            return candidates[ranking[0][1]]
+        candidates = [candidates[index] for _, index in ranking[:keep]]
+        fraction *= HALVING_FACTOR
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Treinamento do classificador de landmarks")
+    parser.add_argument("--data-dir", help="Diretório local de landmarks, dispensando o download do Kaggle Hub")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="Diretório do cache de dados normalizados")
+    parser.add_argument("--no-cache", action="store_true", help="Processando todos os arquivos sem usar o cache")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Quantidade de processos paralelos")
+    parser.add_argument("--sweep", choices=["grid", "halving"], help="Executando a varredura de hiperparâmetros")
+    parser.add_argument("--cascade", action="store_true",
+                        help="Treinando o primeiro estágio linear da cascata, calibrado nos folds")
+    parser.add_argument("--quantize", action="store_true",
+                        help="Avaliando nos folds e exportando as variantes float16 e int8 do motor")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Atualizando o modelo existente apenas com as amostras novas ou alteradas")
+    parser.add_argument("--epochs", type=int, default=20, help="Épocas do treinamento incremental")
+    parser.add_argument("--replay-ratio", type=float, default=2.0,
+                        help="Amostras antigas revisitadas por amostra nova no treinamento incremental")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    print("[INFO] Carregando dataset de landmarks")
+
+    # Usando o diretório local informado ou baixando o dataset do Kaggle Hub.
+    data_dir = args.data_dir or download_dataset()
+    print(f"[INFO] Lendo dados de: {data_dir}")
+
+    if args.incremental:
+        from incremental import update_model
+
+        update_model(data_dir, args.cache_dir, MODELS_DIR, args.epochs, args.replay_ratio)
+        return
+
+    shared_dir = None
+    if args.no_cache:
+        with memory_phase("carregamento"):
+            X, y_raw = load_dataset(data_dir)
+
+            # Aplicando a codificação numérica aos rótulos textuais.
+            le = LabelEncoder()
+            y = le.fit_transform(y_raw)
+            classes = le.classes_
+            del y_raw
+
+        print("[INFO] Normalizando landmarks para invariância de posição e escala")
+        with memory_phase("normalização"):
+            X_normalized = normalize_landmarks(X, out=X)
+            del X
+    else:
+        # Reaproveitando os dados já normalizados de arquivos inalterados.
+        with memory_phase("cache"):
+            shared_dir = build_cache(data_dir, args.cache_dir)
+            X_normalized, y, classes = open_dataset(shared_dir)
+        print(f"[INFO] Dataset em cache: '{shared_dir}' ({len(y)} amostras)")
+
+    os.makedirs(MODELS_DIR, exist_ok=True)
+
+    # Usando StratifiedKFold para manter a proporção das classes nos folds, representados por índices.
+    skf = StratifiedKFold(n_splits=N_SPLITS, shuffle=True, random_state=RANDOM_STATE)
+    folds = list(skf.split(np.zeros((len(y), 0)), y))
+
+    # Compartilhando os dados com os processos, diretamente do cache quando disponível.
+    temp_dir = None
+    if shared_dir is None:
+        temp_dir = shared_dir = share_dataset(X_normalized, y, classes, tempfile.mkdtemp(prefix="librasign_"))
+    # Liberando a matriz do processo principal, que passa a ser lida apenas pelos trabalhadores.
+    del X_normalized
+    try:
+        with memory_phase("treinamento"), \
+                ProcessPoolExecutor(max_workers=args.workers, initializer=_init_worker) as executor:
+            params = DEFAULT_PARAMS
+            if args.sweep:
+                params = run_sweep(executor, shared_dir, folds, args.sweep)
+                print(f"[RESULTADO] Melhores hiperparâmetros: {params}")
+
+            print(f"[INFO] Iniciando treinamento com validação cruzada (K={N_SPLITS}) em {args.workers} processo(s)")
+            # Submetendo os folds e o modelo final simultaneamente ao pool.
+            fold_futures = [
+                executor.submit(fit_fold, shared_dir, train_index, test_index, params, variants=args.quantize)
+                for train_index, test_index in folds
+            ]
+            final_future = executor.submit(fit_final, shared_dir, params)
+
+            accuracies = []
+            all_y_true = []
+            all_y_pred = []
+            fold_predictions = []
+            variant_predictions = []
+
+            # Coletando os resultados de cada fold na ordem original.
+            for i, future in enumerate(fold_futures):
+                accuracy, y_test, y_pred, *variant_pred = future.result()
+                variant_predictions.extend(variant_pred)
+                print(f"--- FOLD {i + 1}/{N_SPLITS} ---")
+                accuracies.append(accuracy)
+                print(f"Acurácia do Fold {i + 1}: {accuracy * 100:.2f}%")
+
+                # Coletando rótulos e predições para a matriz de confusão final.
+                all_y_true.extend(y_test)
+                all_y_pred.extend(y_pred)
+                fold_predictions.append((y_test, y_pred))
+
+            # Calculando a acurácia média e o desvio padrão.
+            mean_accuracy = np.mean(accuracies)
+            std_accuracy = np.std(accuracies)
+            print("-" * 30)
+            print(f"[RESULTADO] Acurácia Média: {mean_accuracy * 100:.2f}% (+/- {std_accuracy * 100:.2f}%)")
+
+            # Gerando e salvando a matriz de confusão.
+            conf_matrix = confusion_matrix(all_y_true, all_y_pred)
+            np.save(os.path.join(MODELS_DIR, 'confusion_matrix.npy'), conf_matrix)
+            print(f"[INFO] Matriz de confusão salva em '{os.path.join(MODELS_DIR, 'confusion_matrix.npy')}'")
+
+            if args.cascade:
+                from cascade import train_cascade
+
+                # Calibrando o primeiro estágio com as predições fora do fold do MLP.
+                print("[INFO] Treinando e calibrando o primeiro estágio da cascata")
+                cascade_path = train_cascade(executor, shared_dir, folds, fold_predictions, MODELS_DIR, final_future)
+                print(f"[INFO] Primeiro estágio da cascata exportado em '{cascade_path}'")
+
+            print("[INFO] Treinando o modelo final com todo o dataset")
+            final_model, final_scaler = final_future.result()
+
+            if args.quantize:
+                from quantize import report_variants
+
+                # Comparando as variantes frente ao modelo em float64 nos mesmos folds.
+                print("[INFO] Avaliando e exportando as variantes de precisão reduzida")
+                report_variants(final_model, final_scaler, classes, shared_dir,
+                                np.asarray(all_y_true), variant_predictions, MODELS_DIR)
+    finally:
+        if temp_dir is not None:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    workers_peak = peak_memory_mb(children=True)
+    if workers_peak is not None:
+        print(f"[INFO] Memória 'treinamento': pico dos processos trabalhadores {workers_peak:.0f} MB")
+
+    print("[INFO] Salvando artefatos finais do modelo")
+    # Persistindo o modelo, o scaler e o motor compacto para uso em tempo real.
+    files = None if args.no_cache else read_manifest(args.cache_dir)
+    engine_path = save_artifacts(final_model, final_scaler, classes, MODELS_DIR, files)
+    print(f"[INFO] Motor de inferência exportado em '{engine_path}'")
+
+    print("[INFO] Processo de treinamento aprimorado concluído com sucesso")
+
+
+if __name__ == "__main__":
+    main()